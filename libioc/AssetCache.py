@@ -0,0 +1,166 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc release asset cache module."""
+import typing
+import os
+import re
+import shutil
+import uuid
+
+import libioc.helpers_object
+
+_size_pattern = re.compile(r"^(?P<size>\d+)(?P<unit>[KMGT]?)B?$", re.I)
+_size_units: typing.Dict[str, int] = dict(K=1, M=2, G=3, T=4)
+
+
+def parse_size(value: typing.Union[str, int]) -> int:
+    """Return the bytes of a size with an optional K, M, G or T suffix."""
+    if isinstance(value, int):
+        return value
+    match = _size_pattern.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid size: {value}")
+    unit = match.group("unit").upper()
+    return int(match.group("size")) << (10 * _size_units.get(unit, 0))
+
+
+class AssetCache:
+    """
+    Content-addressed store of release assets.
+
+    Assets are stored by the SHA256 digest published in the distributions
+    hash file, so that the same asset version is shared by all releases
+    and by all hosts that mount the cache directory, for example via NFS.
+    Files are written to a temporary name and renamed into place, so that
+    readers never see incomplete assets. Entries are touched when they
+    are used and the least recently used ones are evicted once the cache
+    grows beyond its maximum size. A maximum size of 0 disables eviction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int=0,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+
+    def get_path(self, digest: str) -> str:
+        """Return the cache location of an asset digest."""
+        if re.match(r"^[0-9a-f]{64}$", digest) is None:
+            raise ValueError(f"Invalid SHA256 digest: {digest}")
+        return f"{self.path}/{digest[:2]}/{digest}.txz"
+
+    def __contains__(self, digest: str) -> bool:
+        """Return True if the asset is stored."""
+        return os.path.isfile(self.get_path(digest))
+
+    def restore(self, digest: str, destination: str) -> bool:
+        """
+        Place a cached asset at the destination path.
+
+        The asset is hard linked when possible and copied otherwise.
+        Returns False when the asset is not cached.
+        """
+        path = self.get_path(digest)
+        temporary_path = f"{destination}.{uuid.uuid4().hex}.part"
+        try:
+            self._link_or_copy(path, temporary_path)
+        except FileNotFoundError:
+            # not cached or evicted concurrently
+            return False
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        os.replace(temporary_path, destination)
+        self._touch(path)
+        self.logger.verbose(f"Restored asset {digest} from {self.path}")
+        return True
+
+    def store(self, digest: str, source: str) -> None:
+        """Add an asset file that matches the digest to the cache."""
+        path = self.get_path(digest)
+        if os.path.isfile(path):
+            self._touch(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            self._link_or_copy(source, temporary_path)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        self.logger.verbose(f"Stored asset {digest} in {self.path}")
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used assets beyond the maximum size."""
+        if self.max_size <= 0:
+            return
+        entries = []
+        for directory, _, files in os.walk(self.path):
+            for file in files:
+                if file.endswith(".txz") is False:
+                    continue
+                path = os.path.join(directory, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path,))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # evicted by another host
+                pass
+            size -= entry_size
+            self.logger.verbose(f"Evicted {path} from the asset cache")
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another host
+            pass
+
+    @staticmethod
+    def _link_or_copy(source: str, destination: str) -> None:
+        try:
+            os.link(source, destination)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # cross-device or the filesystem does not support hard links
+            shutil.copyfile(source, destination)
@@ -180,3 +180,80 @@ class Data(dict):
                 value = value.nested
             out[key] = value
         return out
+
+
+class OverlayData(Data):
+    """
+    Copy-on-write layer over another Data object.
+
+    Reads fall through to the base data unless a key was written to or
+    deleted from the overlay. The base data is never modified, so that
+    temporary changes cost only the number of changed keys.
+    """
+
+    base: Data
+    deleted: typing.Set[str]
+
+    def __init__(self, base: Data) -> None:
+        self.base = base
+        self.deleted = set()
+        Data.__init__(self)
+
+    def __getitem__(
+        self,
+        key: str
+    ) -> typing.Any:
+        """Return the overlay item or fall back to the base data."""
+        try:
+            return Data.__getitem__(self, key)
+        except KeyError:
+            if self.__is_deleted(key) is True:
+                raise
+        return self.base.__getitem__(key)
+
+    def __setitem__(
+        self,
+        key: str,
+        value: typing.Any
+    ) -> None:
+        """Set an item in the overlay."""
+        self.deleted.discard(key)
+        Data.__setitem__(self, key, value)
+
+    def __contains__(self, key: typing.Any) -> bool:
+        """Return whether a (nested) key is in the overlay or base data."""
+        if Data.__contains__(self, key) is True:
+            return True
+        if self.__is_deleted(key) is True:
+            return False
+        return self.base.__contains__(key)
+
+    def __delitem__(self, key: str) -> None:
+        """Hide the key without deleting it from the base data."""
+        if self.__contains__(key) is False:
+            raise KeyError(key)
+        if Data.__contains__(self, key) is True:
+            Data.__delitem__(self, key)
+        if self.base.__contains__(key) is True:
+            self.deleted.add(key)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Return the flattened overlay keys followed by the base keys."""
+        overlay_keys = list(Data.__iter__(self))
+        yield from overlay_keys
+        for key in self.base.__iter__():
+            if (key in overlay_keys) or (self.__is_deleted(key) is True):
+                continue
+            yield key
+
+    @property
+    def nested(self) -> dict:
+        """Return the merged data as nested dict structure."""
+        return Data(dict(self.items())).nested
+
+    def __is_deleted(self, key: str) -> bool:
+        if key in self.deleted:
+            return True
+        return any(
+            key.startswith(f"{x}{self.delimiter}") for x in self.deleted
+        )
@@ -31,6 +31,7 @@ import re
 
 import libioc.helpers
 import libioc.helpers_object
+import libioc.MountTable
 import libioc.Types
 import libioc.Config.Jail
 import libioc.Config.Jail.File
@@ -735,12 +736,14 @@ class JailFstab(Fstab):
                 self.logger.verbose(
                     f"auto-mount {destination}"
                 )
+                mount_table = libioc.MountTable.MountTable(logger=self.logger)
+                mount_table.refresh()
                 if os.path.exists(destination) is False:
                     os.makedirs(destination)
                 elif any((
                     os.path.isdir(destination) is False,
                     os.path.islink(destination) is True,
-                    os.path.ismount(destination) is True,
+                    mount_table.is_mounted(destination) is True,
                 )):
                     raise libioc.errors.InvalidMountpoint(destination)
 
@@ -752,6 +755,11 @@ class JailFstab(Fstab):
                     destination
                 ]
                 libioc.helpers.exec(mount_command, logger=self.logger)
+                mount_table.add(
+                    mountpoint=destination,
+                    source=line["source"],
+                    fstype=line["type"]
+                )
                 _source = line["source"]
                 _jail_name = self.jail.humanreadable_name
                 self.logger.verbose(
@@ -837,8 +845,10 @@ class JailFstab(Fstab):
         yield event.begin()
         has_unmounted_any = False
         try:
+            mount_table = libioc.MountTable.MountTable(logger=self.logger)
+            mount_table.refresh()
             for line in [x for x in self if isinstance(x, FstabLine)]:
-                if os.path.ismount(line["destination"]) is False:
+                if mount_table.is_mounted(line["destination"]) is False:
                     continue
                 libioc.helpers.umount(line["destination"], force=True)
                 has_unmounted_any = True
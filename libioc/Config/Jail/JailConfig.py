@@ -26,6 +26,7 @@
 import typing
 
 import libioc.helpers_object
+import libioc.Config.Data
 import libioc.Config.Jail.BaseConfig
 
 if typing.TYPE_CHECKING:
@@ -160,3 +161,28 @@ class JailConfig(libioc.Config.Jail.BaseConfig.BaseConfig):
             self.host.default_config.all_properties
         )
         return sorted(list(jail_config_properties | default_config_properties))
+
+
+class JailConfigOverlay(JailConfig):
+    """
+    A JailConfig with temporary changes on top of another JailConfig.
+
+    Only changed properties are stored. Reads fall through to the original
+    config, which remains untouched.
+    """
+
+    def __init__(
+        self,
+        config: JailConfig,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.original_config = config
+        self._data = libioc.Config.Data.OverlayData(config.data)
+        JailConfig.__init__(
+            self,
+            jail=config.jail,
+            logger=(config.logger if (logger is None) else logger),
+            host=config.host
+        )
+        self.legacy = config.legacy
+        self.ignore_source_config = config.ignore_source_config
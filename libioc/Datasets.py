@@ -147,6 +147,11 @@ class RootDatasets:
         """Get or create the pkg cache."""
         return self._get_or_create_dataset("pkg")
 
+    @property
+    def updates(self) -> libzfs.ZFSDataset:
+        """Get or create the update cache shared by all releases."""
+        return self._get_or_create_dataset("updates")
+
     def _get_or_create_dataset(
         self,
         asset_name: str
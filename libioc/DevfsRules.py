@@ -105,6 +105,11 @@ class DevfsRuleset(list):
         if rule not in self:
             list.append(self, rule)
 
+    @property
+    def content_key(self) -> typing.Tuple[str, ...]:
+        """Return a hashable representation of the rules."""
+        return tuple(str(rule) for rule in self)
+
     def clone(self, source_ruleset: 'DevfsRuleset') -> None:
         """
         Clone the rules from another ruleset.
@@ -146,13 +151,19 @@ class DevfsRules(list):
     Abstraction for the hosts /etc/devfs.rules.
 
     Read and edit devfs rules in a programmatic way.
-    Restart the devfs service after applying changes.
+    New rulesets are installed into the running kernel with devfs(8), so
+    that changes to the devfs.rules file do not require a service restart.
     """
 
     _rules_file: str
     _ruleset_number_index: typing.Dict[int, int]
     _ruleset_name_index: typing.Dict[str, int]
+    _ruleset_content_index: typing.Optional[
+        typing.Dict[typing.Tuple[str, ...], int]
+    ]
     _system_rule_lines: typing.List[int]
+    _save_deferred: bool
+    _save_pending: bool
 
     def __init__(
         self,
@@ -175,10 +186,14 @@ class DevfsRules(list):
         # index rulesets to find duplicated and provide easy access
         self._ruleset_number_index = {}
         self._ruleset_name_index = {}
+        self._ruleset_content_index = None
 
         # remember all lines that were loaded from defaults (system)
         self._system_rule_lines = []
 
+        self._save_deferred = False
+        self._save_pending = False
+
         list.__init__(self)
 
         # will automatically read from file - needs to be the last item
@@ -232,12 +247,47 @@ class DevfsRules(list):
         # build indexes
         self._ruleset_number_index[ruleset.number] = next_line_index
         self._ruleset_name_index[ruleset.name] = next_line_index
+        if self._ruleset_content_index is not None:
+            self._ruleset_content_index.setdefault(
+                ruleset.content_key,
+                next_line_index
+            )
         if is_system_rule is True:
             self._system_rule_lines.append(next_line_index)
 
         list.append(self, ruleset)
         return ruleset
 
+    def clear(self) -> None:
+        """Remove all rulesets and reset the indexes."""
+        list.clear(self)
+        self._ruleset_number_index = {}
+        self._ruleset_name_index = {}
+        self._ruleset_content_index = None
+        self._system_rule_lines = []
+
+    @property
+    def _content_index(self) -> typing.Dict[typing.Tuple[str, ...], int]:
+        """
+        Return the index of ruleset contents to their line position.
+
+        Rules are appended to rulesets after they were added while reading
+        the file, so that the index is built on first use.
+        """
+        if self._ruleset_content_index is None:
+            content_index: typing.Dict[typing.Tuple[str, ...], int] = {}
+            for line_index in self._ruleset_number_index.values():
+                ruleset = self[line_index]
+                content_index.setdefault(ruleset.content_key, line_index)
+            self._ruleset_content_index = content_index
+        return self._ruleset_content_index
+
+    def __contains__(self, item: typing.Any) -> bool:
+        """Return True if the line or a ruleset with equal rules exists."""
+        if isinstance(item, DevfsRuleset):
+            return (item.content_key in self._content_index) is True
+        return list.__contains__(self, item)
+
     def new_ruleset(self, ruleset: DevfsRuleset) -> int:
         """
         Append a new ruleset.
@@ -272,6 +322,12 @@ class DevfsRules(list):
         ruleset = self[index[rule_number]]  # type: DevfsRuleset
         return ruleset
 
+    def find_by_rules(self, rules: DevfsRuleset) -> DevfsRuleset:
+        """Find the first devfs ruleset with the same rules."""
+        index = self._content_index
+        ruleset = self[index[rules.content_key]]  # type: DevfsRuleset
+        return ruleset
+
     @property
     def default_rules_file(self) -> str:
         """Return the default path to the devfs rules file."""
@@ -302,7 +358,8 @@ class DevfsRules(list):
 
         This counting includes the systems default devfs rulesets.
         """
-        return len(self._ruleset_name_index.keys()) + 1
+        numbers = self._ruleset_number_index.keys()
+        return max(len(numbers), max(numbers, default=0)) + 1
 
     def read_rules(self) -> None:
         """
@@ -355,12 +412,77 @@ class DevfsRules(list):
 
         f.close()
 
-    def save(self) -> None:
+    def install_ruleset(self, ruleset: DevfsRuleset) -> None:
+        """
+        Install a ruleset in the running kernel.
+
+        The rules are evaluated like rc.d/devfs does when it reads the
+        devfs.rules file, so that ruleset names referenced as variables
+        (for example $devfsrules_hide_all) resolve to their numbers.
+        All rules are applied by a single shell invocation.
+
+        Args:
+
+            ruleset (libioc.DevfsRules.DevfsRuleset):
+                The ruleset to install. It must have a number assigned.
+        """
+        ruleset_number = str(int(ruleset.number))
+        script_lines = []
+        for name, line_index in self._ruleset_name_index.items():
+            variable_name = name.replace("-", "_")
+            if variable_name.isidentifier() is False:
+                continue
+            number = int(self[line_index].number)
+            script_lines.append(f"{variable_name}={number}")
+        script_lines.append(f"/sbin/devfs rule -s {ruleset_number} delset")
+        for rule in ruleset:
+            script_lines.append(f"/sbin/devfs rule -s {ruleset_number} {rule}")
+
+        if self.logger is not None:
+            self.logger.debug(f"Installing devfs ruleset {ruleset_number}")
+        try:
+            libioc.helpers.exec(
+                ["/bin/sh", "-e", "-c", "\n".join(script_lines)],
+                logger=self.logger
+            )
+        except libioc.errors.CommandFailure:
+            raise libioc.errors.DevfsRulesetInstallFailed(
+                ruleset_number=int(ruleset_number),
+                logger=self.logger
+            )
+
+    def defer_save(self) -> None:
+        """
+        Collect changes until flush() is called.
+
+        When many jails are started in a batch, new ruleset combinations
+        are installed immediately, but the devfs.rules file is only written
+        once when the batch is finished.
+        """
+        self._save_deferred = True
+
+    def flush(self) -> None:
+        """Write deferred changes to the devfs.rules file."""
+        self._save_deferred = False
+        if self._save_pending is True:
+            self.save(restart_service=False)
+
+    def save(self, restart_service: bool=True) -> None:
         """
         Apply changes to the devfs.rules file.
 
-        Automatically restarts devfs service when the file was changed.
+        Args:
+
+            restart_service (bool): (default=True)
+                Restart the devfs service when the file was changed.
+                Rulesets installed with install_ruleset() are active
+                already and do not require a restart.
         """
+        if self._save_deferred is True:
+            self._save_pending = True
+            return
+        self._save_pending = False
+
         content_before = None
 
         if os.path.isfile(self.rules_file):
@@ -386,7 +508,8 @@ class DevfsRules(list):
 
             f.write(new_content)
             f.truncate()
-            self._restart_devfs_service()
+            if restart_service is True:
+                self._restart_devfs_service()
 
         f.close()
 
@@ -27,7 +27,6 @@ import typing
 import os
 import platform
 import re
-import urllib.request
 import html.parser
 
 import libioc.errors
@@ -85,6 +84,12 @@ class DistributionGenerator:
     ]
 
     eol_url: str = "https://www.freebsd.org/security/unsupported.html"
+    # seconds until cached mirror indexes and EOL pages are revalidated
+    releases_ttl: float = 3600
+    eol_list_ttl: float = 86400
+    # concurrent HEAD requests and their timeout in probe_availability
+    probe_concurrency: int = 8
+    probe_timeout: float = 10
     _eol_list: typing.Optional[typing.List[str]]
 
     __mirror_link_pattern = r"a href=\"([A-z0-9\-_\.]+)/\""
@@ -161,10 +166,10 @@ class DistributionGenerator:
         """Fetch and cache the available releases."""
         self.logger.spam(f"Fetching release list from '{self.mirror_url}'")
 
-        # the mirror_url @property is validated (enforced) @property, so:
-        resource = urllib.request.urlopen(self.mirror_url)  # nosec
-        charset = resource.headers.get_content_charset()
-        response = resource.read().decode(charset if charset else "UTF-8")
+        response = self.host.metadata_cache.get(
+            self.mirror_url,
+            ttl=self.releases_ttl
+        ).decode("UTF-8", "ignore")
 
         found_releases = self._parse_links(response)
 
@@ -224,32 +229,24 @@ class DistributionGenerator:
 
     def _query_eol_list(self) -> typing.List[str]:
         """Scrape the FreeBSD website and return a list of EOL RELEASES."""
-        request = urllib.request.Request(
-            self.eol_url,
-            headers={
-                "Accept-Charset": "utf-8"
-            }
-        )
-        self.logger.verbose(f"Downloading EOL info from {self.eol_url}")
-        with urllib.request.urlopen(request) as response:  # nosec: B310
-
-            response_code = response.getcode()
-            if response_code != 200:
-                # constructing the error logs the warning without raising
-                libioc.errors.DownloadFailed(
-                    url=self.eol_url,
-                    code=response_code,
-                    logger=self.logger,
-                    level="warn"
-                )
-                return []
-
-            parser = EOLParser()
-            data = response.read().decode("utf-8", "ignore")
-            parser.feed(data)
-            parser.close()
-
-            return parser.eol_releases
+        self.logger.verbose(f"Querying EOL info from {self.eol_url}")
+        try:
+            data = self.host.metadata_cache.get(
+                self.eol_url,
+                ttl=self.eol_list_ttl,
+                headers={
+                    "Accept-Charset": "utf-8"
+                },
+                level="warn"
+            ).decode("utf-8", "ignore")
+        except libioc.errors.DownloadFailed:
+            return []
+
+        parser = EOLParser()
+        parser.feed(data)
+        parser.close()
+
+        return parser.eol_releases
 
     @property
     def releases(self) -> typing.List['libioc.Release.ReleaseGenerator']:
@@ -264,6 +261,35 @@ class DistributionGenerator:
             return self._available_releases
         raise libioc.errors.ReleaseListUnavailable()
 
+    def probe_availability(
+        self,
+        releases: typing.Optional[
+            typing.Iterable['libioc.Release.ReleaseGenerator']
+        ]=None
+    ) -> typing.Dict[str, bool]:
+        """
+        Return whether releases are available on the mirror by name.
+
+        All releases, or all releases listed on the mirror if none were
+        given, are probed with concurrent HEAD requests. The results are
+        shared with Release.available through the host metadata cache.
+        """
+        if releases is None:
+            releases = self.releases
+        remote_urls = {
+            release.name: release.remote_url
+            for release in releases
+        }
+        statuses = self.host.metadata_cache.statuses(
+            remote_urls.values(),
+            concurrency=self.probe_concurrency,
+            timeout=self.probe_timeout
+        )
+        return {
+            name: (statuses.get(url) == 200)
+            for name, url in remote_urls.items()
+        }
+
     def _parse_links(self, text: str) -> typing.List[str]:
         blacklisted_releases = Distribution.release_name_blacklist
         matches = filter(
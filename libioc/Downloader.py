@@ -0,0 +1,535 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc concurrent HTTP download module."""
+import typing
+import base64
+import hashlib
+import http.client
+import io
+import os
+import queue
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import libioc.errors
+import libioc.helpers_object
+
+# (job, bytes received, total bytes or None when unknown)
+DownloadProgress = typing.Tuple['DownloadJob', int, typing.Optional[int]]
+
+
+class DownloadJob:
+    """A file that is downloaded from an URL to a local path."""
+
+    def __init__(
+        self,
+        url: str,
+        path: str
+    ) -> None:
+        self.url = url
+        self.path = path
+        self.bytes_received = 0
+        self.bytes_total: typing.Optional[int] = None
+        self.done = False
+        self.error: typing.Optional[BaseException] = None
+
+    @property
+    def part_path(self) -> str:
+        """Return the path of the incomplete download."""
+        return f"{self.path}.part"
+
+
+class StreamReader(io.RawIOBase):
+    """
+    Readable file object over a stream of chunks that hashes its bytes.
+
+    The digest covers all bytes read so far. Consumers that stop before the
+    end of the stream (e.g. at the tar end-of-archive marker) call drain()
+    before comparing the digest.
+    """
+
+    def __init__(
+        self,
+        chunks: typing.Iterable[bytes],
+        hash_algorithm: str="sha256"
+    ) -> None:
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+        self._hash = hashlib.new(hash_algorithm)
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        """Return True, because the stream is readable."""
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        """Read up to the size of the buffer from the stream."""
+        while len(self._buffer) == 0:
+            try:
+                self._buffer = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        buffer[:size] = data
+        self._hash.update(data)
+        self.bytes_read += size
+        return size
+
+    def drain(self) -> None:
+        """Read and hash the remainder of the stream."""
+        while len(self.read(io.DEFAULT_BUFFER_SIZE * 16)) > 0:
+            pass
+
+    @property
+    def hexdigest(self) -> str:
+        """Return the hex digest of all bytes read."""
+        return self._hash.hexdigest()
+
+
+def get_proxy(
+    scheme: str,
+    netloc: str
+) -> typing.Optional[typing.Tuple[str, typing.Dict[str, str]]]:
+    """
+    Return the proxy of an origin from the environment.
+
+    The result is the address of the proxy and the headers it requires,
+    or None when the origin is reached directly.
+    """
+    proxy = urllib.request.getproxies().get(scheme)
+    if (proxy is None) or urllib.request.proxy_bypass(netloc):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    parsed_proxy = urllib.parse.urlsplit(proxy)
+    headers: typing.Dict[str, str] = {}
+    if parsed_proxy.username is not None:
+        credentials = ":".join([
+            urllib.parse.unquote(parsed_proxy.username),
+            urllib.parse.unquote(parsed_proxy.password or "")
+        ])
+        token = base64.b64encode(credentials.encode("UTF-8")).decode("ASCII")
+        headers["Proxy-Authorization"] = f"Basic {token}"
+    proxy_netloc = parsed_proxy.netloc.rpartition("@")[2]
+    return (proxy_netloc, headers,)
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections of one thread, reused per origin.
+
+    Proxies are taken from the http_proxy, https_proxy and no_proxy
+    environment variables like urllib does. Plain HTTP requests are sent
+    to the proxy with an absolute URI, HTTPS connections are tunneled.
+    """
+
+    def __init__(self, timeout: float=60) -> None:
+        self.timeout = timeout
+        self._connections: typing.Dict[
+            typing.Tuple[str, str],
+            http.client.HTTPConnection
+        ] = {}
+        # headers of plain HTTP requests that are sent to a proxy
+        self._proxy_headers: typing.Dict[
+            typing.Tuple[str, str],
+            typing.Dict[str, str]
+        ] = {}
+
+    def get(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        """Return the open connection to an origin or create it."""
+        key = (scheme, netloc,)
+        if key not in self._connections.keys():
+            self._connections[key] = self._connect(scheme, netloc)
+        return self._connections[key]
+
+    def _connect(
+        self,
+        scheme: str,
+        netloc: str
+    ) -> http.client.HTTPConnection:
+        connection: http.client.HTTPConnection
+        proxy = get_proxy(scheme, netloc)
+        if proxy is None:
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(
+                    netloc,
+                    timeout=self.timeout
+                )
+            else:
+                connection = http.client.HTTPConnection(
+                    netloc,
+                    timeout=self.timeout
+                )
+            return connection
+
+        proxy_netloc, proxy_headers = proxy
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(
+                proxy_netloc,
+                timeout=self.timeout
+            )
+            connection.set_tunnel(netloc, headers=proxy_headers)
+        else:
+            connection = http.client.HTTPConnection(
+                proxy_netloc,
+                timeout=self.timeout
+            )
+            self._proxy_headers[(scheme, netloc,)] = proxy_headers
+        return connection
+
+    def request(
+        self,
+        scheme: str,
+        netloc: str,
+        method: str,
+        path: str,
+        headers: typing.Dict[str, str]
+    ) -> http.client.HTTPResponse:
+        """
+        Send a request to an origin and return the response.
+
+        The connection is discarded when the request fails. A reused
+        connection that was closed by the server before it responded is
+        replaced by a new one once.
+        """
+        key = (scheme, netloc,)
+        reused = key in self._connections.keys()
+        connection = self.get(scheme, netloc)
+        target = path
+        request_headers = headers
+        if key in self._proxy_headers.keys():
+            target = f"{scheme}://{netloc}{path}"
+            request_headers = dict(headers, **self._proxy_headers[key])
+        try:
+            connection.request(method, target, headers=request_headers)
+            return connection.getresponse()
+        except (ConnectionError, http.client.BadStatusLine):
+            self.discard(scheme, netloc)
+            if reused is False:
+                raise
+        except (OSError, http.client.HTTPException):
+            self.discard(scheme, netloc)
+            raise
+        # the server closed the idle keep-alive connection
+        return self.request(scheme, netloc, method, path, headers)
+
+    def discard(self, scheme: str, netloc: str) -> None:
+        """Close the connection to an origin after an error."""
+        self._proxy_headers.pop((scheme, netloc,), None)
+        connection = self._connections.pop((scheme, netloc,), None)
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        """Close all connections."""
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+        self._proxy_headers.clear()
+
+
+class Downloader:
+    """
+    Concurrent and resumable downloads over keep-alive connections.
+
+    Incomplete downloads are written to `<path>.part` and continued with
+    HTTP Range requests, so that only completely received files appear at
+    their final path. Each worker thread reuses its connection per origin
+    for subsequent files and retries. Schemes other than HTTP(S) fall back
+    to urllib without resume.
+    """
+
+    chunk_size: int = 1024 * 1024
+    max_redirects: int = 5
+    # seconds to wait before a retry, multiplied with the attempt
+    retry_delay: float = 1
+
+    def __init__(
+        self,
+        concurrency: int=4,
+        retries: int=3,
+        timeout: float=60,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def _connection_pool(self) -> ConnectionPool:
+        try:
+            pool: ConnectionPool = self._local.connection_pool
+            return pool
+        except AttributeError:
+            pass
+        pool = ConnectionPool(timeout=self.timeout)
+        self._local.connection_pool = pool
+        return pool
+
+    def close(self) -> None:
+        """Close the connections of the calling thread."""
+        self._connection_pool.close()
+
+    def download(
+        self,
+        jobs: typing.List[DownloadJob]
+    ) -> typing.Generator[DownloadProgress, None, None]:
+        """
+        Download all jobs concurrently and yield their progress.
+
+        The first failure is raised after all other downloads finished.
+        """
+        pending: queue.Queue = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+
+        progress: queue.Queue = queue.Queue()
+        finished = object()
+
+        def _worker() -> None:
+            try:
+                while True:
+                    try:
+                        job = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        self.download_job(
+                            job,
+                            lambda x: progress.put(x)
+                        )
+                    except BaseException as e:
+                        job.error = e
+                    progress.put((job, job.bytes_received, job.bytes_total,))
+            finally:
+                self._connection_pool.close()
+                progress.put(finished)
+
+        threads = [
+            threading.Thread(target=_worker, daemon=True)
+            for _ in range(min(self.concurrency, len(jobs)))
+        ]
+        for thread in threads:
+            thread.start()
+
+        running = len(threads)
+        while running > 0:
+            item = progress.get()
+            if item is finished:
+                running -= 1
+                continue
+            yield item
+
+        for job in jobs:
+            if job.error is not None:
+                raise job.error
+
+    def download_job(
+        self,
+        job: DownloadJob,
+        callback: typing.Optional[
+            typing.Callable[[DownloadProgress], None]
+        ]=None
+    ) -> None:
+        """Download a single job, resuming its partial file."""
+        if os.path.isfile(job.path):
+            job.bytes_received = os.stat(job.path).st_size
+            job.bytes_total = job.bytes_received
+            job.done = True
+            return
+
+        scheme = urllib.parse.urlparse(job.url).scheme
+        if scheme not in ("http", "https",):
+            self._download_with_urllib(job)
+            return
+
+        offset = 0
+        if os.path.isfile(job.part_path):
+            offset = os.stat(job.part_path).st_size
+            self.logger.verbose(
+                f"Resuming download of {job.url} at {offset} bytes"
+            )
+
+        mode = "ab" if (offset > 0) else "wb"
+        f = open(job.part_path, mode)
+        try:
+            for chunk in self.stream(job.url, offset=offset, job=job):
+                f.write(chunk)
+                if callback is not None:
+                    callback((job, job.bytes_received, job.bytes_total,))
+        finally:
+            f.close()
+
+        os.rename(job.part_path, job.path)
+        job.done = True
+        self.logger.verbose(f"{job.url} was saved to {job.path}")
+
+    def stream(
+        self,
+        url: str,
+        offset: int=0,
+        job: typing.Optional[DownloadJob]=None
+    ) -> typing.Generator[bytes, None, None]:
+        """
+        Yield the content of an URL starting at an offset.
+
+        Interrupted transfers are continued with Range requests until the
+        number of retries is exhausted.
+        """
+        if job is None:
+            job = DownloadJob(url=url, path="")
+        job.bytes_received = offset
+        attempt = 0
+        while True:
+            try:
+                response = self._request(url, offset=job.bytes_received)
+                if response.status == 416:
+                    # the partial file already is complete
+                    response.read()
+                    job.bytes_total = job.bytes_received
+                    return
+                skip = 0
+                if response.status == 200:
+                    # the server ignored the Range header
+                    skip = job.bytes_received
+                job.bytes_total = self._get_total_size(
+                    response,
+                    job.bytes_received - skip
+                )
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if skip > 0:
+                        skipped = min(skip, len(chunk))
+                        chunk = chunk[skipped:]
+                        skip -= skipped
+                        if len(chunk) == 0:
+                            continue
+                    job.bytes_received += len(chunk)
+                    attempt = 0
+                    yield chunk
+                if (job.bytes_total is not None) \
+                        and (job.bytes_received < job.bytes_total):
+                    raise http.client.IncompleteRead(b"")
+                return
+            except (OSError, http.client.HTTPException) as e:
+                # the connection state is unknown after an interruption
+                self._connection_pool.close()
+                attempt += 1
+                if attempt > self.retries:
+                    raise libioc.errors.DownloadFailed(
+                        url=url,
+                        code=str(e),
+                        logger=self.logger
+                    )
+                self.logger.verbose(
+                    f"Download of {url} interrupted ({e}) - retrying"
+                )
+                time.sleep(min(attempt * self.retry_delay, 5))
+
+    def _request(
+        self,
+        url: str,
+        offset: int=0
+    ) -> http.client.HTTPResponse:
+        headers = dict(Connection="keep-alive")
+        if offset > 0:
+            headers["Range"] = f"bytes={offset}-"
+
+        for _ in range(self.max_redirects + 1):
+            parsed_url = urllib.parse.urlparse(url)
+            path = parsed_url.path
+            if parsed_url.query:
+                path = f"{path}?{parsed_url.query}"
+            response = self._connection_pool.request(
+                parsed_url.scheme,
+                parsed_url.netloc,
+                "GET",
+                path,
+                headers=headers
+            )
+
+            if response.status in (301, 302, 303, 307, 308,):
+                response.read()
+                location = response.getheader("Location")
+                if location is None:
+                    break
+                url = urllib.parse.urljoin(url, location)
+                continue
+
+            if response.status in (200, 206, 416,):
+                return response
+
+            response.read()
+            raise libioc.errors.DownloadFailed(
+                url=url,
+                code=response.status,
+                logger=self.logger
+            )
+
+        raise libioc.errors.DownloadFailed(
+            url=url,
+            code="too many redirects",
+            logger=self.logger
+        )
+
+    @staticmethod
+    def _get_total_size(
+        response: http.client.HTTPResponse,
+        offset: int
+    ) -> typing.Optional[int]:
+        content_range = response.getheader("Content-Range")
+        if (response.status == 206) and (content_range is not None):
+            total = content_range.rsplit("/", maxsplit=1)[-1]
+            if total.isdigit():
+                return int(total)
+        content_length = response.getheader("Content-Length")
+        if (content_length is not None) and content_length.isdigit():
+            return offset + int(content_length)
+        return None
+
+    def _download_with_urllib(self, job: DownloadJob) -> None:
+        try:
+            urllib.request.urlretrieve(  # nosec: validated by the caller
+                job.url,
+                job.part_path
+            )
+        except urllib.error.HTTPError as http_error:
+            raise libioc.errors.DownloadFailed(
+                url=job.url,
+                code=http_error.code,
+                logger=self.logger
+            )
+        os.rename(job.part_path, job.path)
+        job.bytes_received = os.stat(job.path).st_size
+        job.bytes_total = job.bytes_received
+        job.done = True
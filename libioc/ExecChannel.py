@@ -0,0 +1,335 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc persistent exec channel module."""
+import typing
+import json
+import os
+import socket
+import struct
+import subprocess  # nosec: B404
+import threading
+import time
+
+import libioc.errors
+import libioc.helpers
+import libioc.helpers_object
+
+_HEADER = struct.Struct("!I")
+
+
+class ExecChannel:
+    """
+    Helper process that executes commands within a running jail.
+
+    JailGenerator.exec() forks /usr/sbin/jexec for every command, which
+    looks up and attaches to the jail from scratch. An ExecChannel forks
+    once, attaches the child to the jail with jail_attach(2) and then
+    serves command requests sent over a UNIX socket pair, so that each
+    command only costs a fork and exec within the jail.
+
+    A channel without jid runs its commands on the host.
+    """
+
+    def __init__(
+        self,
+        jid: typing.Optional[int],
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        self.jid = jid
+        self.pid: typing.Optional[int] = None
+        self.last_used = time.monotonic()
+        self._socket: typing.Optional[socket.socket] = None
+
+    @property
+    def alive(self) -> bool:
+        """Return True while the helper process serves requests."""
+        if (self._socket is None) or (self.pid is None):
+            return False
+        try:
+            pid, _ = os.waitpid(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            pid = self.pid
+        if pid == 0:
+            return True
+        # the helper exited, for example because its jail was stopped
+        self.pid = None
+        self.close()
+        return False
+
+    def open(self) -> None:
+        """Fork the helper process and attach it to the jail."""
+        if self._socket is not None:
+            return
+        parent_socket, child_socket = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent_socket.close()
+            _serve(child_socket, self.jid)
+        child_socket.close()
+        self.pid = pid
+        self._socket = parent_socket
+        try:
+            self._receive()
+        except libioc.errors.ExecChannelFailed:
+            self.close()
+            raise
+        self.logger.spam(
+            f"Exec channel {pid} attached to jail {self.jid}"
+        )
+
+    def close(self) -> None:
+        """Stop the helper process."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self.pid is not None:
+            try:
+                os.waitpid(self.pid, 0)
+            except ChildProcessError:
+                pass
+            self.pid = None
+
+    def exec(
+        self,
+        command: typing.List[str],
+        env: typing.Optional[typing.Dict[str, str]]=None,
+        timeout: typing.Optional[float]=None
+    ) -> libioc.helpers.CommandOutput:
+        """Execute a command through the channel."""
+        self.open()
+        self.logger.spam("Executing (channel): " + " ".join(command))
+        self._send(dict(command=command, env=env, timeout=timeout))
+        response = self._receive()
+        self.last_used = time.monotonic()
+        return (
+            response["stdout"],
+            response["stderr"],
+            response["code"]
+        )
+
+    def _send(self, message: typing.Dict[str, typing.Any]) -> None:
+        try:
+            _send_message(self._socket, message)
+        except OSError as e:
+            self.close()
+            raise libioc.errors.ExecChannelFailed(
+                reason=str(e),
+                logger=self.logger
+            )
+
+    def _receive(self) -> typing.Dict[str, typing.Any]:
+        try:
+            response = _receive_message(self._socket)
+        except (OSError, EOFError) as e:
+            response = dict(error=str(e))
+        if "error" in response.keys():
+            self.close()
+            raise libioc.errors.ExecChannelFailed(
+                reason=response["error"],
+                logger=self.logger
+            )
+        return response
+
+
+class ExecChannelPool:
+    """
+    Process-wide pool of exec channels into running jails.
+
+    Channels are reused per jail. At most max_idle_channels are kept per
+    jail; concurrent callers beyond that get additional channels that are
+    closed after use.
+
+    The idle timeout is applied lazily: there is no reaper thread, because
+    the pool forks its helper processes and a thread holding a lock while
+    forking could deadlock the child. Channels idle for longer than
+    idle_timeout seconds and helpers of vanished jails are closed whenever
+    the pool is used or close_idle() is called. Stopping or destroying a
+    jail closes its channels immediately, and long-running consumers that
+    seldom use the pool should call close_idle() periodically.
+    """
+
+    idle_timeout: float = 60
+    max_idle_channels: int = 4
+
+    __idle_channels: typing.Dict[
+        typing.Optional[int],
+        typing.List[ExecChannel]
+    ] = {}
+    __lock = threading.Lock()
+
+    def __init__(
+        self,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+
+    def acquire(self, jid: typing.Optional[int]) -> ExecChannel:
+        """Return an idle or new channel of the jail."""
+        self.close_idle()
+        with self.__lock:
+            channels = self.__idle_channels.get(jid, [])
+            while len(channels) > 0:
+                channel = channels.pop()
+                if channel.alive is True:
+                    return channel
+        channel = ExecChannel(jid, logger=self.logger)
+        channel.open()
+        return channel
+
+    def release(self, channel: ExecChannel) -> None:
+        """Return a channel to the pool."""
+        if channel.alive is False:
+            return
+        channel.last_used = time.monotonic()
+        with self.__lock:
+            channels = self.__idle_channels.setdefault(channel.jid, [])
+            if len(channels) < self.max_idle_channels:
+                channels.append(channel)
+                return
+        channel.close()
+
+    def exec(
+        self,
+        jid: typing.Optional[int],
+        command: typing.List[str],
+        env: typing.Optional[typing.Dict[str, str]]=None,
+        timeout: typing.Optional[float]=None
+    ) -> libioc.helpers.CommandOutput:
+        """Execute a command in a jail using a pooled channel."""
+        channel = self.acquire(jid)
+        try:
+            return channel.exec(command, env=env, timeout=timeout)
+        finally:
+            self.release(channel)
+
+    def close(self, jid: typing.Optional[int]=None) -> None:
+        """Close the idle channels of one or all jails."""
+        with self.__lock:
+            if jid is None:
+                channels = sum(self.__idle_channels.values(), [])
+                self.__idle_channels.clear()
+            else:
+                channels = self.__idle_channels.pop(jid, [])
+        for channel in channels:
+            channel.close()
+
+    def close_idle(self) -> None:
+        """Close channels that exceeded the idle timeout or died."""
+        expired = []
+        deadline = time.monotonic() - self.idle_timeout
+        with self.__lock:
+            for jid, channels in list(self.__idle_channels.items()):
+                for channel in list(channels):
+                    # reaps helpers that exited with their jail
+                    if (channel.last_used < deadline) or not channel.alive:
+                        channels.remove(channel)
+                        expired.append(channel)
+                if len(channels) == 0:
+                    del self.__idle_channels[jid]
+        for channel in expired:
+            channel.close()
+
+
+def _serve(
+    channel_socket: socket.socket,
+    jid: typing.Optional[int]
+) -> typing.NoReturn:
+    """Attach to the jail and execute requests until the socket closes."""
+    # other channels must see EOF when their parent closes them
+    fileno = channel_socket.fileno()
+    os.closerange(3, fileno)
+    os.closerange(fileno + 1, os.sysconf("SC_OPEN_MAX"))
+    try:
+        if jid is not None:
+            import jail as libjail
+            if libjail.dll.jail_attach(jid) != 0:
+                raise OSError(f"jail_attach to jail {jid} failed")
+        os.chdir("/")
+        _send_message(channel_socket, dict(jid=jid))
+        while True:
+            request = _receive_message(channel_socket)
+            _send_message(channel_socket, _execute(request))
+    except EOFError:
+        os._exit(0)
+    except BaseException as e:
+        try:
+            _send_message(channel_socket, dict(error=str(e)))
+        finally:
+            os._exit(1)
+
+
+def _execute(
+    request: typing.Dict[str, typing.Any]
+) -> typing.Dict[str, typing.Any]:
+    try:
+        child = subprocess.run(  # nosec: B603 command from library code
+            request["command"],
+            env=request["env"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=request["timeout"]
+        )
+    except subprocess.TimeoutExpired:
+        return dict(stdout="", stderr="timed out", code=124)
+    except OSError as e:
+        return dict(stdout="", stderr=str(e), code=127)
+    return dict(
+        stdout=child.stdout.decode("UTF-8", errors="replace").strip(),
+        stderr=child.stderr.decode("UTF-8", errors="replace").strip(),
+        code=child.returncode
+    )
+
+
+def _send_message(
+    channel_socket: typing.Optional[socket.socket],
+    message: typing.Dict[str, typing.Any]
+) -> None:
+    if channel_socket is None:
+        raise OSError("exec channel is closed")
+    data = json.dumps(message).encode("UTF-8")
+    channel_socket.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _receive_message(
+    channel_socket: typing.Optional[socket.socket]
+) -> typing.Dict[str, typing.Any]:
+    if channel_socket is None:
+        raise OSError("exec channel is closed")
+    header = _receive_exactly(channel_socket, _HEADER.size)
+    length, = _HEADER.unpack(header)
+    message: typing.Dict[str, typing.Any]
+    message = json.loads(_receive_exactly(channel_socket, length))
+    return message
+
+
+def _receive_exactly(channel_socket: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = channel_socket.recv(size - len(data))
+        if chunk == b"":
+            raise EOFError("exec channel closed")
+        data += chunk
+    return data
@@ -24,6 +24,7 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """ioc firewall module."""
 import typing
+import tempfile
 
 import freebsd_sysctl
 
@@ -110,6 +111,40 @@ class Firewall:
 
         self._exec(command)
 
+    def transaction(self) -> 'FirewallTransaction':
+        """Return a transaction that batches rule changes."""
+        return FirewallTransaction(firewall=self, logger=self.logger)
+
+    def list_rules(
+        self,
+        rule_numbers: typing.Optional[typing.List[str]]=None
+    ) -> typing.List[str]:
+        """
+        Return the current ruleset lines.
+
+        Args:
+
+            rule_numbers (list[str]): (optional)
+
+                Limit the listing to these (already offset) rule numbers.
+        """
+        command = [self.IPFW_COMMAND, "list"]
+        if rule_numbers is not None:
+            command += rule_numbers
+        try:
+            stdout, _, _ = libioc.helpers.exec(
+                command,
+                logger=self.logger,
+                ignore_error=True
+            )
+        except libioc.errors.CommandFailure:
+            raise libioc.errors.FirewallCommandFailure(
+                logger=self.logger
+            )
+        if stdout is None:
+            return []
+        return stdout.splitlines()
+
     def _offset_rule_number(
         self,
         rule_number: typing.Union[int, str],
@@ -135,3 +170,146 @@ class Firewall:
             raise libioc.errors.FirewallCommandFailure(
                 logger=self.logger
             )
+
+
+class FirewallTransaction:
+    """
+    Batch of firewall rule changes applied with a single ipfw invocation.
+
+    Rules are collected in memory and written to a temporary file that ipfw
+    processes line by line. All rules of a jail share the same rule number,
+    so that deleting the number atomically removes the jail's whole ruleset.
+
+    A transaction covers the network setup or teardown of one jail. The
+    rules of a jail must be active before its start hook runs, so jails
+    started in a batch commit their transactions one after another instead
+    of sharing one.
+    """
+
+    firewall: Firewall
+    commands: typing.List[typing.List[str]]
+    expected_rule_counts: typing.Dict[str, int]
+
+    def __init__(
+        self,
+        firewall: Firewall,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        self.firewall = firewall
+        self.clear()
+
+    def clear(self) -> None:
+        """Discard all queued rule changes."""
+        self.commands = []
+        self.expected_rule_counts = {}
+
+    def __len__(self) -> int:
+        """Return the number of queued ipfw commands."""
+        return len(self.commands)
+
+    def delete_rule(
+        self,
+        rule_number: typing.Union[int, str],
+        insecure: bool=False
+    ) -> None:
+        """Queue the deletion of all rules with the given number."""
+        _rule_number = self.firewall._offset_rule_number(
+            rule_number,
+            insecure=insecure
+        )
+        self.commands.append(["delete", _rule_number])
+        self.expected_rule_counts[_rule_number] = 0
+
+    def add_rule(
+        self,
+        rule_number: typing.Union[int, str],
+        rule_arguments: typing.List[str],
+        insecure: bool=False
+    ) -> None:
+        """Queue a rule that is added to the firewall configuration."""
+        _rule_number = self.firewall._offset_rule_number(
+            rule_number,
+            insecure=insecure
+        )
+        self.commands.append(["add", _rule_number] + rule_arguments)
+        expected_count = self.expected_rule_counts.get(_rule_number, 0)
+        self.expected_rule_counts[_rule_number] = expected_count + 1
+
+    @property
+    def batch(self) -> str:
+        """Return the content of the ipfw batch file."""
+        return "\n".join([" ".join(command) for command in self.commands])
+
+    def commit(self, verify: bool=True) -> None:
+        """
+        Apply all queued rule changes at once.
+
+        Args:
+
+            verify (bool): (default=True)
+
+                Compare the installed rules with the queued ones using a
+                single ruleset listing.
+        """
+        if len(self.commands) == 0:
+            return
+
+        self.logger.verbose(
+            f"Applying {len(self.commands)} firewall rule changes"
+        )
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            prefix="ioc-ipfw-",
+            suffix=".rules",
+            encoding="UTF-8"
+        ) as batch_file:
+            batch_file.write(self.batch + "\n")
+            batch_file.flush()
+            # deleting absent rules fails, which is expected on teardown,
+            # so added rules are checked by the ruleset listing instead
+            self.firewall._exec(
+                [self.firewall.IPFW_COMMAND, "-q", "-f", batch_file.name],
+                ignore_error=(verify is True) or (self._has_additions is False)
+            )
+
+        if verify is True:
+            self.verify()
+        self.clear()
+
+    @property
+    def _added_rule_numbers(self) -> typing.List[str]:
+        return [
+            rule_number
+            for rule_number, count in self.expected_rule_counts.items()
+            if count > 0
+        ]
+
+    @property
+    def _has_additions(self) -> bool:
+        return len(self._added_rule_numbers) > 0
+
+    def verify(self) -> None:
+        """Raise when the ruleset does not contain the queued rules."""
+        added_rule_numbers = self._added_rule_numbers
+        if len(added_rule_numbers) == 0:
+            return
+
+        found_rule_counts: typing.Dict[str, int] = {}
+        for line in self.firewall.list_rules(added_rule_numbers):
+            rule_number = line.split(" ", maxsplit=1)[0].lstrip("0")
+            found_count = found_rule_counts.get(rule_number, 0)
+            found_rule_counts[rule_number] = found_count + 1
+
+        for rule_number in added_rule_numbers:
+            expected_count = self.expected_rule_counts[rule_number]
+            found_count = found_rule_counts.get(rule_number, 0)
+            if found_count < expected_count:
+                self.logger.verbose(
+                    f"Firewall rule {rule_number} has {found_count} "
+                    f"entries, but {expected_count} were added"
+                )
+                raise libioc.errors.FirewallCommandFailure(
+                    logger=self.logger
+                )
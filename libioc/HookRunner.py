@@ -0,0 +1,367 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc hook runner module."""
+import typing
+import asyncio
+import collections
+import datetime
+import os
+import os.path
+import signal
+
+import libioc.errors
+import libioc.helpers
+import libioc.helpers_object
+
+# (stream name, line) tuples emitted while a hook is running
+HookOutputLine = typing.Tuple[str, str]
+# output of a finished hook or the exception it raised
+HookResult = typing.Union[libioc.helpers.CommandOutput, BaseException]
+
+
+class HookLogFile:
+    """Size-rotated log file that receives the hook output of one jail."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int=1024 * 1024,
+        backup_count: int=5
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file: typing.Optional[typing.TextIO] = None
+
+    def open(self) -> None:
+        """Open the log file for appending and rotate it when too large."""
+        if self._file is not None:
+            return
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        self._rotate_if_required()
+        self._file = open(self.path, "a", encoding="UTF-8")
+
+    def close(self) -> None:
+        """Close the log file."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+    def write(self, hook: str, stream: str, line: str) -> None:
+        """Append a line of hook output."""
+        if self._file is None:
+            self.open()
+        timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+        # cast for mypy: open() assigned the file handle
+        log_file = typing.cast(typing.TextIO, self._file)
+        log_file.write(f"{timestamp} {hook} {stream}: {line}\n")
+        log_file.flush()
+        if log_file.tell() >= self.max_bytes:
+            self.close()
+            self.open()
+
+    def _rotate_if_required(self) -> None:
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        for i in reversed(range(1, self.backup_count)):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source) is True:
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class HookCommand:
+    """A hook command scheduled on the HookRunner."""
+
+    def __init__(
+        self,
+        command: typing.List[str],
+        hook: str,
+        env: typing.Optional[typing.Dict[str, str]]=None,
+        timeout: typing.Optional[float]=None,
+        log_file: typing.Optional[HookLogFile]=None
+    ) -> None:
+        self.command = command
+        self.hook = hook
+        self.env = env
+        self.timeout = timeout
+        self.log_file = log_file
+
+
+class HookRunner:
+    """
+    Run jail hooks as asyncio subprocesses.
+
+    The stdout and stderr of a hook are read line by line instead of being
+    buffered until the command exits. Each line is written to the log file
+    of the hook and handed to the caller while the hook keeps running.
+    Only the last lines of each stream are kept for the returned output.
+    Hooks of independent jails can be run concurrently with run().
+    """
+
+    # seconds to keep reading output after the hook process exited
+    drain_timeout: float = 1
+    # trailing output lines per stream that are kept for error messages
+    output_tail_lines: int = 100
+
+    def __init__(
+        self,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+
+    def run(
+        self,
+        hook_commands: typing.List[HookCommand]
+    ) -> typing.List[HookResult]:
+        """
+        Run multiple hook commands concurrently.
+
+        Returns the CommandOutput of each hook in the order of the input.
+        Hooks that timed out or were cancelled are represented by the
+        exception they raised, so that one failing hook does not abort the
+        others.
+        """
+        async def _run_all() -> typing.List[typing.Any]:
+            return list(await asyncio.gather(
+                *[self.run_command(x) for x in hook_commands],
+                return_exceptions=True
+            ))
+        return asyncio.run(_run_all())
+
+    def stream(
+        self,
+        hook_command: HookCommand
+    ) -> typing.Generator[HookOutputLine, None, libioc.helpers.CommandOutput]:
+        """
+        Run a single hook command and yield its output lines.
+
+        The generator returns the CommandOutput of the hook. Closing the
+        generator or interrupting it kills the hook process.
+        """
+        loop = asyncio.new_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        task = loop.create_task(self.run_command(hook_command, queue=queue))
+        try:
+            while True:
+                getter = loop.create_task(queue.get())
+                loop.run_until_complete(asyncio.wait(
+                    [task, getter],
+                    return_when=asyncio.FIRST_COMPLETED
+                ))
+                if getter.done() is True:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                loop.run_until_complete(asyncio.gather(
+                    getter,
+                    return_exceptions=True
+                ))
+                while queue.empty() is False:
+                    yield queue.get_nowait()
+                break
+            output: libioc.helpers.CommandOutput = task.result()
+            return output
+        finally:
+            if task.done() is False:
+                task.cancel()
+                loop.run_until_complete(asyncio.gather(
+                    task,
+                    return_exceptions=True
+                ))
+            loop.close()
+
+    async def run_command(
+        self,
+        hook_command: HookCommand,
+        queue: typing.Optional[asyncio.Queue]=None
+    ) -> libioc.helpers.CommandOutput:
+        """
+        Run a hook command and stream its output.
+
+        The returned CommandOutput contains the last output_tail_lines of
+        stdout and stderr, while the full output only reaches the log file
+        and the queue.
+        """
+        command_str = " ".join(hook_command.command)
+        self.logger.spam(f"Executing (async): {command_str}")
+
+        log_file = hook_command.log_file
+        if log_file is not None:
+            log_file.open()
+
+        stdout_lines: typing.Deque[str] = collections.deque(
+            maxlen=self.output_tail_lines
+        )
+        stderr_lines: typing.Deque[str] = collections.deque(
+            maxlen=self.output_tail_lines
+        )
+        try:
+            # the pipes are owned here, because daemons started by the hook
+            # may keep them open after the hook process exited
+            stdout_fd, stdout_write_fd = os.pipe()
+            stderr_fd, stderr_write_fd = os.pipe()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *hook_command.command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=stdout_write_fd,
+                    stderr=stderr_write_fd,
+                    env=hook_command.env,
+                    # a process group allows to kill the spawned commands
+                    start_new_session=True
+                )
+            except BaseException:
+                os.close(stdout_fd)
+                os.close(stderr_fd)
+                raise
+            finally:
+                os.close(stdout_write_fd)
+                os.close(stderr_write_fd)
+
+            try:
+                returncode = await asyncio.wait_for(
+                    self._communicate(
+                        process,
+                        hook_command,
+                        (
+                            (stdout_fd, "stdout", stdout_lines,),
+                            (stderr_fd, "stderr", stderr_lines,)
+                        ),
+                        queue
+                    ),
+                    timeout=hook_command.timeout
+                )
+            except asyncio.TimeoutError:
+                self._kill(process)
+                raise libioc.errors.CommandTimeout(
+                    # cast for mypy: wait_for only times out with a timeout
+                    timeout=typing.cast(float, hook_command.timeout),
+                    logger=self.logger
+                )
+            except BaseException:
+                # cancelled or interrupted hooks do not outlive the runner
+                self._kill(process)
+                raise
+        finally:
+            if log_file is not None:
+                log_file.close()
+
+        if returncode > 0:
+            self.logger.spam(
+                f"Command exited with {returncode}: {command_str}"
+            )
+        return (
+            "\n".join(stdout_lines).strip(),
+            "\n".join(stderr_lines).strip(),
+            returncode
+        )
+
+    async def _communicate(
+        self,
+        process: asyncio.subprocess.Process,
+        hook_command: HookCommand,
+        pipes: typing.Iterable[typing.Tuple[int, str, typing.Deque[str]]],
+        queue: typing.Optional[asyncio.Queue]
+    ) -> int:
+        loop = asyncio.get_running_loop()
+        transports: typing.List[asyncio.ReadTransport] = []
+        readers: typing.List[typing.Coroutine[typing.Any, typing.Any, None]]
+        readers = []
+        reading: typing.Optional[asyncio.Future] = None
+        try:
+            for fd, stream_name, lines in pipes:
+                pipe = os.fdopen(fd, "rb", buffering=0)
+                stream = asyncio.StreamReader()
+                try:
+                    transport, _ = await loop.connect_read_pipe(
+                        lambda: asyncio.StreamReaderProtocol(stream),
+                        pipe
+                    )
+                except BaseException:
+                    pipe.close()
+                    raise
+                transports.append(transport)
+                readers.append(self._read_lines(
+                    stream,
+                    stream_name,
+                    lines,
+                    hook_command,
+                    queue
+                ))
+            reading = asyncio.ensure_future(asyncio.gather(*readers))
+            readers = []
+            returncode = await process.wait()
+            # daemons started by the hook may hold the pipes open
+            await asyncio.wait([reading], timeout=self.drain_timeout)
+            if reading.done() is True:
+                reading.result()
+            return returncode
+        finally:
+            for reader in readers:
+                # coroutines of pipes that could not be connected
+                reader.close()
+            if reading is not None:
+                reading.cancel()
+                await asyncio.gather(reading, return_exceptions=True)
+            for transport in transports:
+                transport.close()
+
+    async def _read_lines(
+        self,
+        stream: typing.Optional[asyncio.StreamReader],
+        stream_name: str,
+        lines: typing.Deque[str],
+        hook_command: HookCommand,
+        queue: typing.Optional[asyncio.Queue]
+    ) -> None:
+        if stream is None:
+            return
+        while True:
+            data = await stream.readline()
+            if data == b"":
+                return
+            line = data.decode("UTF-8", errors="replace").rstrip("\n")
+            lines.append(line)
+            if hook_command.log_file is not None:
+                hook_command.log_file.write(
+                    hook_command.hook,
+                    stream_name,
+                    line
+                )
+            if queue is not None:
+                queue.put_nowait((stream_name, line,))
+
+    def _kill(self, process: asyncio.subprocess.Process) -> None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
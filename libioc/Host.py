@@ -35,6 +35,8 @@ import uuid
 import libioc.Datasets
 import libioc.DevfsRules
 import libioc.Distribution
+import libioc.IdentityMap
+import libioc.MetadataCache
 import libioc.Resource
 import libioc.helpers
 import libioc.helpers_object
@@ -62,6 +64,8 @@ class HostGenerator:
     __user_provided_defaults: typing.Optional[libioc.Resource.DefaultResource]
     releases_dataset: libzfs.ZFSDataset
     datasets: libioc.Datasets.Datasets
+    identity_map: libioc.IdentityMap.IdentityMap
+    metadata_cache: libioc.MetadataCache.MetadataCache
     distribution: _distribution_types
 
     __branch_pattern = re.compile(
@@ -88,6 +92,10 @@ class HostGenerator:
 
         self.logger = libioc.helpers_object.init_logger(self, logger)
         self.zfs = libioc.helpers_object.init_zfs(self, zfs)
+        self.identity_map = libioc.IdentityMap.IdentityMap()
+        self.metadata_cache = libioc.MetadataCache.MetadataCache(
+            logger=self.logger
+        )
 
         if datasets is not None:
             self.datasets = datasets
@@ -0,0 +1,95 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc resource identity map module."""
+import typing
+import threading
+import weakref
+
+IdentityKey = typing.Tuple[typing.Optional[str], type, str]
+_ResourceType = typing.TypeVar("_ResourceType")
+
+
+class IdentityMap:
+    """
+    Registry of the resource instances loaded by a host.
+
+    Resources are keyed by their root datasets source, their class and
+    their name. Instances are only weakly referenced, so that they are
+    loaded once while in use and released when no longer referenced.
+    Resources that are renamed or destroyed must be discarded explicitly.
+    """
+
+    def __init__(self) -> None:
+        self._resources: weakref.WeakValueDictionary[
+            IdentityKey,
+            typing.Any
+        ] = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    def get_or_create(
+        self,
+        source: typing.Optional[str],
+        kind: typing.Type[_ResourceType],
+        name: str,
+        factory: typing.Callable[[], _ResourceType]
+    ) -> _ResourceType:
+        """Return the shared resource instance or create it."""
+        key: IdentityKey = (source, kind, name,)
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                resource = factory()
+                self._resources[key] = resource
+            # cast for mypy: the key's kind determines the value type
+            return typing.cast(_ResourceType, resource)
+
+    def get(
+        self,
+        source: typing.Optional[str],
+        kind: typing.Type[_ResourceType],
+        name: str
+    ) -> typing.Optional[_ResourceType]:
+        """Return the shared resource instance if it is loaded."""
+        with self._lock:
+            resource = self._resources.get((source, kind, name,))
+            return typing.cast(typing.Optional[_ResourceType], resource)
+
+    def discard(self, resource: typing.Any) -> None:
+        """Forget all keys of a resource instance."""
+        with self._lock:
+            keys = [
+                key for key, value in self._resources.items()
+                if value is resource
+            ]
+            for key in keys:
+                del self._resources[key]
+
+    def clear(self) -> None:
+        """Forget all resource instances."""
+        with self._lock:
+            self._resources.clear()
+
+    def __len__(self) -> int:
+        """Return the number of loaded resource instances."""
+        return len(self._resources)
@@ -35,6 +35,7 @@ storage as ZFS properties on the jails ZFS dataset are supported as well.
 The state of a Jail is managed by the kernel, that ioc interfaces with libc.
 """
 import typing
+import json
 import os
 import shlex
 import shutil
@@ -52,7 +53,11 @@ import libioc.events
 import libioc.helpers
 import libioc.helpers_object
 import libioc.DevfsRules
+import libioc.ExecChannel
+import libioc.Firewall
+import libioc.HookRunner
 import libioc.Host
+import libioc.MountTable
 import libioc.Config.Jail.BaseConfig
 import libioc.Config.Jail.JailConfig
 import libioc.Network
@@ -81,6 +86,22 @@ except OSError:
     import ctypes.util
     _dll = ctypes.CDLL(str(ctypes.util.find_library("c")), use_errno=True)
 
+BasejailStorage = libioc.Storage.Basejail.BasejailStorage
+NullFSBasejailStorage = libioc.Storage.NullFSBasejail.NullFSBasejailStorage
+
+
+# jail params whose launch values are not read from the config directly
+_COMPUTED_LAUNCH_PARAMS = frozenset([
+    "security.jail.param.devfs_ruleset",
+    "security.jail.param.path",
+    "security.jail.param.name",
+    "security.jail.param.host.hostuuid",
+    "security.jail.param.allow.mount.zfs",
+    "security.jail.param.vnet",
+    "security.jail.param.ip4.addr",
+    "security.jail.param.ip6.addr",
+])
+
 
 class JailResource(
     libioc.LaunchableResource.LaunchableResource,
@@ -323,6 +344,8 @@ class JailGenerator(JailResource):
 
     _class_storage = libioc.Storage.Storage
     _provisioner: 'libioc.Provisioning.Provisioner'
+    # /var/run is cleared on boot, so no applied state outlives the host
+    applied_state_dir: str = "/var/run/iocage/applied_state"
     __jid: typing.Optional[int]
 
     def __init__(
@@ -437,7 +460,11 @@ class JailGenerator(JailResource):
         event_scope: typing.Optional['libioc.events.Scope']=None,
         dependant_jails_seen: typing.List['JailGenerator']=[],
         start_dependant_jails: bool=True,
-        env: typing.Dict[str, str]={}
+        env: typing.Dict[str, str]={},
+        prestart_hook_result: typing.Optional[
+            'libioc.HookRunner.HookResult'
+        ]=None,
+        defer_poststart_hook: bool=False
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
         Start the jail.
@@ -448,7 +475,9 @@ class JailGenerator(JailResource):
 
                 Skip several operations that are not required when a jail
                 was unchanged since its last start (for example when restarting
-                it).
+                it). Resource limits, non-VNET addresses, fstab mounts and the
+                jail storage that were kept by a quick restart are reattached
+                when their configuration did not change.
 
             passthru (bool):
 
@@ -482,6 +511,16 @@ class JailGenerator(JailResource):
                 Environment variables that are available in all jail hooks.
                 Existing environment variables (provided by the system or ioc)
                 can be overridden with entries in this dictionary.
+
+            prestart_hook_result (tuple|Exception):
+
+                The result of a prestart hook that was already run by a batch
+                start. The hook is not run again.
+
+            defer_poststart_hook (bool):
+
+                Leave the poststart hook to the caller, so that a batch start
+                can run the poststart hooks of all jails concurrently.
         """
         self.require_jail_existing()
         self.require_jail_stopped()
@@ -493,6 +532,12 @@ class JailGenerator(JailResource):
         )
         yield jailStartEvent.begin()
 
+        # mount checks during the start are answered from one snapshot
+        libioc.MountTable.MountTable(logger=self.logger).refresh()
+        preserved: typing.Set[str] = set()
+        if quick is True:
+            preserved = self._get_preserved_state()
+
         # Start Dependant Jails
         dependant_jails_started: typing.List[JailGenerator] = []
         if start_dependant_jails is True:
@@ -518,20 +563,32 @@ class JailGenerator(JailResource):
             raise e
 
         # Apply Resource Limits
-        yield from self._apply_resource_limits(
-            event_scope=jailStartEvent.scope
-        )
+        if "resource_limits" in preserved:
+            yield from self.__skip_preserved(
+                libioc.events.JailResourceLimitAction,
+                event_scope=jailStartEvent.scope
+            )
+        else:
+            yield from self._apply_resource_limits(
+                event_scope=jailStartEvent.scope
+            )
 
         # Prestart Hook
         yield from self.__run_hook(
             "prestart",
             force=False,
             event_scope=jailStartEvent.scope,
-            env=env
+            env=env,
+            hook_result=prestart_hook_result
         )
 
         # Basejail Actions
-        if self.is_basejail is True:
+        if "storage" in preserved:
+            yield from self.__skip_preserved(
+                libioc.events.BasejailStorageConfig,
+                event_scope=jailStartEvent.scope
+            )
+        elif self.is_basejail is True:
             # cast for mypy: unbound backend methods take Storage as self
             yield from typing.cast(typing.Any, self.storage_backend).apply(
                 self.storage,
@@ -540,7 +597,13 @@ class JailGenerator(JailResource):
             )
 
         # Jail Fstab
-        yield from self.fstab.mount(event_scope=jailStartEvent.scope)
+        if "fstab" in preserved:
+            yield from self.__skip_preserved(
+                libioc.events.MountFstab,
+                event_scope=jailStartEvent.scope
+            )
+        else:
+            yield from self.fstab.mount(event_scope=jailStartEvent.scope)
 
         # Jail Creation
         jailAttachEvent = libioc.events.JailAttach(
@@ -619,14 +682,30 @@ class JailGenerator(JailResource):
             env=env
         )
 
-        # Mount Devfs
-        yield from self.__mount_devfs(jailStartEvent.scope)
+        if "storage" in preserved:
+            yield from self.__skip_preserved(
+                libioc.events.MountDevFS,
+                event_scope=jailStartEvent.scope
+            )
+            yield from self.__skip_preserved(
+                libioc.events.MountFdescfs,
+                event_scope=jailStartEvent.scope
+            )
+        else:
+            # Mount Devfs
+            yield from self.__mount_devfs(jailStartEvent.scope)
 
-        # Mount Fdescfs
-        yield from self.__mount_fdescfs(jailStartEvent.scope)
+            # Mount Fdescfs
+            yield from self.__mount_fdescfs(jailStartEvent.scope)
 
         # Setup Network
-        yield from self.__start_network(jailStartEvent.scope)
+        if "network" in preserved:
+            yield from self.__skip_preserved(
+                libioc.events.JailNetworkSetup,
+                event_scope=jailStartEvent.scope
+            )
+        else:
+            yield from self.__start_network(jailStartEvent.scope)
 
         # Attach shared ZFS datasets
         if self.config["jail_zfs"] is True:
@@ -645,6 +724,9 @@ class JailGenerator(JailResource):
                 )
             self._save_autoconfig()
 
+        if single_command is None:
+            self._save_applied_state()
+
         try:
             if single_command is None:
                 # Start and Poststart Hooks
@@ -654,12 +736,13 @@ class JailGenerator(JailResource):
                     event_scope=jailStartEvent.scope,
                     env=env
                 )
-                yield from self.__run_hook(
-                    "poststart",
-                    force=False,
-                    event_scope=jailStartEvent.scope,
-                    env=env
-                )
+                if defer_poststart_hook is False:
+                    yield from self.__run_hook(
+                        "poststart",
+                        force=False,
+                        event_scope=jailStartEvent.scope,
+                        env=env
+                    )
             else:
                 yield from self.__run_hook(
                     "command",
@@ -677,6 +760,18 @@ class JailGenerator(JailResource):
             yield from _stop_jails()
         yield jailStartEvent.end()
 
+    def __skip_preserved(
+        self,
+        event: typing.Type['libioc.events.JailEvent'],
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        _event = event(
+            jail=self,
+            scope=event_scope
+        )
+        yield _event.begin()
+        yield _event.skip("unchanged")
+
     def __mount_devfs(
         self,
         event_scope: typing.Optional['libioc.events.Scope']=None
@@ -898,17 +993,16 @@ class JailGenerator(JailResource):
         self.require_jail_stopped()
 
         original_config = self.config
-        config_data = original_config.data
-
-        for key, value in temporary_config_override.items():
-            config_data[key] = value
-
-        self.config = libioc.Config.Jail.JailConfig.JailConfig(
-            host=self.host,
-            jail=self,
-            logger=self.logger
-        )
-        self.config.clone(original_config.data)
+        if len(temporary_config_override) > 0:
+            overlay_config = libioc.Config.Jail.JailConfig.JailConfigOverlay(
+                original_config,
+                logger=self.logger
+            )
+            overlay_config.set_dict(
+                temporary_config_override,
+                explicit=False
+            )
+            self.config = overlay_config
 
         try:
             yield from JailGenerator.start(
@@ -939,24 +1033,62 @@ class JailGenerator(JailResource):
 
         return _env
 
+    def _get_hook_command(
+        self,
+        hook: str,
+        script: typing.Optional[str]=None,
+        env: typing.Dict[str, str]={}
+    ) -> typing.Optional['libioc.HookRunner.HookCommand']:
+        """Return the command of a hook or None when it is not configured."""
+        if script is None:
+            config_value = self.config[f"exec_{hook}"]
+            if config_value is None:
+                return None
+            script = str(config_value)
+
+        command = ["/bin/sh", "-c", script]
+        if hook in ("start", "stop",):
+            command = ["/usr/sbin/jexec", str(self.jid)] + command
+        return libioc.HookRunner.HookCommand(
+            command=command,
+            hook=hook,
+            env=self.__merge_env(env),
+            timeout=self.__hook_timeout,
+            log_file=self.hook_log_file
+        )
+
+    def run_hook(
+        self,
+        hook: str,
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        hook_result: typing.Optional['libioc.HookRunner.HookResult']=None,
+        force: bool=False,
+        env: typing.Dict[str, str]={}
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """
+        Run a jail hook or report the result of a hook that already ran.
+
+        Batch starts run the hooks of independent jails concurrently with
+        HookRunner.run() and pass the result of each hook as hook_result.
+        """
+        yield from self.__run_hook(
+            hook,
+            force=force,
+            event_scope=event_scope,
+            hook_result=hook_result,
+            env=env
+        )
+
     def __run_hook(
         self,
         hook: str,
         force: bool,
-        event_scope: 'libioc.events.Scope',
+        event_scope: typing.Optional['libioc.events.Scope'],
         script: typing.Optional[str]=None,
         passthru: bool=False,
-        env: typing.Dict[str, str]={}
+        env: typing.Dict[str, str]={},
+        hook_result: typing.Optional['libioc.HookRunner.HookResult']=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
-        _env = self.__merge_env(env)
-        exec_func: typing.Callable[
-            ...,
-            libioc.helpers.CommandOutput
-        ] = libioc.helpers.exec
-        exec_args: typing.Dict[str, typing.Any] = dict(
-            logger=self.logger,
-            env=_env
-        )
         Event: typing.Type[libioc.events.JailHook]
         event: libioc.events.JailHook
         if hook == "prestart":
@@ -965,12 +1097,8 @@ class JailGenerator(JailResource):
             Event = libioc.events.JailHookCreated
         elif hook == "start":
             Event = libioc.events.JailHookStart
-            exec_func = self.exec
-            exec_args = dict(env=_env)
         elif hook == "command":
             Event = libioc.events.JailCommand
-            exec_func = self.exec
-            exec_args = dict(passthru=passthru, env=_env)
         elif hook == "poststart":
             Event = libioc.events.JailHookPoststart
         elif hook == "prestop":
@@ -982,8 +1110,6 @@ class JailGenerator(JailResource):
                 yield event.begin()
                 yield event.skip("not running")
                 return
-            exec_func = self.exec
-            exec_args = dict(env=_env)
         elif hook == "poststop":
             Event = libioc.events.JailHookPoststop
         else:
@@ -992,17 +1118,46 @@ class JailGenerator(JailResource):
         event = Event(self, scope=event_scope)
         yield event.begin()
 
-        if script is None:
-            config_value = self.config[f"exec_{hook}"]
-            if config_value is None:
-                yield event.skip()
+        hook_command = self._get_hook_command(hook, script=script, env=env)
+        if hook_command is None:
+            yield event.skip()
+            return
+
+        try:
+            if hook == "command":
+                # user commands keep their interactive pty
+                stdout, stderr, code = self.exec(
+                    hook_command.command,
+                    passthru=passthru,
+                    env=self.__merge_env(env)
+                )
+            elif hook_result is not None:
+                if isinstance(hook_result, BaseException):
+                    raise hook_result
+                stdout, stderr, code = hook_result
+            else:
+                stdout, stderr, code = yield from self.__stream_hook(
+                    hook_command,
+                    event_scope=event.scope
+                )
+        except libioc.errors.CommandTimeout as e:
+            if force is True:
+                yield event.skip("ERROR")
                 return
-            script = str(config_value)
+            yield event.fail(e)
+            raise libioc.errors.JailHookFailed(
+                jail=self,
+                hook=hook,
+                reason=str(e),
+                logger=self.logger
+            )
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            # interrupts propagate after the hook process was killed
+            yield event.fail(e)
+            raise
 
-        stdout, stderr, code = exec_func(
-            ["/bin/sh", "-c", script],
-            **exec_args
-        )
         event.stdout = stdout
         # stderr and code are only declared on the JailCommand event
         event.stderr = stderr  # type: ignore[union-attr]
@@ -1021,12 +1176,61 @@ class JailGenerator(JailResource):
             # cast for mypy: JailHook.end() tolerates None stdout (passthru)
             yield event.end(stdout=typing.cast(str, stdout))
 
+    def __stream_hook(
+        self,
+        hook_command: 'libioc.HookRunner.HookCommand',
+        event_scope: typing.Optional['libioc.events.Scope']
+    ) -> typing.Generator[
+        'libioc.events.IocEvent',
+        None,
+        'libioc.helpers.CommandOutput'
+    ]:
+        hook_output = libioc.HookRunner.HookRunner(
+            logger=self.logger
+        ).stream(hook_command)
+        outputEvent = libioc.events.JailHookOutput(
+            jail=self,
+            hook=hook_command.hook,
+            scope=event_scope
+        )
+        yield outputEvent.begin()
+        try:
+            while True:
+                stream_name, line = next(hook_output)
+                self.logger.spam(line, indent=1)
+                yield outputEvent.step(stream=stream_name, line=line)
+        except StopIteration as return_statement:
+            yield outputEvent.end()
+            output: libioc.helpers.CommandOutput = return_statement.value
+            return output
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            yield outputEvent.fail(e)
+            raise
+
+    @property
+    def __hook_timeout(self) -> typing.Optional[float]:
+        try:
+            timeout = float(self.config["exec_timeout"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return timeout if (timeout > 0) else None
+
+    @property
+    def hook_log_file(self) -> 'libioc.HookRunner.HookLogFile':
+        """Return the rotated log file that receives the jail hook output."""
+        return libioc.HookRunner.HookLogFile(
+            f"{self.logger.log_directory}/hooks/{self.identifier}.log"
+        )
+
     def stop(
         self,
         force: bool=False,
         event_scope: typing.Optional['libioc.events.Scope']=None,
         log_errors: bool=True,
-        env: typing.Dict[str, str]={}
+        env: typing.Dict[str, str]={},
+        preserve: typing.Collection[str]=()
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
         Stop a jail.
@@ -1053,6 +1257,12 @@ class JailGenerator(JailResource):
                 Environment variables that are available in all jail hooks.
                 Existing environment variables (provided by the system or ioc)
                 can be overridden with entries in this dictionary.
+
+            preserve (list[str]): (default=[])
+
+                Components of the applied state that remain in place for a
+                following quick start. Supported are `resource_limits`,
+                `network` (non-VNET addresses), `fstab` and `storage`.
         """
         if force is False:
             self.require_jail_existing(log_errors=log_errors)
@@ -1062,6 +1272,7 @@ class JailGenerator(JailResource):
         jailStopEvent = events.JailStop(self, scope=event_scope)
 
         yield jailStopEvent.begin()
+        libioc.MountTable.MountTable(logger=self.logger).refresh()
         jid = self.jid
 
         yield from self.__run_hook(
@@ -1077,7 +1288,7 @@ class JailGenerator(JailResource):
             env=env
         )
         yield from self.__destroy_jail(jailStopEvent.scope)
-        if self.config["vnet"] is False:
+        if (self.config["vnet"] is False) and ("network" not in preserve):
             yield from self._stop_non_vimage_network(
                 force=force,
                 event_scope=jailStopEvent.scope
@@ -1092,13 +1303,24 @@ class JailGenerator(JailResource):
                 jid,
                 event_scope=jailStopEvent.scope
             )
-        yield from self.fstab.unmount(event_scope=jailStopEvent.scope)
-        # cast for mypy: unbound backend methods take Storage as self
-        yield from typing.cast(typing.Any, self.storage_backend).teardown(
-            self.storage,
-            event_scope=jailStopEvent.scope
-        )
-        yield from self.__clear_resource_limits(force, jailStopEvent.scope)
+        if "fstab" not in preserve:
+            yield from self.fstab.unmount(event_scope=jailStopEvent.scope)
+        if "storage" in preserve:
+            # basejail and device mounts remain, other system mounts don't
+            yield from libioc.Storage.Storage.teardown(
+                self.storage,
+                event_scope=jailStopEvent.scope,
+                keep_devices=True
+            )
+        else:
+            # cast for mypy: unbound backend methods take Storage as self
+            yield from typing.cast(typing.Any, self.storage_backend).teardown(
+                self.storage,
+                event_scope=jailStopEvent.scope
+            )
+        if "resource_limits" not in preserve:
+            yield from self.__clear_resource_limits(force, jailStopEvent.scope)
+        self._save_applied_state(preserve)
 
         yield jailStopEvent.end()
 
@@ -1106,14 +1328,177 @@ class JailGenerator(JailResource):
     def _jail_conf_file(self) -> str:
         return f"{self.launch_script_dir}/jail.conf"
 
+    @property
+    def _applied_state_file(self) -> str:
+        return f"{self.applied_state_dir}/{self.identifier}.json"
+
+    def _get_applied_state(self) -> typing.Dict[str, typing.Dict[str, list]]:
+        """
+        Return the host resources a start applies with the current config.
+
+        Each component maps to a fingerprint of the configuration it was
+        derived from and the mountpoints it leaves on the host. VNET
+        interfaces do not outlive the jail and are therefore not listed.
+        """
+        state: typing.Dict[str, typing.Dict[str, list]] = dict()
+
+        state["resource_limits"] = dict(
+            fingerprint=self.__resource_limit_rules,
+            mountpoints=[]
+        )
+
+        if self.config["vnet"] is False:
+            state["network"] = dict(
+                fingerprint=[
+                    str(self.config["ip4_addr"]),
+                    str(self.config["ip6_addr"])
+                ],
+                mountpoints=[]
+            )
+
+        fstab_lines = [
+            x for x in self.fstab
+            if isinstance(x, libioc.Config.Jail.File.Fstab.FstabLine)
+        ]
+        state["fstab"] = dict(
+            fingerprint=[str(x) for x in fstab_lines],
+            mountpoints=[str(x["destination"]) for x in fstab_lines]
+        )
+
+        storage_fingerprint = [
+            str(self.storage_backend),
+            str(self.config["release"]) if self.is_basejail else "",
+            str(self.config["mount_devfs"]),
+            str(self.config["devfs_ruleset"]),
+            str(self.config["mount_fdescfs"])
+        ]
+        storage_mountpoints = []
+        basejail_mounts: typing.Iterable[typing.Tuple[str, str]] = []
+        if self.storage_backend is NullFSBasejailStorage:
+            basejail_mounts = BasejailStorage._get_basejail_mounts(
+                # cast for mypy: the unbound method reads only the jail config
+                typing.cast(BasejailStorage, self.storage)
+            )
+        for source, destination in basejail_mounts:
+            storage_fingerprint.append(f"{source} {destination}")
+            storage_mountpoints.append(str(destination))
+        if int(self.config["mount_devfs"]) == 1:
+            storage_mountpoints.append(f"{self.root_path}/dev")
+        if int(self.config["mount_fdescfs"]) == 1:
+            storage_mountpoints.append(f"{self.root_path}/dev/fd")
+        state["storage"] = dict(
+            fingerprint=storage_fingerprint,
+            mountpoints=storage_mountpoints
+        )
+
+        return state
+
+    def _get_preserved_state(self) -> typing.Set[str]:
+        """
+        Return the components that remain applied from the previous start.
+
+        A component is preserved when the fingerprint of its configuration
+        is unchanged and all of its mountpoints are still mounted. State of
+        a stopped jail is only trusted when a quick restart kept it.
+        """
+        try:
+            with open(self._applied_state_file, "r", encoding="UTF-8") as f:
+                previous_state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+
+        was_preserved = (previous_state.get("preserved") is True)
+        if (self.running is False) and (was_preserved is False):
+            return set()
+
+        previous_components = previous_state.get("components", dict())
+        mount_table = libioc.MountTable.MountTable(logger=self.logger)
+        preserved = set()
+        for component, state in self._get_applied_state().items():
+            if previous_components.get(component) != state:
+                continue
+            if all(map(mount_table.is_mounted, state["mountpoints"])):
+                preserved.add(component)
+
+        return preserved
+
+    def _save_applied_state(
+        self,
+        preserved: typing.Optional[typing.Collection[str]]=None
+    ) -> None:
+        """
+        Persist the applied state for a following quick restart.
+
+        Args:
+
+            preserved (list[str]): (default=None)
+
+                When stopping a jail only the listed components of the
+                previously applied state remain. The state is removed when
+                no component is preserved.
+        """
+        if preserved is None:
+            components = self._get_applied_state()
+        else:
+            try:
+                with open(self._applied_state_file, "r") as f:
+                    previous_components = json.load(f)["components"]
+            except (OSError, ValueError, KeyError):
+                previous_components = dict()
+            components = dict([
+                (key, value) for key, value in previous_components.items()
+                if key in preserved
+            ])
+
+        if len(components) == 0:
+            if os.path.isfile(self._applied_state_file) is True:
+                os.remove(self._applied_state_file)
+            return
+
+        os.makedirs(self.applied_state_dir, mode=0o700, exist_ok=True)
+        with open(self._applied_state_file, "w") as f:
+            json.dump(dict(
+                preserved=(preserved is not None),
+                components=components
+            ), f)
+
     def restart(
         self,
         shutdown: bool=False,
         force: bool=False,
         event_scope: typing.Optional['libioc.events.Scope']=None,
-        env: typing.Dict[str, str]={}
+        env: typing.Dict[str, str]={},
+        quick: bool=False
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
-        """Restart the jail."""
+        """
+        Restart the jail.
+
+        Args:
+
+            shutdown (bool): (default=False)
+
+                Stop and start the jail instead of restarting its services.
+
+            force (bool): (default=False)
+
+                Ignores failures and enforces teardown if True.
+
+            event_scope (libioc.events.Scope): (default=None)
+
+                Provide an existing libiocage event scope or automatically
+                create a new one instead.
+
+            env (dict):
+
+                Environment variables that are available in all jail hooks.
+
+            quick (bool): (default=False)
+
+                When shutting down, keep the host resources whose
+                configuration did not change since the last start and only
+                rebuild the others. The jail process tree and VNET
+                interfaces are always recreated.
+        """
         jailRestartEvent = libioc.events.JailRestart(
             jail=self,
             scope=event_scope
@@ -1159,12 +1544,18 @@ class JailGenerator(JailResource):
 
         else:
 
+            preserve: typing.Set[str] = set()
+            if quick is True:
+                libioc.MountTable.MountTable(logger=self.logger).refresh()
+                preserve = self._get_preserved_state()
             yield from self.stop(
                 force=force,
                 event_scope=jailRestartEvent.scope,
-                env=env
+                env=env,
+                preserve=preserve
             )
             yield from self.start(
+                quick=quick,
                 event_scope=jailRestartEvent.scope,
                 env=env
             )
@@ -1203,6 +1594,7 @@ class JailGenerator(JailResource):
             _stop_jail = (self.running is True)
 
         if _stop_jail is True:
+            jid = self.jid
             try:
                 yield from JailGenerator.stop(
                     self,
@@ -1212,6 +1604,10 @@ class JailGenerator(JailResource):
                 )
             except libioc.errors.JailDestructionFailed:
                 pass
+            if jid is not None:
+                libioc.ExecChannel.ExecChannelPool(
+                    logger=self.logger
+                ).close(jid)
 
         zfsDatasetDestroyEvent = libioc.events.ZFSDatasetDestroy(
             dataset=self.dataset,
@@ -1219,6 +1615,7 @@ class JailGenerator(JailResource):
         )
 
         yield zfsDatasetDestroyEvent.begin()
+        self.host.identity_map.discard(self)
         try:
             self.zfs.delete_dataset_recursive(self.dataset)
         except Exception as e:
@@ -1263,6 +1660,8 @@ class JailGenerator(JailResource):
         self.config["id"] = new_name  # validates new_name
 
         yield jailRenameEvent.begin()
+        # the instance is no longer known under its previous name
+        self.host.identity_map.discard(self)
         self.logger.debug(f"Renaming jail {current_id} to {new_name}")
 
         def revert_id_change() -> None:
@@ -1547,6 +1946,7 @@ class JailGenerator(JailResource):
         command: typing.List[str],
         env: typing.Dict[str, str]={},
         passthru: bool=False,
+        channel: bool=False,
         **kwargs: typing.Any
     ) -> libioc.helpers.CommandOutput:
         """
@@ -1571,13 +1971,27 @@ class JailGenerator(JailResource):
                 forwarded to the attached terminal. The results will not be
                 included in the CommandOutput, so that (None, None,
                 <returncode>) is returned.
-        """
-        command = ["/usr/sbin/jexec", str(self.jid)] + command
 
+            channel (bool): (default=False)
+
+                Run the command through a pooled persistent exec channel
+                instead of forking jexec. This saves attaching to the jail
+                on every call, which matters for frequent short commands
+                such as health checks. Cannot be combined with passthru.
+        """
         command_env = self.env
         for env_key, env_value in env.items():
             command_env[env_key] = env_value
 
+        if (channel is True) and (passthru is False):
+            # a channel without jid would execute on the host
+            self.require_jail_running()
+            return libioc.ExecChannel.ExecChannelPool(
+                logger=self.logger
+            ).exec(self.jid, command, env=command_env)
+
+        command = ["/usr/sbin/jexec", str(self.jid)] + command
+
         stdout, stderr, returncode = self._exec_host_command(
             command,
             env=command_env,
@@ -1637,6 +2051,8 @@ class JailGenerator(JailResource):
             return
 
         jid = self.jid
+        # pooled helpers are attached to the jail and die with it
+        libioc.ExecChannel.ExecChannelPool(logger=self.logger).close(jid)
         try:
             libjail.dll.jail_remove(jid)
             while self.running or (libjail.is_jid_dying(jid) is True):
@@ -1723,19 +2139,18 @@ class JailGenerator(JailResource):
             devfs_ruleset.append("add path nmdm* unhide")
 
         # create if the final rule combination does not exist as ruleset
-        if devfs_ruleset not in self.host.devfs:
-            self.logger.verbose("New devfs ruleset combination")
-            # note: name and number of devfs_ruleset are both None
-            new_ruleset_number = self.host.devfs.new_ruleset(devfs_ruleset)
-            self.host.devfs.save()
-            return new_ruleset_number
-        else:
-            ruleset_line_position = self.host.devfs.index(devfs_ruleset)
-            # cast for mypy: rulesets read from devfs.rules have a number
-            return typing.cast(
-                int,
-                self.host.devfs[ruleset_line_position].number
-            )
+        try:
+            existing_ruleset = self.host.devfs.find_by_rules(devfs_ruleset)
+            return int(existing_ruleset.number)
+        except KeyError:
+            pass
+
+        self.logger.verbose("New devfs ruleset combination")
+        # note: name and number of devfs_ruleset are both None
+        new_ruleset_number = self.host.devfs.new_ruleset(devfs_ruleset)
+        self.host.devfs.install_ruleset(devfs_ruleset)
+        self.host.devfs.save(restart_service=False)
+        return new_ruleset_number
 
     @property
     def _generated_hostuuid(self) -> uuid.UUID:
@@ -1749,7 +2164,12 @@ class JailGenerator(JailResource):
         vnet = (config["vnet"] is True)
         value: libjail.IovevValueInput
         jail_params: typing.Dict[str, 'libjail.IovevValueInput'] = {}
-        for sysctl_name, sysctl in libioc.JailParams.JailParams().items():
+        config_params = libioc.JailParams.JailParams().get_config_params(
+            config,
+            include=_COMPUTED_LAUNCH_PARAMS
+        )
+        for sysctl in config_params:
+            sysctl_name = sysctl.name.rstrip(".")
             if sysctl_name == "security.jail.param.devfs_ruleset":
                 devfs_ruleset = self.devfs_ruleset
                 if devfs_ruleset is None:
@@ -1784,21 +2204,14 @@ class JailGenerator(JailResource):
             elif vnet and (sysctl_name.startswith("security.jail.param.ip")):
                 continue
             else:
-                config_property_name = sysctl.iocage_name
-                if self.config.is_known_property(
-                    config_property_name,
-                    explicit=False
-                ) is True:
-                    value = config[config_property_name]
-                    if sysctl.ctl_type in (
-                        freebsd_sysctl.types.NODE,
-                        freebsd_sysctl.types.INT,
-                    ):
-                        sysctl_state_names = ["disable", "inherit", "new"]
-                        if value in sysctl_state_names:
-                            value = sysctl_state_names.index(value)
-                else:
-                    continue
+                value = config[sysctl.iocage_name]
+                if sysctl.ctl_type in (
+                    freebsd_sysctl.types.NODE,
+                    freebsd_sysctl.types.INT,
+                ):
+                    sysctl_state_names = ["disable", "inherit", "new"]
+                    if value in sysctl_state_names:
+                        value = sysctl_state_names.index(value)
 
             jail_params[sysctl.jail_arg_name.rstrip(".")] = value
 
@@ -1928,8 +2341,19 @@ class JailGenerator(JailResource):
             scope=event_scope
         )
         yield event.begin()
+        firewall_transaction = libioc.Firewall.Firewall(
+            logger=self.logger
+        ).transaction()
         for network in self.networks:
-            yield from network.setup(event_scope=event.scope)
+            yield from network.setup(
+                event_scope=event.scope,
+                firewall_transaction=firewall_transaction
+            )
+        try:
+            firewall_transaction.commit()
+        except Exception as e:
+            yield event.fail(e)
+            raise e
         yield event.end()
 
     def __start_network(
@@ -2026,8 +2450,20 @@ class JailGenerator(JailResource):
         )
         yield event.begin()
 
+        firewall_transaction = libioc.Firewall.Firewall(
+            logger=self.logger
+        ).transaction()
         for network in self.networks:
-            yield from network.teardown(jid, event_scope=event.scope)
+            yield from network.teardown(
+                jid,
+                event_scope=event.scope,
+                firewall_transaction=firewall_transaction
+            )
+        try:
+            firewall_transaction.commit()
+        except Exception as e:
+            yield event.fail(e)
+            raise e
 
         yield event.end()
 
@@ -2063,15 +2499,7 @@ class JailGenerator(JailResource):
             return
 
         skipped = True
-        for key in libioc.Config.Jail.Properties.ResourceLimit.properties:
-            try:
-                rlimit_prop = self.config[key]
-                if rlimit_prop.is_unset is True:
-                    continue
-            except (KeyError, AttributeError):
-                continue
-
-            rule = f"jail:{self.identifier}:{key}:{rlimit_prop.limit_string}"
+        for rule in self.__resource_limit_rules:
             try:
                 libioc.helpers.exec(
                     ["/usr/bin/rctl", "-a", rule],
@@ -2087,6 +2515,23 @@ class JailGenerator(JailResource):
         else:
             yield event.end()
 
+    @property
+    def __resource_limit_rules(self) -> typing.List[str]:
+        if self.__resource_limits_enabled is False:
+            return []
+        rules = []
+        for key in libioc.Config.Jail.Properties.ResourceLimit.properties:
+            try:
+                rlimit_prop = self.config[key]
+                if rlimit_prop.is_unset is True:
+                    continue
+            except (KeyError, AttributeError):
+                continue
+            rules.append(
+                f"jail:{self.identifier}:{key}:{rlimit_prop.limit_string}"
+            )
+        return rules
+
     @property
     def __resource_limits_enabled(self) -> bool:
         rlimits = self.config["rlimits"]
@@ -2388,12 +2833,18 @@ class JailGenerator(JailResource):
     @property
     def release(self) -> 'libioc.Release.ReleaseGenerator':
         """Return the libioc.Release instance linked with the jail."""
-        return libioc.Release.ReleaseGenerator(
-            name=self.config["release"],
-            root_datasets_name=self.root_datasets_name,
-            logger=self.logger,
-            host=self.host,
-            zfs=self.zfs
+        release_name = self.config["release"]
+        return self.host.identity_map.get_or_create(
+            self.root_datasets_name,
+            libioc.Release.ReleaseGenerator,
+            release_name,
+            lambda: libioc.Release.ReleaseGenerator(
+                name=release_name,
+                root_datasets_name=self.root_datasets_name,
+                logger=self.logger,
+                host=self.host,
+                zfs=self.zfs
+            )
         )
 
     @property
@@ -27,10 +27,15 @@ import typing
 import freebsd_sysctl
 import freebsd_sysctl.types
 import collections.abc
+import json
+import os
 import shlex
 
 import libioc.helpers
 
+if typing.TYPE_CHECKING:
+    import libioc.Config.Jail.BaseConfig
+
 JailParamValueType = typing.Optional[typing.Union[bool, int, str]]
 
 
@@ -73,6 +78,24 @@ class JailParam(freebsd_sysctl.Sysctl):
         value: JailParamValueType = super().value
         return value
 
+    @property
+    def schema(self) -> typing.Dict[str, typing.Any]:
+        """Return the cacheable type information of the jail param."""
+        return dict(
+            name=self.name,
+            oid=list(self.oid),
+            kind=int(self.kind),
+            fmt=bytes(self.fmt).hex()
+        )
+
+    @classmethod
+    def from_schema(cls, schema: typing.Dict[str, typing.Any]) -> 'JailParam':
+        """Restore a jail param without querying its type information."""
+        jail_param = cls(name=schema["name"], oid=list(schema["oid"]))
+        jail_param._kind = int(schema["kind"])
+        jail_param._fmt = bytes.fromhex(schema["fmt"])
+        return jail_param
+
     def __raise_value_type_error(self) -> None:
         type_name = self.ctl_type.__name__
         raise TypeError(f"{self.name} sysctl requires {type_name}")
@@ -109,10 +132,24 @@ class JailParam(freebsd_sysctl.Sysctl):
 
 
 class JailParams(collections.abc.MutableMapping):
-    """Collection of jail parameters."""
+    """
+    Collection of jail parameters.
+
+    Enumerating the security.jail.param sysctl tree requires several
+    sysctl calls per parameter. The result is cached in cache_file and
+    reused as long as the running kernel matches the one the cache was
+    created with. After loading kernel modules that add jail parameters,
+    invalidate_cache() forces the next access to enumerate them again.
+    """
+
+    cache_file: str = "/var/cache/iocage/jail_params.json"
 
     __base_class = JailParam
     __sysctl_params: typing.Dict[str, JailParam]
+    __config_params: typing.Dict[
+        typing.Tuple[type, typing.FrozenSet[str]],
+        typing.List[JailParam]
+    ] = {}
 
     def __iter__(self) -> typing.Iterator[str]:
         """Iterate over the jail param names."""
@@ -152,19 +189,113 @@ class JailParams(collections.abc.MutableMapping):
         self.__update_sysctl_jail_params()
         return self.__sysctl_params
 
-    def __update_sysctl_jail_params(self) -> None:
-        prefix = "security.jail.param"
-        jail_params = filter(
-            # security.jail.allow_raw_sockets deprecated
-            lambda x: x.name != "security.jail.allow_raw_sockets",
-            self.__base_class(prefix).children
+    def get_config_params(
+        self,
+        config: 'libioc.Config.Jail.BaseConfig.BaseConfig',
+        include: typing.FrozenSet[str]=frozenset()
+    ) -> typing.List[JailParam]:
+        """
+        Return the jail params that map to properties of the config.
+
+        Whether a jail param is a known config property only depends on
+        the class of the config, so that the mapping is compiled once per
+        config class.
+
+        Args:
+
+            config (libioc.Config.Jail.BaseConfig.BaseConfig):
+                The config whose known properties are mapped.
+
+            include (frozenset[str]): (optional)
+                Sysctl names of jail params that are returned regardless
+                of the config properties.
+        """
+        memo_key = (type(config), include,)
+        try:
+            return JailParams.__config_params[memo_key]
+        except KeyError:
+            pass
+
+        config_params = [
+            jail_param
+            for sysctl_name, jail_param in self.items()
+            if (sysctl_name in include) or config.is_known_property(
+                jail_param.iocage_name,
+                explicit=False
+            )
+        ]
+        JailParams.__config_params[memo_key] = config_params
+        return config_params
+
+    @property
+    def _kernel_schema_key(self) -> typing.Dict[str, str]:
+        return dict([
+            (name, str(freebsd_sysctl.Sysctl(name).value),)
+            for name in ("kern.ident", "kern.osreldate", "kern.version")
+        ])
+
+    def invalidate_cache(self) -> None:
+        """Forget the enumerated jail params and delete the cache file."""
+        try:
+            os.remove(self.cache_file)
+        except FileNotFoundError:
+            pass
+        try:
+            del JailParams.__sysctl_params
+        except AttributeError:
+            pass
+        JailParams.__config_params = {}
+
+    def __read_cache(
+        self,
+        kernel_schema_key: typing.Dict[str, str]
+    ) -> typing.Optional[typing.List[JailParam]]:
+        try:
+            with open(self.cache_file, "r", encoding="UTF-8") as f:
+                cache = json.load(f)
+            if cache["kernel"] != kernel_schema_key:
+                return None
+            return [JailParam.from_schema(x) for x in cache["params"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def __write_cache(
+        self,
+        kernel_schema_key: typing.Dict[str, str],
+        jail_params: typing.List[JailParam]
+    ) -> None:
+        cache = dict(
+            kernel=kernel_schema_key,
+            params=[x.schema for x in jail_params]
         )
+        temporary_file = f"{self.cache_file}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(temporary_file, "w", encoding="UTF-8") as f:
+                json.dump(cache, f)
+            os.replace(temporary_file, self.cache_file)
+        except OSError:
+            # the cache is optional, for example when running unprivileged
+            pass
+
+    def __update_sysctl_jail_params(self) -> None:
+        kernel_schema_key = self._kernel_schema_key
+        jail_params = self.__read_cache(kernel_schema_key)
+        if jail_params is None:
+            prefix = "security.jail.param"
+            # cast for mypy: Sysctl.children constructs type(self), so the
+            # items are JailParam instances at runtime while the upstream
+            # annotation stays with the base class
+            jail_params = [
+                typing.cast(JailParam, x)
+                for x in self.__base_class(prefix).children
+                # security.jail.allow_raw_sockets deprecated
+                if x.name != "security.jail.allow_raw_sockets"
+            ]
+            self.__write_cache(kernel_schema_key, jail_params)
         # permanently store the queried sysctl in the singleton class
-        # cast for mypy: Sysctl.children constructs type(self), so the
-        # items are JailParam instances at runtime while the upstream
-        # annotation stays with the base class
         JailParams.__sysctl_params = dict([
-            (x.name.rstrip("."), typing.cast(JailParam, x),)
+            (x.name.rstrip("."), x,)
             for x in jail_params
         ])
 
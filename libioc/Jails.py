@@ -28,6 +28,9 @@ import typing
 
 import libioc.Jail
 import libioc.Filter
+import libioc.HookRunner
+import libioc.errors
+import libioc.events
 import libioc.ListableResource
 import libioc.helpers_object
 
@@ -79,23 +82,210 @@ class JailsGenerator(
     def _class_jail(self) -> typing.Type[libioc.Jail.JailGenerator]:
         return libioc.Jail.JailGenerator
 
+    def start(
+        self,
+        quick: bool=False,
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        env: typing.Dict[str, str]={}
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """
+        Start all stopped jails of the collection.
+
+        Jails are started in the order of their priority. Consecutive jails
+        of the same priority without dependencies are started together:
+        their prestart hooks run concurrently before the first of them is
+        started and their poststart hooks concurrently after the last one
+        was started. Each group is completely started before the jails of
+        the next priority. Jails with dependencies are started like a
+        single jail is.
+
+        A jail that fails to start does not stop the batch. Jails with a
+        failing poststart hook are stopped again. The first error is raised
+        after all jails were handled.
+
+        New devfs ruleset combinations are installed when a jail starts,
+        but the devfs.rules file is only written once after all jails were
+        started.
+
+        Args:
+
+            quick (bool):
+
+                Start the jails with the quick option (see Jail.start).
+
+            event_scope (libioc.events.Scope): (default=None)
+
+                Provide an existing libiocage event scope or automatically
+                create a new one instead.
+
+            env (dict):
+
+                Environment variables that are available in all jail hooks.
+        """
+        jails = sorted(
+            (x for x in self if x.running is False),
+            key=lambda x: x.config["priority"]
+        )
+        groups: typing.List[typing.List['libioc.Jail.JailGenerator']] = []
+        for jail in jails:
+            if (len(groups) > 0) and self._start_together(groups[-1][0], jail):
+                groups[-1].append(jail)
+            else:
+                groups.append([jail])
+        hook_runner = libioc.HookRunner.HookRunner(logger=self.logger)
+
+        # jails loaded from other hosts may hold their own devfs rules
+        devfs_rules = {id(x.host.devfs): x.host.devfs for x in jails}
+        for devfs in devfs_rules.values():
+            devfs.defer_save()
+        dependant_jails_seen: typing.List['libioc.Jail.JailGenerator'] = []
+        errors: typing.List[libioc.errors.IocException] = []
+        try:
+            for group in groups:
+                if len(group[0].config["depends"]) > 0:
+                    jail = group[0]
+                    if jail.running is True:
+                        # already started as dependant of another jail
+                        continue
+                    try:
+                        yield from jail.start(
+                            quick=quick,
+                            event_scope=event_scope,
+                            dependant_jails_seen=dependant_jails_seen,
+                            env=env
+                        )
+                    except libioc.errors.IocException as e:
+                        errors.append(e)
+                    continue
+                yield from self._start_group(
+                    group,
+                    hook_runner,
+                    errors,
+                    quick=quick,
+                    event_scope=event_scope,
+                    dependant_jails_seen=dependant_jails_seen,
+                    env=env
+                )
+        finally:
+            for devfs in devfs_rules.values():
+                devfs.flush()
+
+        if len(errors) > 0:
+            raise errors[0]
+
+    @staticmethod
+    def _start_together(
+        jail: 'libioc.Jail.JailGenerator',
+        other_jail: 'libioc.Jail.JailGenerator'
+    ) -> bool:
+        """Return True if the hooks of both jails may run concurrently."""
+        return all([
+            len(jail.config["depends"]) == 0,
+            len(other_jail.config["depends"]) == 0,
+            jail.config["priority"] == other_jail.config["priority"]
+        ])
+
+    def _start_group(
+        self,
+        jails: typing.List['libioc.Jail.JailGenerator'],
+        hook_runner: 'libioc.HookRunner.HookRunner',
+        errors: typing.List[libioc.errors.IocException],
+        quick: bool,
+        event_scope: typing.Optional['libioc.events.Scope'],
+        dependant_jails_seen: typing.List['libioc.Jail.JailGenerator'],
+        env: typing.Dict[str, str]
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Start independent jails with concurrent hooks."""
+        jails = [x for x in jails if x.running is False]
+        started_jails: typing.List['libioc.Jail.JailGenerator'] = []
+        prestart_hook_results = self._run_hooks(
+            hook_runner,
+            "prestart",
+            jails,
+            env=env
+        )
+        for jail, prestart_hook_result in zip(jails, prestart_hook_results):
+            try:
+                yield from jail.start(
+                    quick=quick,
+                    event_scope=event_scope,
+                    dependant_jails_seen=dependant_jails_seen,
+                    env=env,
+                    prestart_hook_result=prestart_hook_result,
+                    defer_poststart_hook=True
+                )
+                started_jails.append(jail)
+            except libioc.errors.IocException as e:
+                errors.append(e)
+
+        poststart_hook_results = self._run_hooks(
+            hook_runner,
+            "poststart",
+            started_jails,
+            env=env
+        )
+        for jail, poststart_hook_result in zip(
+            started_jails,
+            poststart_hook_results
+        ):
+            try:
+                yield from jail.run_hook(
+                    "poststart",
+                    event_scope=event_scope,
+                    hook_result=poststart_hook_result,
+                    env=env
+                )
+            except libioc.errors.IocException as e:
+                errors.append(e)
+                yield from jail.stop(force=True, event_scope=event_scope)
+
+    def _run_hooks(
+        self,
+        hook_runner: 'libioc.HookRunner.HookRunner',
+        hook: str,
+        jails: typing.List['libioc.Jail.JailGenerator'],
+        env: typing.Dict[str, str]
+    ) -> typing.List[typing.Optional['libioc.HookRunner.HookResult']]:
+        """Run a hook of all jails concurrently and return their results."""
+        hook_commands = [x._get_hook_command(hook, env=env) for x in jails]
+        configured_commands = [x for x in hook_commands if x is not None]
+        if len(configured_commands) == 0:
+            return [None] * len(jails)
+        results = iter(hook_runner.run(configured_commands))
+        return [
+            None if (x is None) else next(results) for x in hook_commands
+        ]
+
     def _create_resource_instance(
         self,
         dataset: libzfs.ZFSDataset
     ) -> 'libioc.Jail.JailGenerator':
 
-        jail = self._class_jail(
-            data=dict(id=dataset.name.split("/").pop()),
-            root_datasets_name=self.sources.find_root_datasets_name(
-                dataset.name
-            ),
-            logger=self.logger,
-            host=self.host,
-            zfs=self.zfs,
-            **self.resource_args
+        name = dataset.name.split("/").pop()
+        root_datasets_name = self.sources.find_root_datasets_name(
+            dataset.name
         )
 
-        return jail
+        def _create_jail() -> 'libioc.Jail.JailGenerator':
+            return self._class_jail(
+                data=dict(id=name),
+                root_datasets_name=root_datasets_name,
+                logger=self.logger,
+                host=self.host,
+                zfs=self.zfs,
+                **self.resource_args
+            )
+
+        if len(self.resource_args) > 0:
+            # jails loaded with custom arguments are not shared
+            return _create_jail()
+
+        return self.host.identity_map.get_or_create(
+            root_datasets_name,
+            self._class_jail,
+            name,
+            _create_jail
+        )
 
 
 class Jails(JailsGenerator):
@@ -105,6 +295,14 @@ class Jails(JailsGenerator):
     def _class_jail(self) -> typing.Type[libioc.Jail.Jail]:
         return libioc.Jail.Jail
 
+    def start(  # type: ignore[override]
+        self,
+        *args: typing.Any,
+        **kwargs: typing.Any
+    ) -> typing.List['libioc.events.IocEvent']:
+        """Start all stopped jails of the collection."""
+        return list(JailsGenerator.start(self, *args, **kwargs))
+
     # unlike list, this collection is only subscriptable by index
     def __getitem__(  # type: ignore[override]
         self,
@@ -0,0 +1,379 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc HTTP metadata cache module."""
+import typing
+import hashlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+import libioc.Downloader
+import libioc.errors
+import libioc.helpers_object
+
+# status code, body, ETag and Last-Modified of a response
+_Response = typing.Tuple[
+    int,
+    bytes,
+    typing.Optional[str],
+    typing.Optional[str]
+]
+_NetworkErrors = (urllib.error.URLError, OSError, http.client.HTTPException,)
+
+
+class MetadataCacheEntry:
+    """A cached HTTP response."""
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        body: bytes=b"",
+        etag: typing.Optional[str]=None,
+        last_modified: typing.Optional[str]=None,
+        fetched_at: typing.Optional[float]=None
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time() if (fetched_at is None) else fetched_at
+
+    @property
+    def age(self) -> float:
+        """Return the seconds since the response was fetched or validated."""
+        return time.time() - self.fetched_at
+
+    def to_bytes(self) -> bytes:
+        """Serialize the entry as JSON header line followed by the body."""
+        header = json.dumps(dict(
+            url=self.url,
+            status=self.status,
+            etag=self.etag,
+            last_modified=self.last_modified,
+            fetched_at=self.fetched_at
+        ))
+        return header.encode("UTF-8") + b"\n" + self.body
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'MetadataCacheEntry':
+        """Deserialize an entry."""
+        header, body = data.split(b"\n", maxsplit=1)
+        return MetadataCacheEntry(body=body, **json.loads(header))
+
+
+class MetadataCache:
+    """
+    On-disk cache of small HTTP resources such as mirror indexes.
+
+    Responses are served from disk while they are younger than their TTL.
+    Older responses are revalidated with If-None-Match and
+    If-Modified-Since, so that unchanged resources are not transferred
+    again. When the remote cannot be reached, the last cached response is
+    used. Without a writable cache directory responses are not persisted.
+    """
+
+    path: str = "/var/cache/iocage/metadata"
+    ttl: float = 3600
+    timeout: float = 30
+    max_redirects: int = 5
+
+    def __init__(
+        self,
+        path: typing.Optional[str]=None,
+        ttl: typing.Optional[float]=None,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        if path is not None:
+            self.path = path
+        if ttl is not None:
+            self.ttl = ttl
+
+    def get(
+        self,
+        url: str,
+        ttl: typing.Optional[float]=None,
+        headers: typing.Optional[typing.Dict[str, str]]=None,
+        level: str="error"
+    ) -> bytes:
+        """
+        Return the body of a successful GET request.
+
+        Raises libioc.errors.DownloadFailed, logged at the given level,
+        when the resource is neither available nor cached.
+        """
+        entry = self._get_entry(url, "GET", ttl, headers, level)
+        if entry.status != 200:
+            raise libioc.errors.DownloadFailed(
+                url=url,
+                code=entry.status,
+                logger=self.logger,
+                level=level
+            )
+        return entry.body
+
+    def retrieve(
+        self,
+        url: str,
+        destination: str,
+        ttl: typing.Optional[float]=None
+    ) -> None:
+        """Write the body of a GET request to the destination file."""
+        body = self.get(url, ttl=ttl)
+        temporary_path = f"{destination}.{uuid.uuid4().hex}.part"
+        with open(temporary_path, "wb") as f:
+            f.write(body)
+        os.replace(temporary_path, destination)
+
+    def status(self, url: str, ttl: typing.Optional[float]=None) -> int:
+        """Return the status code of a HEAD request."""
+        return self._get_entry(url, "HEAD", ttl, level="verbose").status
+
+    def statuses(
+        self,
+        urls: typing.Iterable[str],
+        ttl: typing.Optional[float]=None,
+        concurrency: int=8,
+        timeout: typing.Optional[float]=None
+    ) -> typing.Dict[str, typing.Optional[int]]:
+        """
+        Return the status codes of HEAD requests to many URLs.
+
+        URLs without a fresh cached status are probed concurrently by
+        worker threads that reuse keep-alive connections per origin. The
+        status of unreachable and uncached URLs is None.
+        """
+        pending: queue.Queue = queue.Queue()
+        for url in set(urls):
+            pending.put(url)
+        results: typing.Dict[str, typing.Optional[int]] = {}
+
+        def _worker() -> None:
+            connection_pool = libioc.Downloader.ConnectionPool(
+                timeout=(self.timeout if (timeout is None) else timeout)
+            )
+            try:
+                while True:
+                    try:
+                        url = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[url] = self._get_entry(
+                            url,
+                            "HEAD",
+                            ttl,
+                            level="verbose",
+                            connection_pool=connection_pool
+                        ).status
+                    except libioc.errors.DownloadFailed:
+                        results[url] = None
+            finally:
+                connection_pool.close()
+
+        threads = [
+            threading.Thread(target=_worker, daemon=True)
+            for _ in range(max(1, min(concurrency, pending.qsize())))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def invalidate(self, url: str) -> None:
+        """Forget the cached responses of an URL."""
+        for method in ("GET", "HEAD",):
+            try:
+                os.remove(self._get_entry_path(method, url))
+            except FileNotFoundError:
+                pass
+
+    def _get_entry(
+        self,
+        url: str,
+        method: str,
+        ttl: typing.Optional[float]=None,
+        headers: typing.Optional[typing.Dict[str, str]]=None,
+        level: str="error",
+        connection_pool: typing.Optional[
+            'libioc.Downloader.ConnectionPool'
+        ]=None
+    ) -> MetadataCacheEntry:
+        ttl = self.ttl if (ttl is None) else ttl
+        path = self._get_entry_path(method, url)
+        entry = self._read(path)
+        if (entry is not None) and (entry.age < ttl):
+            self.logger.spam(f"Using cached {method} response of {url}")
+            return entry
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag is not None:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                request_headers["If-Modified-Since"] = entry.last_modified
+        request = urllib.request.Request(
+            url,
+            headers=request_headers,
+            method=method
+        )
+
+        self.logger.verbose(f"Requesting {url}")
+        reason: typing.Union[int, str]
+        try:
+            status, body, etag, last_modified = self._send(
+                request,
+                connection_pool
+            )
+            if (status == 304) and (entry is not None):
+                self.logger.spam(f"Cached response of {url} is up to date")
+                entry.fetched_at = time.time()
+                self._write(path, entry)
+                return entry
+            if status < 500:
+                entry = MetadataCacheEntry(
+                    url=url,
+                    status=status,
+                    body=(body if (status == 200) else b""),
+                    etag=etag,
+                    last_modified=last_modified
+                )
+                self._write(path, entry)
+                return entry
+            reason = status
+        except _NetworkErrors as e:
+            reason = str(getattr(e, "reason", e))
+
+        if entry is not None:
+            self.logger.warn(
+                f"Using cached response of {url} - "
+                f"the remote is unavailable: {reason}"
+            )
+            return entry
+        raise libioc.errors.DownloadFailed(
+            url=url,
+            code=reason,
+            logger=self.logger,
+            level=level
+        )
+
+    def _send(
+        self,
+        request: urllib.request.Request,
+        connection_pool: typing.Optional[
+            'libioc.Downloader.ConnectionPool'
+        ]=None
+    ) -> _Response:
+        if connection_pool is not None:
+            return self._send_pooled(request, connection_pool)
+        try:
+            # URLs are validated by the properties they originate from
+            with urllib.request.urlopen(  # nosec: B310
+                request,
+                timeout=self.timeout
+            ) as response:
+                body = b"" if (request.method == "HEAD") else response.read()
+                return (
+                    response.getcode(),
+                    body,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+        except urllib.error.HTTPError as e:
+            return (e.code, b"", None, None,)
+
+    def _send_pooled(
+        self,
+        request: urllib.request.Request,
+        connection_pool: 'libioc.Downloader.ConnectionPool'
+    ) -> _Response:
+        url = request.full_url
+        method = request.get_method()
+        headers = dict(request.header_items())
+        for _ in range(self.max_redirects + 1):
+            parsed_url = urllib.parse.urlparse(url)
+            path = parsed_url.path or "/"
+            if parsed_url.query:
+                path = f"{path}?{parsed_url.query}"
+            try:
+                response = connection_pool.request(
+                    parsed_url.scheme,
+                    parsed_url.netloc,
+                    method,
+                    path,
+                    headers=headers
+                )
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection_pool.discard(parsed_url.scheme, parsed_url.netloc)
+                raise
+
+            location = response.getheader("Location")
+            if (response.status in (301, 302, 303, 307, 308,)) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+
+            return (
+                response.status,
+                body,
+                response.getheader("ETag"),
+                response.getheader("Last-Modified"),
+            )
+        raise http.client.HTTPException("too many redirects")
+
+    def _get_entry_path(self, method: str, url: str) -> str:
+        key = hashlib.sha256(f"{method} {url}".encode("UTF-8")).hexdigest()
+        return f"{self.path}/{key}"
+
+    def _read(self, path: str) -> typing.Optional[MetadataCacheEntry]:
+        try:
+            with open(path, "rb") as f:
+                return MetadataCacheEntry.from_bytes(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.spam(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def _write(self, path: str, entry: MetadataCacheEntry) -> None:
+        temporary_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            os.makedirs(self.path, mode=0o755, exist_ok=True)
+            with open(temporary_path, "wb") as f:
+                f.write(entry.to_bytes())
+            os.replace(temporary_path, path)
+        except OSError as e:
+            self.logger.spam(f"Could not cache {entry.url}: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
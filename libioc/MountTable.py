@@ -0,0 +1,239 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc mount table module."""
+import typing
+import ctypes
+import ctypes.util
+import os.path
+
+import libioc.helpers_object
+
+MNT_NOWAIT = 2
+STATFS_VERSION = 0x20140518
+
+
+class _StatFS(ctypes.Structure):
+    """FreeBSD struct statfs (sys/mount.h)."""
+
+    _fields_ = [
+        ("f_version", ctypes.c_uint32),
+        ("f_type", ctypes.c_uint32),
+        ("f_flags", ctypes.c_uint64),
+        ("f_bsize", ctypes.c_uint64),
+        ("f_iosize", ctypes.c_uint64),
+        ("f_blocks", ctypes.c_uint64),
+        ("f_bfree", ctypes.c_uint64),
+        ("f_bavail", ctypes.c_int64),
+        ("f_files", ctypes.c_uint64),
+        ("f_ffree", ctypes.c_int64),
+        ("f_syncwrites", ctypes.c_uint64),
+        ("f_asyncwrites", ctypes.c_uint64),
+        ("f_syncreads", ctypes.c_uint64),
+        ("f_asyncreads", ctypes.c_uint64),
+        ("f_spare", ctypes.c_uint64 * 10),
+        ("f_namemax", ctypes.c_uint32),
+        ("f_owner", ctypes.c_uint32),
+        ("f_fsid", ctypes.c_int32 * 2),
+        ("f_charspare", ctypes.c_char * 80),
+        ("f_fstypename", ctypes.c_char * 16),
+        ("f_mntfromname", ctypes.c_char * 1024),
+        ("f_mntonname", ctypes.c_char * 1024)
+    ]
+
+
+class MountTableEntry:
+    """A single mounted filesystem."""
+
+    source: str
+    mountpoint: str
+    fstype: str
+
+    def __init__(
+        self,
+        mountpoint: str,
+        source: typing.Optional[str]=None,
+        fstype: typing.Optional[str]=None
+    ) -> None:
+        self.mountpoint = _normalize(mountpoint)
+        self.source = "" if (source is None) else str(source)
+        self.fstype = "" if (fstype is None) else str(fstype)
+
+    def __repr__(self) -> str:
+        """Return the fstab notation of the entry."""
+        return (
+            f"<MountTableEntry {self.source} {self.mountpoint} {self.fstype}>"
+        )
+
+
+class MountTable:
+    """
+    In-memory snapshot of the mounted filesystems.
+
+    Checking a mountpoint with os.path.ismount() stats the path and its
+    parent, which can block on busy pools. Instead the mount table is read
+    once with getmntinfo(3) without waiting for filesystem statistics and
+    membership queries are answered from memory. Mounts and unmounts
+    performed by libioc update the snapshot.
+
+    The snapshot is shared by all instances within the process. It is
+    taken on first use; operations that depend on an accurate state, such
+    as starting or stopping a jail, refresh() it once beforehand. Because
+    other processes mount and unmount as well, every decision to unmount
+    or delete a path refreshes the snapshot first, and unmounting a path
+    that the snapshot misses refreshes it before failing.
+    """
+
+    __entries: typing.Optional[typing.Dict[str, MountTableEntry]] = None
+
+    def __init__(
+        self,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+
+    @property
+    def entries(self) -> typing.Dict[str, MountTableEntry]:
+        """Return the mounted filesystems indexed by their mountpoint."""
+        if MountTable.__entries is None:
+            self.refresh()
+        # cast for mypy: refresh() populated the snapshot
+        return typing.cast(
+            typing.Dict[str, MountTableEntry],
+            MountTable.__entries
+        )
+
+    def refresh(self) -> None:
+        """Read the current mount table from the kernel."""
+        entries: typing.Dict[str, MountTableEntry] = {}
+        for entry in self._query_mounts():
+            entries[entry.mountpoint] = entry
+        MountTable.__entries = entries
+        self.logger.spam(f"Mount table snapshot with {len(entries)} entries")
+
+    def is_mounted(self, mountpoint: str) -> bool:
+        """Return True if a filesystem is mounted at the mountpoint."""
+        return (_normalize(mountpoint) in self.entries) is True
+
+    def __contains__(self, mountpoint: typing.Any) -> bool:
+        """Return True if a filesystem is mounted at the mountpoint."""
+        return self.is_mounted(str(mountpoint))
+
+    def __iter__(self) -> typing.Iterator[MountTableEntry]:
+        """Iterate over the mounted filesystems."""
+        return iter(list(self.entries.values()))
+
+    def find_below(self, path: str) -> typing.List[MountTableEntry]:
+        """Return all mounts within the path, deepest mountpoints first."""
+        prefix = _normalize(path).rstrip("/") + "/"
+        return sorted(
+            [
+                x for x in self.entries.values()
+                if x.mountpoint.startswith(prefix)
+            ],
+            key=lambda x: x.mountpoint,
+            reverse=True
+        )
+
+    def add(
+        self,
+        mountpoint: str,
+        source: typing.Optional[str]=None,
+        fstype: typing.Optional[str]=None
+    ) -> None:
+        """Record a filesystem that was mounted by libioc."""
+        entry = MountTableEntry(
+            mountpoint=mountpoint,
+            source=source,
+            fstype=fstype
+        )
+        self.entries[entry.mountpoint] = entry
+
+    def remove(self, mountpoint: str) -> None:
+        """Record that the filesystem at the mountpoint was unmounted."""
+        self.entries.pop(_normalize(mountpoint), None)
+
+    def _query_mounts(self) -> typing.List[MountTableEntry]:
+        try:
+            return self._query_getmntinfo()
+        except (AttributeError, OSError):
+            # libc without getmntinfo(3), such as on Linux test hosts
+            return self._query_proc_mounts()
+
+    def _query_getmntinfo(self) -> typing.List[MountTableEntry]:
+        libc = ctypes.CDLL(str(ctypes.util.find_library("c")), use_errno=True)
+        getmntinfo = libc.getmntinfo
+        getmntinfo.argtypes = [
+            ctypes.POINTER(ctypes.POINTER(_StatFS)),
+            ctypes.c_int
+        ]
+        getmntinfo.restype = ctypes.c_int
+
+        mntbuf = ctypes.POINTER(_StatFS)()
+        count = getmntinfo(ctypes.byref(mntbuf), MNT_NOWAIT)
+        if count <= 0:
+            raise OSError(ctypes.get_errno(), "getmntinfo failed")
+
+        entries = []
+        for i in range(count):
+            statfs = mntbuf[i]
+            if statfs.f_version != STATFS_VERSION:
+                raise OSError("unsupported struct statfs version")
+            entries.append(MountTableEntry(
+                mountpoint=statfs.f_mntonname.decode("UTF-8"),
+                source=statfs.f_mntfromname.decode("UTF-8"),
+                fstype=statfs.f_fstypename.decode("UTF-8")
+            ))
+        return entries
+
+    def _query_proc_mounts(
+        self,
+        mounts_file: str="/proc/mounts"
+    ) -> typing.List[MountTableEntry]:
+        entries = []
+        with open(mounts_file, "r", encoding="UTF-8") as f:
+            for line in f.readlines():
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                source, mountpoint, fstype = [
+                    _unescape_octal(x) for x in fields[:3]
+                ]
+                entries.append(MountTableEntry(
+                    mountpoint=mountpoint,
+                    source=source,
+                    fstype=fstype
+                ))
+        return entries
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(str(path))
+
+
+def _unescape_octal(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return text.encode("UTF-8").decode("unicode_escape").encode(
+        "latin-1"
+    ).decode("UTF-8")
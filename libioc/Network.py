@@ -91,7 +91,10 @@ class Network:
 
     def setup(
         self,
-        event_scope: typing.Optional['libioc.events.Scope']=None
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        firewall_transaction: typing.Optional[
+            'libioc.Firewall.FirewallTransaction'
+        ]=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
         Apply the network configuration.
@@ -99,6 +102,15 @@ class Network:
         Jails call this method to create the network after being started
         and configure the interfaces on jail and host side according to the
         class attributes.
+
+        Args:
+
+            firewall_transaction (libioc.Firewall.FirewallTransaction):
+
+                Secure VNET firewall rules are queued in this transaction
+                and committed by the caller. When unset, the rules of this
+                network are committed at once after the interfaces were
+                configured.
         """
         if (self.vnet is True):
             self.__require_bridge()
@@ -109,8 +121,15 @@ class Network:
         )
         yield event.begin()
 
+        if firewall_transaction is None:
+            _firewall_transaction = self.firewall.transaction()
+        else:
+            _firewall_transaction = firewall_transaction
+
         try:
-            self.__create_vnet_iface()
+            self.__create_vnet_iface(_firewall_transaction)
+            if firewall_transaction is None:
+                _firewall_transaction.commit()
         except Exception as e:
             yield event.fail(e)
             raise e
@@ -120,13 +139,23 @@ class Network:
     def teardown(
         self,
         jid: typing.Optional[int]=None,
-        event_scope: typing.Optional['libioc.events.Scope']=None
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        firewall_transaction: typing.Optional[
+            'libioc.Firewall.FirewallTransaction'
+        ]=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
         Teardown the applied changes.
 
         After Jails are stopped the devices that were used by it remain on the
         host. This method is called by jails after they terminated.
+
+        Args:
+
+            firewall_transaction (libioc.Firewall.FirewallTransaction):
+
+                Queue the deletion of Secure VNET firewall rules in this
+                transaction instead of deleting them immediately.
         """
         event = libioc.events.VnetInterfaceConfig(
             jail=self.jail,
@@ -147,7 +176,10 @@ class Network:
 
             if self._is_secure_vnet_bridge is True:
                 self.__down_secure_mode_devices(jid)
-                self.firewall.delete_rule(jid)
+                if firewall_transaction is None:
+                    self.firewall.delete_rule(jid)
+                else:
+                    firewall_transaction.delete_rule(jid)
         except Exception as e:
             yield event.fail(e)
             raise e
@@ -286,7 +318,8 @@ class Network:
         return nic_a, nic_b
 
     def __create_vnet_iface(
-        self
+        self,
+        firewall_transaction: 'libioc.Firewall.FirewallTransaction'
     ) -> None:
 
         if self._is_secure_vnet_bridge is True:
@@ -338,7 +371,8 @@ class Network:
             )
 
             self.__configure_firewall(
-                mac_address=str(mac_address_pair.b)
+                mac_address=str(mac_address_pair.b),
+                firewall_transaction=firewall_transaction
             )
 
             # the secondary bridge in secure mode
@@ -393,7 +427,11 @@ class Network:
             logger=self.logger
         )
 
-    def __configure_firewall(self, mac_address: str) -> None:
+    def __configure_firewall(
+        self,
+        mac_address: str,
+        firewall_transaction: 'libioc.Firewall.FirewallTransaction'
+    ) -> None:
 
         self.logger.verbose(
             f"Configuring Secure VNET Firewall for {self._escaped_nic_name}"
@@ -411,7 +449,7 @@ class Network:
                         f"Firewall permit not possible for address '{address}'"
                     )
                     continue
-                self.firewall.add_rule(firewall_rule_number, [
+                firewall_transaction.add_rule(firewall_rule_number, [
                     "allow", protocol,
                     "from", _address, "to", "any",
                     "layer2",
@@ -419,7 +457,7 @@ class Network:
                     "via", f"{self._escaped_nic_name}:{self.jail.jid}:b",
                     "out"
                 ])
-                self.firewall.add_rule(firewall_rule_number, [
+                firewall_transaction.add_rule(firewall_rule_number, [
                     "allow", protocol,
                     "from", "any", "to", _address,
                     "layer2",
@@ -427,26 +465,26 @@ class Network:
                     "via", f"{self._escaped_nic_name}:{self.jail.jid}",
                     "out"
                 ])
-                self.firewall.add_rule(firewall_rule_number, [
+                firewall_transaction.add_rule(firewall_rule_number, [
                     "allow", protocol,
                     "from", "any", "to", _address,
                     "via", f"{self._escaped_nic_name}:{self.jail.jid}",
                     "out"
                 ])
-            self.firewall.add_rule(firewall_rule_number, [
+            firewall_transaction.add_rule(firewall_rule_number, [
                 "deny", "log", protocol,
                 "from", "any", "to", "any",
                 "layer2",
                 "via", f"{self._escaped_nic_name}:{self.jail.jid}:b",
                 "out"
             ])
-            self.firewall.add_rule(firewall_rule_number, [
+            firewall_transaction.add_rule(firewall_rule_number, [
                 "deny", "log", protocol,
                 "from", "any", "to", "any",
                 "via", f"{self._escaped_nic_name}:{self.jail.jid}",
                 "out"
             ])
-        self.logger.debug("Firewall rules added")
+        self.logger.debug("Firewall rules queued")
 
     def __generate_mac_bytes(self) -> str:
         m = sha224()
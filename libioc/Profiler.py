@@ -0,0 +1,281 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc event profiler module."""
+import typing
+import argparse
+import json
+import math
+
+import libioc.events
+
+EventGenerator = typing.Iterable['libioc.events.IocEvent']
+
+
+class ProfileNode:
+    """Timing of one event within a profiled operation."""
+
+    def __init__(
+        self,
+        name: str,
+        identifier: typing.Optional[str]=None
+    ) -> None:
+        self.name = name
+        self.identifier = identifier
+        self.status = "pending"
+        self.started_at: typing.Optional[float] = None
+        self.stopped_at: typing.Optional[float] = None
+        self.children: typing.List['ProfileNode'] = []
+
+    @property
+    def duration(self) -> float:
+        """Return the wall time of the event in seconds."""
+        if (self.started_at is None) or (self.stopped_at is None):
+            return sum(x.duration for x in self.children)
+        return self.stopped_at - self.started_at
+
+    @property
+    def self_duration(self) -> float:
+        """Return the time that was not spent in child events."""
+        children_duration = sum(x.duration for x in self.children)
+        return max(0.0, self.duration - children_duration)
+
+    def walk(
+        self,
+        path: typing.Tuple[str, ...]=()
+    ) -> typing.Iterator[typing.Tuple[typing.Tuple[str, ...], 'ProfileNode']]:
+        """Iterate over the node and its descendants with their stack."""
+        path = path + (self.name,)
+        yield path, self
+        for child in self.children:
+            yield from child.walk(path)
+
+    def to_dict(
+        self,
+        origin: typing.Optional[float]=None
+    ) -> typing.Dict[str, typing.Any]:
+        """Return the timing tree as JSON serializable dict."""
+        if origin is None:
+            origin = self.started_at
+        data: typing.Dict[str, typing.Any] = dict(
+            name=self.name,
+            status=self.status,
+            duration=self.duration,
+            self_duration=self.self_duration
+        )
+        if self.identifier is not None:
+            data["identifier"] = self.identifier
+        if (self.started_at is not None) and (origin is not None):
+            data["offset"] = self.started_at - origin
+        data["children"] = [x.to_dict(origin) for x in self.children]
+        return data
+
+
+class Profiler:
+    """
+    Build a per-phase timing tree from the events of an operation.
+
+    Events already record when they begin and end. The profiler passes
+    through an event generator and nests each event below the event that
+    was pending when it began, which reflects the phases of a jail start
+    or stop.
+
+    Example:
+
+        profiler = libioc.Profiler.Profiler("start")
+        for event in profiler.profile(jail.start()):
+            print(event)
+        print(profiler.to_json())
+    """
+
+    def __init__(self, name: str="root") -> None:
+        self.root = ProfileNode(name)
+        self._stack: typing.List[ProfileNode] = [self.root]
+        self._nodes: typing.Dict[int, typing.Tuple[
+            'libioc.events.IocEvent',
+            ProfileNode
+        ]] = {}
+
+    def profile(
+        self,
+        events: EventGenerator
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Record and pass through all events of a generator."""
+        for event in events:
+            self.record(event)
+            yield event
+
+    def consume(self, events: EventGenerator) -> 'Profiler':
+        """Record all events of a generator and discard them."""
+        for _ in self.profile(events):
+            pass
+        return self
+
+    def record(self, event: 'libioc.events.IocEvent') -> None:
+        """Record the state of an event."""
+        key = id(event)
+        if key not in self._nodes.keys():
+            if event.pending is False:
+                # an event that never was pending carries no timing
+                return
+            node = ProfileNode(
+                name=event.type,
+                identifier=getattr(event, "identifier", None)
+            )
+            node.started_at = event._started_at
+            self._stack[-1].children.append(node)
+            self._stack.append(node)
+            # the reference keeps the id of the event from being reused
+            self._nodes[key] = (event, node)
+            self._update_root(node)
+            return
+
+        _, node = self._nodes[key]
+        if event.pending is True:
+            return
+        node.stopped_at = event._stopped_at
+        node.status = event.get_state_string()
+        if node in self._stack:
+            self._stack.remove(node)
+        self._update_root(node)
+
+    def _update_root(self, node: ProfileNode) -> None:
+        root = self.root
+        started_at = node.started_at
+        stopped_at = node.stopped_at
+        if started_at is not None:
+            if (root.started_at is None) or (started_at < root.started_at):
+                root.started_at = started_at
+        if stopped_at is not None:
+            if (root.stopped_at is None) or (stopped_at > root.stopped_at):
+                root.stopped_at = stopped_at
+        root.status = "done" if (len(self._stack) == 1) else "pending"
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Return the timing tree as dict."""
+        return self.root.to_dict()
+
+    def to_json(self, indent: typing.Optional[int]=2) -> str:
+        """Return the timing tree as JSON."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def collapsed_stacks(self) -> typing.List[str]:
+        """
+        Return the timing tree in the collapsed stack format.
+
+        Each line contains the semicolon separated event stack followed by
+        the microseconds spent in the innermost event itself, as consumed
+        by flamegraph tools. Identical stacks are merged.
+        """
+        stacks: typing.Dict[str, int] = {}
+        for path, node in self.root.walk():
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0) + int(node.self_duration * 1e6)
+        return [f"{key} {value}" for key, value in stacks.items()]
+
+
+class ProfileAggregate:
+    """Timing percentiles of event stacks across many operations."""
+
+    def __init__(self) -> None:
+        self.samples: typing.Dict[str, typing.List[float]] = {}
+
+    def add(self, profiler: Profiler) -> None:
+        """Add the timing tree of one operation."""
+        durations: typing.Dict[str, float] = {}
+        for path, node in profiler.root.walk():
+            key = ";".join(path)
+            durations[key] = durations.get(key, 0) + node.duration
+        for key, duration in durations.items():
+            self.samples.setdefault(key, []).append(duration)
+
+    def percentiles(
+        self,
+        percentiles: typing.Iterable[int]=(50, 90, 99,)
+    ) -> typing.Dict[str, typing.Dict[str, float]]:
+        """Return count, percentiles and maximum of each event stack."""
+        output: typing.Dict[str, typing.Dict[str, float]] = {}
+        for key, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats: typing.Dict[str, float] = dict(count=len(ordered))
+            for percentile in percentiles:
+                stats[f"p{percentile}"] = _nearest_rank(ordered, percentile)
+            stats["max"] = ordered[-1]
+            output[key] = stats
+        return output
+
+    def to_json(self, indent: typing.Optional[int]=2) -> str:
+        """Return the percentiles as JSON."""
+        return json.dumps(self.percentiles(), indent=indent)
+
+
+def _nearest_rank(ordered: typing.List[float], percentile: int) -> float:
+    rank = math.ceil(percentile / 100 * len(ordered))
+    return ordered[max(0, rank - 1)]
+
+
+def main(args: typing.Optional[typing.List[str]]=None) -> None:
+    """Profile jail operations from the command line."""
+    import libioc.Jail
+    parser = argparse.ArgumentParser(
+        prog="python -m libioc.Profiler",
+        description="Profile the start, stop or restart of a jail."
+    )
+    parser.add_argument("action", choices=["start", "stop", "restart"])
+    parser.add_argument("jail")
+    parser.add_argument(
+        "--format",
+        choices=["json", "collapsed", "percentiles"],
+        default="json"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of restarts to aggregate (restart only)"
+    )
+    options = parser.parse_args(args)
+
+    jail = libioc.Jail.JailGenerator(options.jail)
+    aggregate = ProfileAggregate()
+    repeat = options.repeat if (options.action == "restart") else 1
+    profiler = Profiler(options.action)
+    for _ in range(repeat):
+        profiler = Profiler(options.action)
+        if options.action == "restart":
+            events = jail.restart(shutdown=True)
+        else:
+            events = getattr(jail, options.action)()
+        profiler.consume(events)
+        aggregate.add(profiler)
+
+    if options.format == "json":
+        print(profiler.to_json())
+    elif options.format == "collapsed":
+        print("\n".join(profiler.collapsed_stacks()))
+    else:
+        print(aggregate.to_json())
+
+
+if __name__ == "__main__":
+    main()
@@ -24,12 +24,15 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """ioc release module."""
 import typing
+import errno
 import hashlib
 import os
 import urllib.request
-import urllib.error
 import urllib.parse
 import re
+import shutil
+import time
+import tarfile
 
 import libzfs
 
@@ -42,6 +45,9 @@ import libioc.LaunchableResource
 import libioc.ResourceSelector
 import libioc.Jail
 import libioc.SecureTarfile
+import libioc.Downloader
+import libioc.AssetCache
+import libioc.ReleaseManifest
 
 # MyPy
 import libioc.Resource
@@ -210,6 +216,39 @@ class ReleaseResource(libioc.LaunchableResource.LaunchableResource):
             return str(self.root_datasets_name)
 
 
+class ReleaseSnapshotIndex:
+    """Patchlevel index of the version snapshots (e.g. p3) of a release."""
+
+    __pattern = re.compile(r"^p(\d+)$")
+
+    def __init__(
+        self,
+        snapshots: typing.Iterable['libzfs.ZFSSnapshot'],
+        generation: typing.Optional[str]=None
+    ) -> None:
+        # snapshots_changed of the root dataset when the index was built
+        self.generation = generation
+        self.snapshots: typing.Dict[int, 'libzfs.ZFSSnapshot'] = {}
+        for snapshot in snapshots:
+            match = self.__pattern.match(snapshot.snapshot_name)
+            if match is None:
+                continue
+            self.snapshots[int(match[1])] = snapshot
+        self.patchlevels = sorted(self.snapshots.keys(), reverse=True)
+        self.sorted_snapshots = [self.snapshots[i] for i in self.patchlevels]
+
+    @property
+    def latest(self) -> typing.Optional['libzfs.ZFSSnapshot']:
+        """Return the snapshot of the highest patchlevel."""
+        if len(self.sorted_snapshots) == 0:
+            return None
+        return self.sorted_snapshots[0]
+
+    def get(self, patchlevel: int) -> typing.Optional['libzfs.ZFSSnapshot']:
+        """Return the snapshot of a patchlevel."""
+        return self.snapshots.get(patchlevel)
+
+
 class ReleaseGenerator(ReleaseResource):
     """Release with generator interfaces."""
 
@@ -244,6 +283,24 @@ class ReleaseGenerator(ReleaseResource):
     _resource: libioc.Resource.Resource
     _assets: typing.List[str]
     _mirror_url: typing.Optional[str]
+    _asset_cache: typing.Optional['libioc.AssetCache.AssetCache']
+
+    # number of release assets downloaded in parallel
+    download_concurrency: int = 4
+    # extract assets while they are downloaded instead of storing them
+    stream_assets: bool = True
+    # number of release assets extracted in parallel
+    extract_concurrency: int = 3
+    # xz decompressor of release assets: "auto", "lzma" or "xz"
+    decompressor: str = "auto"
+
+    # user property of the base dataset naming the root dataset snapshot
+    # that the base release was synchronized from
+    base_sync_property: str = "org.freebsd.iocage:base_sync_snapshot"
+    base_sync_snapshot_prefix: str = "base_sync"
+
+    # shared by all instances of a release, keyed by root dataset name
+    __snapshot_indexes: typing.Dict[str, ReleaseSnapshotIndex] = {}
 
     def __init__(
         self,
@@ -258,6 +315,7 @@ class ReleaseGenerator(ReleaseResource):
         logger: typing.Optional['libioc.Logger.Logger']=None,
         check_hashes: bool=True,
         check_eol: bool=True,
+        asset_cache: typing.Optional['libioc.AssetCache.AssetCache']=None
     ) -> None:
         self.logger = libioc.helpers_object.init_logger(self, logger)
         self.zfs = libioc.helpers_object.init_zfs(self, zfs)
@@ -287,6 +345,7 @@ class ReleaseGenerator(ReleaseResource):
         self._mirror_url = None
 
         self._hashes = None
+        self._asset_cache = asset_cache
         self.check_hashes = check_hashes is True
         self.check_eol = check_eol is True
 
@@ -444,6 +503,12 @@ class ReleaseGenerator(ReleaseResource):
     @property
     def current_snapshot_patchlevel(self) -> int:
         """Return the currently chosen patchlevel number or the latest."""
+        if self.patchlevel is not None:
+            if self._get_version_snapshot(self.patchlevel) is not None:
+                return int(self.patchlevel)
+        snapshot_index = self.snapshot_index
+        if len(snapshot_index.patchlevels) > 0:
+            return snapshot_index.patchlevels[0]
         current_snapshot_name = self.current_snapshot.snapshot_name
         return int(current_snapshot_name.lstrip('p'))
 
@@ -451,9 +516,9 @@ class ReleaseGenerator(ReleaseResource):
     def current_snapshot(self) -> libzfs.ZFSSnapshot:
         """Return the manually configured or the latest release snapshot."""
         if self.patchlevel is not None:
-            for snapshot in self.version_snapshots:
-                if snapshot.snapshot_name == f"p{self.patchlevel}":
-                    return snapshot
+            snapshot = self._get_version_snapshot(self.patchlevel)
+            if snapshot is not None:
+                return snapshot
 
         return self.latest_snapshot
 
@@ -464,27 +529,156 @@ class ReleaseGenerator(ReleaseResource):
 
         When no snapshot was taken before `p0` is automatically created.
         """
-        version_snapshots = self.version_snapshots
-        if len(version_snapshots) == 0:
+        latest_snapshot = self.snapshot_index.latest
+        if latest_snapshot is None:
+            # another process might have taken the first snapshot meanwhile
+            self.invalidate_snapshot_index()
+            latest_snapshot = self.snapshot_index.latest
+        if latest_snapshot is None:
             self.logger.verbose("No release snapshot found - using @p0")
             return self.snapshot("p0")
         else:
-            return version_snapshots[0]
+            return latest_snapshot
 
     @property
     def version_snapshots(self) -> typing.List['libzfs.ZFSSnapshot']:
         """Return the sorted list of taken version snapshots (e.g. p3)."""
-        versions: typing.List[int] = []
-        snapshots: typing.Dict[int, 'libzfs.ZFSSnapshot'] = {}
-        pattern = re.compile(r"^p(\d+)$")
-        for snapshot in self.root_dataset.snapshots:
-            match = pattern.match(snapshot.snapshot_name)
-            if match is None:
-                continue
-            patch_level = int(match[1])
-            versions.append(patch_level)
-            snapshots[patch_level] = snapshot
-        return [snapshots[i] for i in reversed(sorted(versions))]
+        return list(self.snapshot_index.sorted_snapshots)
+
+    @property
+    def snapshot_index(self) -> ReleaseSnapshotIndex:
+        """
+        Return the patchlevel index of the release snapshots.
+
+        The index is shared within the process and invalidated when libioc
+        creates or deletes release snapshots. Snapshots taken by other
+        processes are noticed by the snapshots_changed property of the root
+        dataset. Pools that do not provide this property rebuild the index
+        when a patchlevel lookup misses.
+        """
+        key = self.root_dataset_name
+        generation = self._snapshot_index_generation
+        snapshot_index = self.__snapshot_indexes.get(key)
+        if (snapshot_index is not None) and (
+            (generation is None) or (snapshot_index.generation == generation)
+        ):
+            return snapshot_index
+        snapshot_index = ReleaseSnapshotIndex(
+            self.root_dataset.snapshots,
+            generation=generation
+        )
+        self.__snapshot_indexes[key] = snapshot_index
+        return snapshot_index
+
+    @property
+    def _snapshot_index_generation(self) -> typing.Optional[str]:
+        try:
+            value = self.root_dataset.properties["snapshots_changed"]
+        except KeyError:
+            return None
+        generation = str(value.value)
+        return None if (generation in ("", "-",)) else generation
+
+    def invalidate_snapshot_index(self) -> None:
+        """Drop the patchlevel index after release snapshots changed."""
+        self.__snapshot_indexes.pop(self.root_dataset_name, None)
+
+    def _get_version_snapshot(
+        self,
+        patchlevel: int
+    ) -> typing.Optional['libzfs.ZFSSnapshot']:
+        snapshot = self.snapshot_index.get(patchlevel)
+        if snapshot is None:
+            # the snapshot might have been taken by another process
+            self.invalidate_snapshot_index()
+            snapshot = self.snapshot_index.get(patchlevel)
+        return snapshot
+
+    @property
+    def manifests_dir(self) -> str:
+        """Return the directory of the recorded patchlevel manifests."""
+        return f"{self.dataset.mountpoint}/manifests"
+
+    def get_manifest_path(
+        self,
+        from_patchlevel: int,
+        to_patchlevel: int
+    ) -> str:
+        """Return the path of the manifest between two patchlevels."""
+        return f"{self.manifests_dir}/p{from_patchlevel}-p{to_patchlevel}.json"
+
+    def get_snapshot_path(self, patchlevel: int) -> str:
+        """Return the directory of a patchlevel snapshot."""
+        return f"{self.root_dataset.mountpoint}/.zfs/snapshot/p{patchlevel}"
+
+    def record_manifest(
+        self,
+        patchlevel: int
+    ) -> typing.Optional['libioc.ReleaseManifest.ReleaseManifest']:
+        """
+        Record the changes of a patchlevel since the previous snapshot.
+
+        Returns None when there is no earlier patchlevel snapshot.
+        """
+        snapshot = self._get_version_snapshot(patchlevel)
+        snapshot_index = self.snapshot_index
+        previous_patchlevels = [
+            x for x in snapshot_index.patchlevels if x < patchlevel
+        ]
+        if (snapshot is None) or (len(previous_patchlevels) == 0):
+            return None
+        previous_patchlevel = previous_patchlevels[0]
+        previous_snapshot = snapshot_index.snapshots[previous_patchlevel]
+
+        changes = libioc.ZFS.diff(
+            previous_snapshot.name,
+            snapshot.name,
+            logger=self.logger
+        )
+        manifest = libioc.ReleaseManifest.ReleaseManifest.create(
+            from_patchlevel=previous_patchlevel,
+            to_patchlevel=patchlevel,
+            changes=changes,
+            mountpoint=self.root_dataset.mountpoint,
+            from_root=self.get_snapshot_path(previous_patchlevel),
+            to_root=self.get_snapshot_path(patchlevel)
+        )
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        manifest.save(self.get_manifest_path(previous_patchlevel, patchlevel))
+        self.logger.verbose(
+            f"Recorded {len(manifest)} changed paths of {self.name} "
+            f"from p{previous_patchlevel} to p{patchlevel}"
+        )
+        return manifest
+
+    def get_manifest_delta(
+        self,
+        patchlevel: int
+    ) -> typing.Optional['libioc.ReleaseManifest.ReleaseManifest']:
+        """
+        Return the merged changes from a patchlevel to the latest one.
+
+        Returns None when the patchlevel is already the latest or a
+        manifest between two consecutive snapshots was not recorded.
+        """
+        patchlevels = sorted(
+            x for x in self.snapshot_index.patchlevels if x >= patchlevel
+        )
+        if (len(patchlevels) < 2) or (patchlevels[0] != patchlevel):
+            return None
+        manifests = []
+        for from_patchlevel, to_patchlevel in zip(
+            patchlevels,
+            patchlevels[1:]
+        ):
+            path = self.get_manifest_path(from_patchlevel, to_patchlevel)
+            try:
+                manifests.append(libioc.ReleaseManifest.ReleaseManifest.load(
+                    path
+                ))
+            except FileNotFoundError:
+                return None
+        return libioc.ReleaseManifest.ReleaseManifest.merge(manifests)
 
     def _require_release_supported(self) -> None:
         if self.host.distribution.name == "HardenedBSD":
@@ -542,10 +736,9 @@ class ReleaseGenerator(ReleaseResource):
     def available(self) -> bool:
         """Return True if the release is available on the remote mirror."""
         try:
-            request = urllib.request.Request(self.remote_url, method="HEAD")
-            resource = urllib.request.urlopen(request)  # nosec: trusted URL
-            return (resource.getcode() == 200) is True
-        except urllib.error.URLError:
+            status = self.host.metadata_cache.status(self.remote_url)
+            return (status == 200) is True
+        except libioc.errors.DownloadFailed:
             pass
         return False
 
@@ -606,6 +799,32 @@ class ReleaseGenerator(ReleaseResource):
                 self.host.datasets.releases.pool  # type: ignore[attr-defined]
             return pool
 
+    @property
+    def asset_cache(self) -> typing.Optional['libioc.AssetCache.AssetCache']:
+        """
+        Return the content-addressed cache of release assets.
+
+        Unless an AssetCache was passed, the host /etc/rc.conf variables
+        ioc_asset_cache (directory) and ioc_asset_cache_size (bytes or a
+        K, M, G or T suffixed size) configure the cache.
+        """
+        if self._asset_cache is not None:
+            return self._asset_cache
+        rc_conf = libioc.Config.Host.rc_conf
+        if "ioc_asset_cache" not in rc_conf:
+            return None
+        max_size = 0
+        if "ioc_asset_cache_size" in rc_conf:
+            max_size = libioc.AssetCache.parse_size(
+                str(rc_conf["ioc_asset_cache_size"])
+            )
+        self._asset_cache = libioc.AssetCache.AssetCache(
+            path=str(rc_conf["ioc_asset_cache"]),
+            max_size=max_size,
+            logger=self.logger
+        )
+        return self._asset_cache
+
     @property
     def hashes(self) -> typing.Dict[str, str]:
         """Return the releases asset hashes."""
@@ -716,10 +935,6 @@ class ReleaseGenerator(ReleaseResource):
             self,
             scope=_scope
         )
-        releaseCopyBaseEvent = events.ReleaseCopyBase(
-            self,
-            scope=_scope
-        )
 
         if self.fetched is False:
 
@@ -734,23 +949,32 @@ class ReleaseGenerator(ReleaseResource):
             self._ensure_dataset_mounted()
 
             yield releasePrepareStorageEvent.end()
+            stream_assets = self._can_stream_assets
             yield releaseDownloadEvent.begin()
             try:
-                yield from self._fetch_assets(releaseDownloadEvent.scope)
+                if stream_assets is True:
+                    yield from self._fetch_and_extract_assets(
+                        releaseDownloadEvent.scope
+                    )
+                else:
+                    yield from self._fetch_assets(releaseDownloadEvent.scope)
             except Exception:
                 yield releaseDownloadEvent.fail()
                 raise
             yield releaseDownloadEvent.end()
 
-            yield releaseExtractionEvent.begin()
-
-            try:
-                self._extract_assets()
-            except Exception as e:
-                yield releaseExtractionEvent.fail(e)
-                raise
-
-            yield releaseExtractionEvent.end()
+            if stream_assets is True:
+                yield releaseExtractionEvent.skip(
+                    message="extracted while downloading"
+                )
+            else:
+                yield releaseExtractionEvent.begin()
+                try:
+                    self._extract_assets()
+                except Exception as e:
+                    yield releaseExtractionEvent.fail(e)
+                    raise
+                yield releaseExtractionEvent.end()
             release_changed = True
 
             yield fetchReleaseEvent.end()
@@ -787,7 +1011,7 @@ class ReleaseGenerator(ReleaseResource):
             try:
                 for event in self.updater.fetch(event_scope=_scope):
                     if isinstance(event, libioc.events.ReleaseUpdateDownload):
-                        if (event.done and event.skipped) is True:
+                        if event.skipped is True:
                             update = False
                     yield event
             except libioc.errors.IocException:
@@ -801,6 +1025,25 @@ class ReleaseGenerator(ReleaseResource):
                     # the only non-IocEvent is our return value
                     release_changed = event
 
+        yield from self._update_base_release_step(
+            release_changed,
+            update_base=update_base,
+            event_scope=_scope
+        )
+
+        self._cleanup()
+
+    def _update_base_release_step(
+        self,
+        release_changed: typing.Optional[bool],
+        update_base: typing.Optional[bool]=None,
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Update the ZFS basejail datasets when legacy support requires."""
+        releaseCopyBaseEvent = libioc.events.ReleaseCopyBase(
+            self,
+            scope=event_scope
+        )
         yield releaseCopyBaseEvent.begin()
         if update_base is True:
             _update_base = True
@@ -825,9 +1068,70 @@ class ReleaseGenerator(ReleaseResource):
                 message="legacy basejal support disabled"
             )
 
-        self._cleanup()
-
     def _copy_to_base_release(self) -> None:
+        """
+        Synchronize the base datasets with the release root.
+
+        The root dataset snapshot of the last synchronization is stored
+        in a user property of the base dataset. Only paths listed by zfs
+        diff since that snapshot are copied, so that an unchanged release
+        is not scanned again. Without a previous snapshot all files are
+        copied with rsync.
+        """
+        previous_snapshot_name = self._base_sync_snapshot_name
+        if previous_snapshot_name is not None:
+            try:
+                changes = libioc.ZFS.diff(
+                    previous_snapshot_name,
+                    self.root_dataset.name,
+                    logger=self.logger
+                )
+            except libioc.errors.CommandFailure:
+                self.logger.verbose(
+                    f"Base release snapshot {previous_snapshot_name} "
+                    "is unavailable - copying all files"
+                )
+                previous_snapshot_name = None
+            else:
+                if len(changes) == 0:
+                    self.logger.verbose(
+                        "Base release is in sync with "
+                        f"{previous_snapshot_name}"
+                    )
+                    return
+
+        snapshot_name = libioc.ZFS.append_snapshot_datetime(
+            f"{self.root_dataset.name}@{self.base_sync_snapshot_prefix}"
+        )
+        self.root_dataset.snapshot(snapshot_name)
+        try:
+            if previous_snapshot_name is None:
+                self._rsync_to_base_release()
+            else:
+                self._apply_base_release_changes(libioc.ZFS.diff(
+                    previous_snapshot_name,
+                    snapshot_name,
+                    logger=self.logger
+                ))
+        except BaseException:
+            self.zfs.get_snapshot(snapshot_name).delete()
+            raise
+
+        self.base_dataset.properties[self.base_sync_property] = \
+            libzfs.ZFSUserProperty(snapshot_name)
+        if previous_snapshot_name is not None:
+            self.zfs.get_snapshot(previous_snapshot_name).delete()
+
+    @property
+    def _base_sync_snapshot_name(self) -> typing.Optional[str]:
+        try:
+            value = self.base_dataset.properties[self.base_sync_property]
+        except KeyError:
+            return None
+        snapshot_name = str(value.value)
+        return None if (snapshot_name in ("", "-",)) else snapshot_name
+
+    def _rsync_to_base_release(self) -> None:
         libioc.helpers.exec(
             [
                 "rsync",
@@ -839,6 +1143,59 @@ class ReleaseGenerator(ReleaseResource):
             logger=self.logger
         )
 
+    def _apply_base_release_changes(
+        self,
+        changes: typing.List[libioc.ZFS.ZFSDiffEntry]
+    ) -> None:
+        source_root = self.root_dataset.mountpoint
+        target_root = self.base_dataset.mountpoint
+
+        def _get_target(path: str) -> str:
+            relative_path = os.path.relpath(path, source_root)
+            return os.path.normpath(os.path.join(target_root, relative_path))
+
+        Entry = libioc.ZFS.ZFSDiffEntry
+        updated_paths = set()
+        removed_paths = set()
+        renamed_paths: typing.List[typing.Tuple[str, str]] = []
+        for change in changes:
+            if change.change == Entry.REMOVED:
+                removed_paths.add(change.path)
+            elif change.change == Entry.RENAMED:
+                new_path = typing.cast(str, change.new_path)
+                renamed_paths.append((change.path, new_path,))
+                updated_paths.add(new_path)
+            else:
+                updated_paths.add(change.path)
+
+        # contents of renamed directories are not listed as changes
+        for path, new_path in renamed_paths:
+            target = _get_target(path)
+            new_target = _get_target(new_path)
+            if os.path.lexists(target) and not os.path.lexists(new_target):
+                try:
+                    os.rename(target, new_target)
+                    continue
+                except OSError as e:
+                    # base child datasets are separate file systems
+                    if e.errno != errno.EXDEV:
+                        raise
+                libioc.helpers.remove_path(target)
+            if os.path.isdir(new_path) and not os.path.islink(new_path):
+                libioc.helpers.remove_path(new_target)
+                shutil.copytree(new_path, new_target, symlinks=True)
+
+        self.logger.verbose(
+            f"Copying {len(updated_paths)} and removing {len(removed_paths)} "
+            f"changed paths to the base release"
+        )
+        for path in sorted(removed_paths - updated_paths, reverse=True):
+            libioc.helpers.remove_path(_get_target(path))
+        # parent directories sort before their children
+        for path in sorted(updated_paths):
+            if os.path.lexists(path) is True:
+                libioc.helpers.copy_path(path, _get_target(path))
+
     @property
     def _base_resource(self) -> ReleaseResource:
         # ReleaseResource inherits the abstract destroy method, so this
@@ -884,6 +1241,7 @@ class ReleaseGenerator(ReleaseResource):
             existing_snapshot = None
             pass
 
+        self.invalidate_snapshot_index()
         if existing_snapshot is not None:
             self.logger.verbose(
                 f"Deleting release snapshot {self.name}@{identifier}"
@@ -910,31 +1268,166 @@ class ReleaseGenerator(ReleaseResource):
         self,
         event_scope: typing.Optional['libioc.events.Scope']=None,
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        events: typing.Dict[
+            str,
+            libioc.events.ReleaseAssetDownload
+        ] = {}
+        jobs: typing.List[libioc.Downloader.DownloadJob] = []
         for asset in self.assets:
-
             releaseAssetDownloadEvent = libioc.events.ReleaseAssetDownload(
                 release=self,
+                asset=asset,
                 scope=event_scope
             )
             yield releaseAssetDownloadEvent.begin()
+            path = self._get_asset_location(asset)
+            if os.path.isfile(path):
+                yield releaseAssetDownloadEvent.skip(f"{path} already exists")
+                continue
+            if self._restore_cached_asset(asset) is True:
+                yield releaseAssetDownloadEvent.skip("found in asset cache")
+                continue
             url = f"{self.remote_url}/{asset}.txz"
+            self.logger.debug(f"Starting download of {url}")
+            jobs.append(libioc.Downloader.DownloadJob(url=url, path=path))
+            events[path] = releaseAssetDownloadEvent
+
+        downloader = libioc.Downloader.Downloader(
+            concurrency=self.download_concurrency,
+            logger=self.logger
+        )
+        progress_interval = 1
+        reported_at: typing.Dict[str, float] = {}
+        try:
+            for job, bytes_received, bytes_total in downloader.download(jobs):
+                event = events[job.path]
+                event.bytes_received = bytes_received
+                event.bytes_total = bytes_total
+                if job.done is True:
+                    yield event.end()
+                elif job.error is not None:
+                    yield event.fail(job.error)
+                else:
+                    now = time.monotonic()
+                    if (now - reported_at.get(job.path, 0)) \
+                            < progress_interval:
+                        continue
+                    reported_at[job.path] = now
+                    yield event
+        except Exception:
+            for event in events.values():
+                if event.pending is True:
+                    yield event.fail()
+            raise
+
+    @property
+    def _can_stream_assets(self) -> bool:
+        """Return True if no asset needs to be stored before extraction."""
+        if self.stream_assets is False:
+            return False
+        if self.asset_cache is not None:
+            # the asset files are stored in the cache
+            return False
+        scheme = urllib.parse.urlparse(self.remote_url).scheme
+        if scheme not in ("http", "https",):
+            return False
+        for asset in self.assets:
+            # downloaded or partial assets are completed and extracted
             path = self._get_asset_location(asset)
+            if os.path.exists(path) or os.path.exists(f"{path}.part"):
+                return False
+        return True
 
-            if os.path.isfile(path):
-                yield releaseAssetDownloadEvent.skip("{path} already exists")
-            else:
-                try:
-                    self.logger.debug(f"Starting download of {url}")
-                    urllib.request.urlretrieve(url, path)  # nosec: validated
-                    self.logger.verbose(f"{url} was saved to {path}")
-                    yield releaseAssetDownloadEvent.end()
-                except urllib.error.HTTPError as http_error:
-                    yield releaseAssetDownloadEvent.fail()
-                    raise libioc.errors.DownloadFailed(
-                        url=url,
-                        code=http_error.code,
-                        logger=self.logger
+    def _fetch_and_extract_assets(
+        self,
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """
+        Download, verify and extract the assets in a single pass.
+
+        The bytes of each asset are hashed while they are decompressed and
+        extracted into the root dataset. The extraction is rolled back to
+        a snapshot taken before, unless all digests match the hashes.
+        """
+        snapshot_name = libioc.ZFS.append_snapshot_datetime(
+            f"{self.root_dataset.name}@fetch"
+        )
+        self.root_dataset.snapshot(snapshot_name)
+        snapshot = self.zfs.get_snapshot(snapshot_name)
+        downloader = libioc.Downloader.Downloader(logger=self.logger)
+        try:
+            yield from libioc.helpers.iterate_concurrently(
+                [
+                    self._fetch_and_extract_asset(
+                        asset,
+                        downloader=downloader,
+                        event_scope=event_scope
                     )
+                    for asset in self.assets
+                ],
+                concurrency=self.extract_concurrency
+            )
+        except BaseException:
+            self.logger.verbose(
+                f"Rolling back the extraction of {self.name} assets"
+            )
+            snapshot.rollback(force=True)
+            raise
+        finally:
+            downloader.close()
+            snapshot.delete()
+
+    def _fetch_and_extract_asset(
+        self,
+        asset: str,
+        downloader: 'libioc.Downloader.Downloader',
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        releaseAssetDownloadEvent = libioc.events.ReleaseAssetDownload(
+            release=self,
+            asset=asset,
+            scope=event_scope
+        )
+        yield releaseAssetDownloadEvent.begin()
+        url = f"{self.remote_url}/{asset}.txz"
+        job = libioc.Downloader.DownloadJob(url=url, path="")
+        reader = libioc.Downloader.StreamReader(
+            downloader.stream(url, job=job)
+        )
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            file=f"{asset}.txz",
+            compression_format="xz",
+            logger=self.logger,
+            fileobj=typing.cast(typing.IO[bytes], reader),
+            decompressor=self.decompressor
+        )
+        progress_interval = 1
+        reported_at = time.monotonic()
+        try:
+            self.logger.debug(f"Streaming {url} into {self.root_dir}")
+            for _ in secure_tarfile.extract_stream(self.root_dir):
+                now = time.monotonic()
+                if (now - reported_at) < progress_interval:
+                    continue
+                reported_at = now
+                releaseAssetDownloadEvent.bytes_received = job.bytes_received
+                releaseAssetDownloadEvent.bytes_total = job.bytes_total
+                yield releaseAssetDownloadEvent
+            reader.drain()
+            if self.check_hashes:
+                self._check_asset_hash(asset, reader.hexdigest)
+        except GeneratorExit:
+            # another asset failed and its siblings are closed
+            raise
+        except BaseException as e:
+            yield releaseAssetDownloadEvent.fail(e)
+            raise
+        finally:
+            # the connections belong to the extracting thread
+            downloader.close()
+        releaseAssetDownloadEvent.bytes_received = job.bytes_received
+        releaseAssetDownloadEvent.bytes_total = job.bytes_total
+        yield releaseAssetDownloadEvent.end()
 
     def read_hashes(self) -> typing.Dict[str, str]:
         """Read the release asset hashes."""
@@ -966,18 +1459,50 @@ class ReleaseGenerator(ReleaseResource):
         return f"{self.download_directory}/{asset_name}.txz"
 
     def _extract_assets(self) -> None:
+        extractions = libioc.helpers.iterate_concurrently(
+            [self._extract_asset(asset) for asset in self.assets],
+            concurrency=self.extract_concurrency
+        )
+        for _ in extractions:
+            pass
 
-        for asset in self.assets:
+    def _extract_asset(
+        self,
+        asset: str
+    ) -> typing.Generator[tarfile.TarInfo, None, None]:
 
-            if self.check_hashes:
-                self._check_asset_hash(asset)
+        if self.check_hashes:
+            self._check_asset_hash(asset)
+            self._store_cached_asset(asset)
 
-            libioc.SecureTarfile.extract(
-                file=self._get_asset_location(asset),
-                compression_format="xz",
-                destination=self.root_dir,
-                logger=self.logger
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            file=self._get_asset_location(asset),
+            compression_format="xz",
+            logger=self.logger,
+            decompressor=self.decompressor
+        )
+        yield from secure_tarfile.extract_stream(self.root_dir)
+
+    def _restore_cached_asset(self, asset: str) -> bool:
+        # cached assets are only addressed by verified hashes
+        if (self.asset_cache is None) or (self.check_hashes is False):
+            return False
+        return self.asset_cache.restore(
+            self.hashes[asset],
+            self._get_asset_location(asset)
+        )
+
+    def _store_cached_asset(self, asset: str) -> None:
+        if self.asset_cache is None:
+            return
+        try:
+            self.asset_cache.store(
+                self.hashes[asset],
+                self._get_asset_location(asset)
             )
+        except OSError as e:
+            # read-only mirrors are only consulted
+            self.logger.warn(f"Could not store {asset}.txz in cache: {e}")
 
     def _set_default_rc_conf(self) -> bool:
 
@@ -1029,8 +1554,13 @@ class ReleaseGenerator(ReleaseResource):
             if os.path.isfile(asset_location):
                 os.remove(asset_location)
 
-    def _check_asset_hash(self, asset_name: str) -> None:
-        local_file_hash = self._read_asset_hash(asset_name)
+    def _check_asset_hash(
+        self,
+        asset_name: str,
+        local_file_hash: typing.Optional[str]=None
+    ) -> None:
+        if local_file_hash is None:
+            local_file_hash = self._read_asset_hash(asset_name)
         expected_hash = self.hashes[asset_name]
 
         has_valid_hash = local_file_hash == expected_hash
@@ -1075,6 +1605,8 @@ class ReleaseGenerator(ReleaseResource):
             scope=event_scope
         )
         yield zfsDatasetDestroyEvent.begin()
+        self.host.identity_map.discard(self)
+        self.invalidate_snapshot_index()
         try:
             self.zfs.delete_dataset_recursive(self.dataset)
         except Exception as e:
@@ -0,0 +1,346 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc release manifest module."""
+import typing
+import hashlib
+import json
+import os
+import stat
+
+import libioc.ZFS
+import libioc.errors
+import libioc.helpers
+
+DIRECTORY = "directory"
+
+
+def get_digest(path: str) -> typing.Optional[str]:
+    """
+    Return the content digest of a file, link or directory entry.
+
+    Regular files are hashed with SHA256, links are identified by their
+    target. None is returned when the path does not exist.
+    """
+    try:
+        path_stat = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    if stat.S_ISDIR(path_stat.st_mode):
+        return DIRECTORY
+    if stat.S_ISLNK(path_stat.st_mode):
+        return f"symlink:{os.readlink(path)}"
+    if stat.S_ISREG(path_stat.st_mode):
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                sha256.update(chunk)
+        return f"sha256:{sha256.hexdigest()}"
+    return f"node:{path_stat.st_mode:o}:{path_stat.st_rdev}"
+
+
+def get_target_path(
+    root: str,
+    path: str,
+    logger: typing.Optional['libioc.Logger.Logger']=None
+) -> str:
+    """
+    Join a manifest path onto a jail root without leaving the root.
+
+    The directories below the root are controlled by the jail, so none of
+    the parents of the path may be a symlink. The last component itself
+    is never followed when it is replaced or removed.
+    """
+    components = path.split("/")
+    target = os.path.join(root, path)
+    if path.startswith("/") or (".." in components):
+        raise libioc.errors.InsecureJailPath(path=target, logger=logger)
+    current_path = root
+    for component in components[:-1]:
+        current_path = os.path.join(current_path, component)
+        if os.path.islink(current_path) is True:
+            raise libioc.errors.InsecureJailPath(path=target, logger=logger)
+    return target
+
+
+class ManifestEntry:
+    """A path that changed between two release patchlevels."""
+
+    def __init__(
+        self,
+        path: str,
+        old_digest: typing.Optional[str]=None,
+        new_digest: typing.Optional[str]=None
+    ) -> None:
+        self.path = path
+        self.old_digest = old_digest
+        self.new_digest = new_digest
+
+    @property
+    def removed(self) -> bool:
+        """Return True if the path does not exist after the change."""
+        return self.new_digest is None
+
+    @property
+    def is_directory(self) -> bool:
+        """Return True if the path is a directory after the change."""
+        return self.new_digest == DIRECTORY
+
+    def to_dict(self) -> typing.Dict[str, typing.Optional[str]]:
+        """Return the JSON serializable entry."""
+        return dict(
+            path=self.path,
+            old=self.old_digest,
+            new=self.new_digest
+        )
+
+    @staticmethod
+    def from_dict(
+        data: typing.Dict[str, typing.Optional[str]]
+    ) -> 'ManifestEntry':
+        """Create an entry from its JSON representation."""
+        return ManifestEntry(
+            path=str(data["path"]),
+            old_digest=data["old"],
+            new_digest=data["new"]
+        )
+
+
+class ReleaseManifest:
+    """
+    Changed paths of a release between two patchlevel snapshots.
+
+    Each entry records the digest of a path before and after the change,
+    so that a standalone jail cloned from the older patchlevel can be
+    checked for local modifications and then be brought to the newer
+    patchlevel by copying only the changed files from the release
+    snapshot, without bootstrapping the updater in the jail.
+    """
+
+    def __init__(
+        self,
+        from_patchlevel: int,
+        to_patchlevel: int,
+        entries: typing.Iterable[ManifestEntry]=[]
+    ) -> None:
+        self.from_patchlevel = from_patchlevel
+        self.to_patchlevel = to_patchlevel
+        self.entries: typing.Dict[str, ManifestEntry] = {}
+        for entry in entries:
+            self.entries[entry.path] = entry
+
+    def __len__(self) -> int:
+        """Return the number of changed paths."""
+        return len(self.entries)
+
+    @staticmethod
+    def create(
+        from_patchlevel: int,
+        to_patchlevel: int,
+        changes: typing.Iterable[libioc.ZFS.ZFSDiffEntry],
+        mountpoint: str,
+        from_root: str,
+        to_root: str
+    ) -> 'ReleaseManifest':
+        """
+        Create a manifest from the output of zfs diff.
+
+        The changed paths are relative to the mountpoint of the dataset and
+        are hashed in the snapshot directories of both patchlevels.
+        """
+        paths: typing.Set[str] = set()
+        for change in changes:
+            path = os.path.relpath(change.path, mountpoint)
+            paths.add(path)
+            if change.change != libioc.ZFS.ZFSDiffEntry.RENAMED:
+                continue
+            new_path = os.path.relpath(
+                typing.cast(str, change.new_path),  # cast for mypy
+                mountpoint
+            )
+            paths.add(new_path)
+            # contents of renamed directories are not listed as changes
+            paths.update(ReleaseManifest._walk(from_root, path))
+            paths.update(ReleaseManifest._walk(to_root, new_path))
+
+        entries = []
+        for path in paths:
+            entry = ManifestEntry(
+                path=path,
+                old_digest=get_digest(os.path.join(from_root, path)),
+                new_digest=get_digest(os.path.join(to_root, path))
+            )
+            if entry.old_digest == entry.new_digest == DIRECTORY:
+                # directory listing changed, its children are entries
+                continue
+            entries.append(entry)
+        return ReleaseManifest(from_patchlevel, to_patchlevel, entries)
+
+    @staticmethod
+    def _walk(root: str, path: str) -> typing.Generator[str, None, None]:
+        for directory, dirs, files in os.walk(os.path.join(root, path)):
+            for name in dirs + files:
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+    @staticmethod
+    def merge(
+        manifests: typing.Sequence['ReleaseManifest']
+    ) -> 'ReleaseManifest':
+        """Combine consecutive manifests into a single delta."""
+        entries: typing.Dict[str, ManifestEntry] = {}
+        for manifest in manifests:
+            for path, entry in manifest.entries.items():
+                if path in entries:
+                    entries[path] = ManifestEntry(
+                        path=path,
+                        old_digest=entries[path].old_digest,
+                        new_digest=entry.new_digest
+                    )
+                else:
+                    entries[path] = entry
+        return ReleaseManifest(
+            from_patchlevel=manifests[0].from_patchlevel,
+            to_patchlevel=manifests[-1].to_patchlevel,
+            entries=filter(
+                lambda x: not (x.old_digest is x.new_digest is None),
+                entries.values()
+            )
+        )
+
+    @staticmethod
+    def load(path: str) -> 'ReleaseManifest':
+        """Read a manifest from a JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return ReleaseManifest(
+            from_patchlevel=int(data["from_patchlevel"]),
+            to_patchlevel=int(data["to_patchlevel"]),
+            entries=map(ManifestEntry.from_dict, data["entries"])
+        )
+
+    def save(self, path: str) -> None:
+        """Write the manifest to a JSON file."""
+        data = dict(
+            from_patchlevel=self.from_patchlevel,
+            to_patchlevel=self.to_patchlevel,
+            entries=[
+                self.entries[x].to_dict() for x in sorted(self.entries)
+            ]
+        )
+        temporary_path = f"{path}.part"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary_path, path)
+
+    def conflicts(self, target_root: str) -> typing.List[str]:
+        """
+        Return the paths that were changed locally in the target.
+
+        A path conflicts when it matches neither the old nor the new
+        digest of the entry, or when one of its parent directories in the
+        target is a symlink.
+        """
+        conflicts = []
+        for path, entry in sorted(self.entries.items()):
+            try:
+                target = get_target_path(target_root, path)
+            except libioc.errors.SecurityViolation:
+                conflicts.append(path)
+                continue
+            if get_digest(target) not in (entry.old_digest, entry.new_digest):
+                conflicts.append(path)
+        return conflicts
+
+    def apply(
+        self,
+        source_root: str,
+        target_root: str,
+        concurrency: int=8,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        """
+        Copy the changed paths from the source and remove deleted ones.
+
+        The source is the snapshot directory of the newer patchlevel.
+        Directories are created first, then files are copied in parallel.
+        Removed directories are only deleted when they are empty, so that
+        files added locally are kept. Conflicts are not checked here, but
+        paths below symlinked directories of the target are rejected with
+        InsecureJailPath right before they would be touched.
+        """
+        directories = []
+        files = []
+        removed = []
+        for path, entry in sorted(self.entries.items()):
+            if entry.removed is True:
+                removed.append(entry)
+            elif entry.is_directory is True:
+                directories.append(path)
+            else:
+                files.append(path)
+
+        if logger is not None:
+            logger.verbose(
+                f"Copying {len(files)} files and removing {len(removed)} "
+                f"paths of release patchlevel p{self.to_patchlevel}"
+            )
+
+        # parent directories sort before their children
+        for path in directories:
+            libioc.helpers.copy_path(
+                os.path.join(source_root, path),
+                get_target_path(target_root, path, logger=logger)
+            )
+
+        for _ in libioc.helpers.iterate_concurrently(
+            [
+                self._copy(source_root, target_root, path, logger)
+                for path in files
+            ],
+            concurrency=concurrency
+        ):
+            pass
+
+        for entry in reversed(removed):
+            target = get_target_path(target_root, entry.path, logger=logger)
+            if os.path.isdir(target) and not os.path.islink(target):
+                try:
+                    os.rmdir(target)
+                except OSError:
+                    # the directory contains local files
+                    pass
+            else:
+                libioc.helpers.remove_path(target)
+
+    @staticmethod
+    def _copy(
+        source_root: str,
+        target_root: str,
+        path: str,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> typing.Generator[str, None, None]:
+        libioc.helpers.copy_path(
+            os.path.join(source_root, path),
+            get_target_path(target_root, path, logger=logger)
+        )
+        yield path
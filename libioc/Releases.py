@@ -103,14 +103,21 @@ class ReleasesGenerator(
         self,
         dataset: libzfs.ZFSDataset
     ) -> 'libioc.Release.ReleaseGenerator':
-        return self._class_release(
-            name=self._get_asset_name_from_dataset(dataset),
-            root_datasets_name=self.sources.find_root_datasets_name(
-                dataset.name
-            ),
-            logger=self.logger,
-            host=self.host,
-            zfs=self.zfs
+        name = self._get_asset_name_from_dataset(dataset)
+        root_datasets_name = self.sources.find_root_datasets_name(
+            dataset.name
+        )
+        return self.host.identity_map.get_or_create(
+            root_datasets_name,
+            self._class_release,
+            name,
+            lambda: self._class_release(
+                name=name,
+                root_datasets_name=root_datasets_name,
+                logger=self.logger,
+                host=self.host,
+                zfs=self.zfs
+            )
         )
 
 
@@ -24,11 +24,17 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """ioc Resource extension that managed exporting and importing backups."""
 import typing
+import contextlib
 import tarfile
 import tempfile
+import threading
+import time
+import io
 import os
 import os.path
+import shutil
 import enum
+import json
 import libzfs
 
 import libioc.events
@@ -47,6 +53,136 @@ class Format(enum.Enum):
     DIRECTORY = "2"
 
 
+@contextlib.contextmanager
+def _pipe_reader(
+    write: typing.Callable[[int], None]
+) -> typing.Iterator[typing.BinaryIO]:
+    """
+    Yield the reading end of a pipe that a thread writes to.
+
+    The write function receives the file descriptor of the writing end
+    that is closed when it returns. Errors of the writer are raised after
+    the reading end was consumed.
+    """
+    read_fd, write_fd = os.pipe()
+    errors: typing.List[BaseException] = []
+
+    def _write() -> None:
+        try:
+            write(write_fd)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            os.close(write_fd)
+
+    thread = threading.Thread(target=_write, daemon=True)
+    thread.start()
+    reader = os.fdopen(read_fd, "rb")
+    try:
+        yield reader
+    finally:
+        # a closed reading end lets an abandoned writer fail with EPIPE
+        reader.close()
+        thread.join()
+    if len(errors) > 0:
+        raise errors[0]
+
+
+class BackupArchive:
+    """
+    Tar archive that backup members are written to while they are created.
+
+    The archive is written sequentially, so that the destination can be a
+    regular file, a FIFO or a device like a pipe to a remote host. ZFS send
+    streams have no size known in advance, so they are split into members
+    of at most chunk_size bytes that are buffered in memory. Streams that
+    fit into a single chunk are stored as `<dataset>.zfs`, larger ones as
+    `<dataset>.zfs.000`, `<dataset>.zfs.001` and so on.
+
+    Member names begin with `./` like SecureTarfile requires on restore.
+    """
+
+    # maximum size of a ZFS stream member buffered in memory
+    chunk_size: int = 32 << 20
+
+    def __init__(
+        self,
+        destination: str,
+        compression_format: str="gz"
+    ) -> None:
+        self.destination = destination
+        self.file = open(destination, "wb")
+        # cast for mypy: tarfile.open only accepts literal stream modes
+        mode = typing.cast(
+            'typing.Literal["w|", "w|gz", "w|bz2", "w|xz"]',
+            f"w|{compression_format}"
+        )
+        try:
+            self.tar = tarfile.open(fileobj=self.file, mode=mode)
+        except BaseException:
+            self.file.close()
+            raise
+        self.mtime = time.time()
+
+    def add_bytes(self, name: str, data: bytes, mode: int=0o640) -> None:
+        """Add a file member with the given content."""
+        tarinfo = tarfile.TarInfo(f"./{name}")
+        tarinfo.size = len(data)
+        tarinfo.mode = mode
+        tarinfo.mtime = int(self.mtime)
+        self.tar.addfile(tarinfo, io.BytesIO(data))
+
+    def add_path(self, path: str, name: str) -> None:
+        """Add a file, link or directory (without its contents)."""
+        self.tar.add(path, arcname=f"./{name}", recursive=False)
+
+    def add_stream(self, name: str, stream: typing.BinaryIO) -> int:
+        """Add a stream of unknown size and return the number of members."""
+        # buffered readers block until a chunk is read or the stream ended
+        return self.add_chunks(
+            name,
+            iter(lambda: stream.read(self.chunk_size), b"")
+        )
+
+    def add_chunks(self, name: str, chunks: typing.Iterable[bytes]) -> int:
+        """Add chunks of at most chunk_size bytes as members of a stream."""
+        pending: typing.Optional[bytes] = None
+        index = 0
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            if pending is not None:
+                self.add_bytes(f"{name}.{index:03d}", pending, mode=0o600)
+                index += 1
+            pending = chunk
+
+        if index == 0:
+            self.add_bytes(name, pending or b"", mode=0o600)
+            return 1
+        self.add_bytes(
+            f"{name}.{index:03d}",
+            typing.cast(bytes, pending),  # cast for mypy
+            mode=0o600
+        )
+        return index + 1
+
+    def close(self) -> None:
+        """Finish the archive and close the destination."""
+        try:
+            self.tar.close()
+        finally:
+            self.file.close()
+
+    def discard(self) -> None:
+        """Close an incomplete archive and remove it when it is a file."""
+        # the compression stream must not write the archive trailer when
+        # it is garbage collected, so that readers see a truncated archive
+        setattr(self.tar.fileobj, "closed", True)
+        self.file.close()
+        if os.path.isfile(self.destination) is True:
+            os.remove(self.destination)
+
+
 class LaunchableResourceBackup:
     """
     Create and restore backups of a LaunchableResource.
@@ -63,6 +199,15 @@ class LaunchableResourceBackup:
         'tempfile.TemporaryDirectory[str]'
     ]]
     _snapshot_name: typing.Optional[str]
+    # archive that TAR exports are streamed to
+    _archive: typing.Optional[BackupArchive]
+    # bookmark of the last exported snapshot of each dataset
+    incremental_bookmark_name: str = "ioc_backup"
+    # number of datasets sent in parallel; every stream buffers up to two
+    # archive chunks while it waits for its turn to be written
+    export_concurrency: int = 4
+    # number of datasets of the same depth received in parallel
+    import_concurrency: int = 4
 
     def __init__(
         self,
@@ -71,6 +216,7 @@ class LaunchableResourceBackup:
         self.resource = resource
         self._work_dir = None
         self._snapshot_name = None
+        self._archive = None
 
     @property
     def logger(self) -> 'libioc.Logger.Logger':
@@ -140,11 +286,14 @@ class LaunchableResourceBackup:
         self._snapshot_name = libioc.ZFS.append_snapshot_datetime("backup")
 
     def _unlock(self) -> None:
+        if self.locked is False:
+            return
         work_dir = self.work_dir
         self.logger.spam(f"Deleting Resource backup temp directory {work_dir}")
         if (self._work_dir is not None):
             if isinstance(self._work_dir, tempfile.TemporaryDirectory):
                 self._work_dir.cleanup()
+        self._work_dir = None
 
     def _require_unlocked(self) -> None:
         if self.locked is False:
@@ -154,6 +303,7 @@ class LaunchableResourceBackup:
     def restore(
         self,
         source: str,
+        incremental_sources: typing.Sequence[str]=(),
         event_scope: typing.Optional['libioc.events.Scope']=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
@@ -168,22 +318,17 @@ class LaunchableResourceBackup:
             source (str):
 
                 The path to the exported archive file (tar.gz)
-        """
-        if os.path.exists(source) is False:
-            raise libioc.errors.BackupSourceDoesNotExist(
-                source=source,
-                logger=self.logger
-            )
 
-        if os.path.isdir(source) is True:
-            backup_format = Format.DIRECTORY
-        elif (source.endswith(".txz") or source.endswith(".tar.gz")) is True:
-            backup_format = Format.TAR
-        else:
-            raise libioc.errors.BackupSourceUnknownFormat(
-                source=source,
-                logger=self.logger
-            )
+            incremental_sources (list):
+
+                Incremental exports that are applied in the given order after
+                the source was restored. Each of them needs to continue the
+                backup restored before.
+        """
+        backup_format = self._get_backup_format(source)
+        incremental_formats = [
+            self._get_backup_format(x) for x in incremental_sources
+        ]
 
         resourceBackupEvent = libioc.events.ResourceBackup(
             self.resource,
@@ -218,7 +363,7 @@ class LaunchableResourceBackup:
             logger=self.logger
         ).read()
 
-        is_standalone = os.path.isfile(f"{self.work_dir}/root.zfs") is True
+        is_standalone = self._has_dataset_stream("root")
         has_release = ("release" in archived_config.keys()) is True
 
         try:
@@ -244,6 +389,17 @@ class LaunchableResourceBackup:
                 event_scope=scope
             )
             yield from self._import_fstab(event_scope=scope)
+
+            guids = self._read_manifest_guids()
+            for incremental_source, incremental_format in zip(
+                incremental_sources,
+                incremental_formats
+            ):
+                yield from self._restore_incremental(
+                    source=incremental_source,
+                    backup_format=incremental_format,
+                    guids=guids
+                )
         except Exception as e:
             yield resourceBackupEvent.fail(e)
             raise e
@@ -251,6 +407,106 @@ class LaunchableResourceBackup:
         _unlock_resource_backup()
         yield resourceBackupEvent.end()
 
+    def _get_backup_format(self, source: str) -> Format:
+        if os.path.exists(source) is False:
+            raise libioc.errors.BackupSourceDoesNotExist(
+                source=source,
+                logger=self.logger
+            )
+
+        if os.path.isdir(source) is True:
+            return Format.DIRECTORY
+        elif (source.endswith(".txz") or source.endswith(".tar.gz")) is True:
+            return Format.TAR
+        raise libioc.errors.BackupSourceUnknownFormat(
+            source=source,
+            logger=self.logger
+        )
+
+    def _restore_incremental(
+        self,
+        source: str,
+        backup_format: Format,
+        guids: typing.Dict[str, str]
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """
+        Apply an incremental export to the restored resource.
+
+        The guids map the relative dataset names to the snapshot GUIDs of
+        the previously restored backup and are updated in place.
+        """
+        self._unlock()
+        self._lock(
+            work_dir=(None if (backup_format == Format.TAR) else source)
+        )
+        # the import events of every backup in the chain are the same
+        scope = libioc.events.Scope()
+
+        if (backup_format == Format.TAR):
+            yield from self._extract_bundle(source, event_scope=scope)
+
+        self._continue_backup_chain(source, guids)
+        self.logger.verbose(f"Applying incremental backup {source}")
+
+        archived_config = libioc.Config.Type.JSON.ConfigJSON(
+            file=f"{self.work_dir}/config.json",
+            logger=self.logger
+        ).read()
+        if os.path.isdir(f"{self.work_dir}/root") is True:
+            yield from self._import_root_dataset(event_scope=scope)
+        yield from self._import_other_datasets_recursive(event_scope=scope)
+        yield from self._import_config(
+            libioc.Config.Data.Data(archived_config),
+            event_scope=scope
+        )
+        yield from self._import_fstab(event_scope=scope)
+
+    def _continue_backup_chain(
+        self,
+        source: str,
+        guids: typing.Dict[str, str]
+    ) -> None:
+        """Verify and record that the extracted backup continues the chain."""
+        from_guids = self._read_manifest_guids(from_guids=True)
+        for dataset_name, from_guid in from_guids.items():
+            if from_guid is None:
+                continue
+            if guids.get(dataset_name) != from_guid:
+                raise libioc.errors.BackupChainBroken(
+                    source=source,
+                    dataset_name=dataset_name,
+                    logger=self.logger
+                )
+        guids.update(self._read_manifest_guids())
+
+    def _read_manifest_guids(
+        self,
+        from_guids: bool=False
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Return the snapshot GUIDs of the datasets in the backup manifest.
+
+        With from_guids enabled the GUIDs of the bookmarks that incremental
+        streams were sent from are returned instead (None for full streams).
+        Backups without manifest contain no datasets that can be continued.
+        """
+        manifest_path = f"{self.work_dir}/manifest.json"
+        if os.path.isfile(manifest_path) is False:
+            return {}
+        with open(manifest_path, "r", encoding="UTF-8") as f:
+            manifest = json.load(f)
+        key = "from_guid" if (from_guids is True) else "guid"
+        return {
+            name: dataset.get(key)
+            for name, dataset in manifest["datasets"].items()
+        }
+
+    def _has_dataset_stream(self, dataset_name: str) -> bool:
+        asset_name = f"{self.work_dir}/{dataset_name}.zfs"
+        return (
+            os.path.isfile(asset_name) or os.path.isfile(f"{asset_name}.000")
+        ) is True
+
     def _extract_bundle(
         self,
         source: str,
@@ -379,33 +635,86 @@ class LaunchableResourceBackup:
             scope=event_scope
         )
         yield importOtherDatasetsEvent.begin()
-        hasImportedOtherDatasets = False
-
-        for dataset_name in self._list_importable_datasets():
-            absolute_asset_name = f"{self.work_dir}/{dataset_name}.zfs"
-            importOtherDatasetEvent = libioc.events.ImportOtherDataset(
-                dataset_name=dataset_name,
-                resource=self.resource,
-                scope=importOtherDatasetsEvent.scope
-            )
-            yield importOtherDatasetEvent.begin()
+        dataset_names = self._list_importable_datasets()
+        hasImportedOtherDatasets = (len(dataset_names) > 0)
+
+        # datasets of the same depth are received in parallel, but only
+        # after their parent datasets were received
+        for depth in sorted(set(x.count("/") for x in dataset_names)):
+            level = sorted(x for x in dataset_names if x.count("/") == depth)
+            events: typing.Dict[str, libioc.events.ImportOtherDataset] = {}
+            receives = []
             try:
-                with open(absolute_asset_name, "r", encoding="utf-8") as f:
+                for dataset_name in level:
+                    importOtherDatasetEvent = libioc.events.ImportOtherDataset(
+                        dataset_name=dataset_name,
+                        resource=self.resource,
+                        scope=importOtherDatasetsEvent.scope
+                    )
+                    events[dataset_name] = importOtherDatasetEvent
+                    yield importOtherDatasetEvent.begin()
                     dataset = self.resource.zfs.get_or_create_dataset(
                         f"{self.resource.dataset.name}/{dataset_name}"
                     )
-                    dataset.receive(f.fileno(), force=True)
-                    hasImportedOtherDatasets = True
-            except libioc.errors.IocException as e:
-                yield importOtherDatasetEvent.fail(e)
+                    receives.append(
+                        self._receive_dataset(dataset_name, dataset)
+                    )
+
+                for dataset_name in libioc.helpers.iterate_concurrently(
+                    receives,
+                    concurrency=self.import_concurrency
+                ):
+                    yield events.pop(dataset_name).end()
+            except Exception as e:
+                # receives that did not finish yet were aborted
+                for importOtherDatasetEvent in events.values():
+                    yield importOtherDatasetEvent.fail(e)
                 raise e
-            yield importOtherDatasetEvent.end()
 
         if hasImportedOtherDatasets is False:
             yield importOtherDatasetsEvent.skip()
         else:
             yield importOtherDatasetsEvent.end()
 
+    def _receive_dataset(
+        self,
+        dataset_name: str,
+        dataset: libzfs.ZFSDataset
+    ) -> typing.Generator[str, None, None]:
+        """Receive an exported ZFS stream and yield the dataset name."""
+        with self._open_dataset_stream(dataset_name) as f:
+            self.logger.verbose(f"Receiving dataset {dataset.name}")
+            dataset.receive(f.fileno(), force=True)
+        yield dataset_name
+
+    @contextlib.contextmanager
+    def _open_dataset_stream(
+        self,
+        dataset_name: str
+    ) -> typing.Iterator[typing.BinaryIO]:
+        """Open an exported ZFS stream that may be split into parts."""
+        asset_name = f"{self.work_dir}/{dataset_name}.zfs"
+        if os.path.isfile(asset_name) is True:
+            with open(asset_name, "rb") as f:
+                yield f
+            return
+
+        asset_dir = os.path.dirname(asset_name)
+        prefix = f"{os.path.basename(asset_name)}."
+        parts = sorted(
+            (x for x in os.listdir(asset_dir) if x.startswith(prefix)),
+            key=lambda x: int(x[len(prefix):])
+        )
+
+        def _write_parts(fd: int) -> None:
+            with open(fd, "wb", closefd=False) as pipe:
+                for part in parts:
+                    with open(f"{asset_dir}/{part}", "rb") as f:
+                        shutil.copyfileobj(f, pipe)
+
+        with _pipe_reader(_write_parts) as stream:
+            yield stream
+
     def _list_importable_datasets(
         self,
         current_directory: typing.Optional[str]=None
@@ -415,19 +724,22 @@ class LaunchableResourceBackup:
             current_directory = self.work_dir
 
         suffix = ".zfs"
+        # the first part of a stream that was split into several members
+        part_suffix = ".zfs.000"
 
         files: typing.List[str] = []
         current_files = os.listdir(current_directory)
         for current_file in current_files:
-            if current_file == f"{self.work_dir}/root":
+            current_path = f"{current_directory}/{current_file}"
+            if current_path == f"{self.work_dir}/root":
                 continue
-            if current_file == f"{self.work_dir}/fstab":
-                continue
-            if os.path.isdir(current_file):
-                nested_files = self._list_importable_datasets(current_file)
+            if os.path.isdir(current_path):
+                nested_files = self._list_importable_datasets(current_path)
                 files = files + [f"{current_file}/{x}" for x in nested_files]
             elif current_file.endswith(suffix):
                 files.append(current_file[:-len(suffix)])
+            elif current_file.endswith(part_suffix):
+                files.append(current_file[:-len(part_suffix)])
         return files
 
     def export(
@@ -436,6 +748,7 @@ class LaunchableResourceBackup:
         standalone: typing.Optional[bool]=None,
         recursive: bool=False,
         backup_format: Format=Format.TAR,
+        incremental: bool=False,
         event_scope: typing.Optional['libioc.events.Scope']=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """
@@ -445,11 +758,16 @@ class LaunchableResourceBackup:
         between the jails root dataset and its release. Other datasets in the
         jails dataset are snapshotted and attached to the export entirely.
 
+        TAR exports are written to the destination while the members are
+        created, without staging them in a temporary directory first.
+
         Args:
 
             destination (str):
 
                 The resource is exported to this location as archive file.
+                Because the archive is written sequentially, the destination
+                may also be a FIFO or a device like /dev/stdout.
 
             standalone (bool):
 
@@ -464,6 +782,15 @@ class LaunchableResourceBackup:
             recursive (bool):
 
                     Includes snapshots of all exported ZFS datasets.
+
+            incremental (bool):
+
+                    ZFS datasets are sent as incremental streams from the
+                    snapshot of the previous incremental export, that is
+                    remembered as ZFS bookmark. Datasets without bookmark
+                    are sent entirely. The backup manifest records the
+                    chain, so that restore can verify the order of the
+                    incremental backups. Recursive exports are always full.
         """
         resourceBackupEvent = libioc.events.ResourceBackup(
             self.resource,
@@ -472,8 +799,23 @@ class LaunchableResourceBackup:
         _scope = resourceBackupEvent.scope
         yield resourceBackupEvent.begin()
 
+        def _unlock_resource_backup() -> None:
+            self._unlock()
+
+        def _discard_archive() -> None:
+            if self._archive is not None:
+                self._archive.discard()
+                self._archive = None
+
         if backup_format == Format.TAR:
-            self._lock(None)  # use temporary directory and tar later
+            self._lock(None)  # stays empty while members are streamed
+            resourceBackupEvent.add_rollback_step(_unlock_resource_backup)
+            try:
+                self._archive = BackupArchive(destination)
+            except OSError as e:
+                yield resourceBackupEvent.fail(e)
+                raise e
+            resourceBackupEvent.add_rollback_step(_discard_archive)
         else:
             if os.path.exists(destination) is True:
                 raise libioc.errors.ExportDestinationExists(
@@ -481,21 +823,24 @@ class LaunchableResourceBackup:
                     logger=self.logger
                 )
             self._lock(destination)  # directly output to this directory
+            resourceBackupEvent.add_rollback_step(_unlock_resource_backup)
 
         self._take_resource_snapshot()
+        resourceBackupEvent.add_rollback_step(self._delete_resource_snapshot)
 
         zfs_send_flags = set()
         if recursive is True:
             zfs_send_flags.add(libzfs.SendFlag.REPLICATE)
+            if incremental is True:
+                # replication streams cannot be sent from bookmarks
+                self.logger.warn(
+                    "Recursive exports are not incremental - "
+                    "sending full streams"
+                )
+                incremental = False
 
         is_standalone = (standalone is not False) and self.__has_release
 
-        def _unlock_resource_backup() -> None:
-            self._delete_resource_snapshot()
-            self._unlock()
-
-        resourceBackupEvent.add_rollback_step(_unlock_resource_backup)
-
         if "config" in self.resource.__dir__():
             # only export config when the resource has one
             yield from self._export_config(event_scope=_scope)
@@ -508,12 +853,17 @@ class LaunchableResourceBackup:
             )
 
         # other datasets include `root` when the resource is no basejail
+        datasets: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+        datasets = {}
         yield from self._export_other_datasets_recursive(
             flags=zfs_send_flags,
             standalone=is_standalone,
             limit_depth=(recursive is True),
+            incremental=incremental,
+            datasets=datasets,
             event_scope=_scope
         )
+        self._export_manifest(datasets)
 
         if backup_format == Format.TAR:
             yield from self._bundle_backup(
@@ -521,6 +871,11 @@ class LaunchableResourceBackup:
                 event_scope=_scope
             )
 
+        if incremental is True:
+            # only completed exports continue the chain
+            self._bookmark_exported_datasets(datasets)
+
+        self._delete_resource_snapshot()
         _unlock_resource_backup()
         yield resourceBackupEvent.end()
 
@@ -550,8 +905,17 @@ class LaunchableResourceBackup:
                 logger=self.logger
             )
             temp_config.data = self.resource.config.data
-            temp_config.write(temp_config.data)
-            self.logger.verbose(f"Config duplicated to {temp_config.file}")
+            if self._archive is not None:
+                self._archive.add_bytes(
+                    "config.json",
+                    temp_config.map_output(temp_config.data).encode("UTF-8")
+                )
+                self.logger.verbose("Config added to the backup archive")
+            else:
+                temp_config.write(temp_config.data)
+                self.logger.verbose(
+                    f"Config duplicated to {temp_config.file}"
+                )
         except libioc.errors.IocException as e:
             yield exportConfigEvent.fail(e)
             raise e
@@ -584,8 +948,12 @@ class LaunchableResourceBackup:
                 self.resource.dataset.mountpoint,
                 "backup:///"
             )
-            fstab.save()
-            self.logger.verbose(f"Fstab saved to {fstab.file}")
+            if self._archive is not None:
+                self._archive.add_bytes("fstab", str(fstab).encode("UTF-8"))
+                self.logger.verbose("Fstab added to the backup archive")
+            else:
+                fstab.save()
+                self.logger.verbose(f"Fstab saved to {fstab.file}")
         except libioc.errors.IocException as e:
             yield exportFstabEvent.fail(e)
             raise e
@@ -604,122 +972,288 @@ class LaunchableResourceBackup:
         yield exportRootDatasetEvent.begin()
 
         try:
-            temp_root_dir = f"{self.work_dir}/root"
-            # exporting a root dataset delta requires a jail resource
-            # that is forked from a release
-            _jail = typing.cast('libioc.Jail.JailGenerator', self.resource)
-            compare_dest = "/".join([
-                _jail.release.root_dataset.mountpoint,
-                f".zfs/snapshot/{_jail.release_snapshot.snapshot_name}"
-            ])
-            os.mkdir(temp_root_dir)
-
-            excludes: typing.List[str] = []
-            basedirs = libioc.helpers.get_basedir_list(
-                distribution_name=self.resource.host.distribution.name
-            )
-            for basedir in basedirs:
-                _exclude = f"{self.resource.root_dataset.mountpoint}/{basedir}"
-                excludes.append("--exclude")
-                excludes.append(_exclude)
-
-            self.logger.verbose(
-                f"Writing root dataset delta to {temp_root_dir}"
-            )
-            libioc.helpers.exec([
-                "rsync",
-                "-av",
-                "--checksum",
-                "--links",
-                "--hard-links",
-                "--safe-links"
-            ] + excludes + [
-                f"--compare-dest={compare_dest}/",
-                f"{self.resource.root_dataset.mountpoint}/",
-                temp_root_dir,
-            ], logger=self.logger)
+            if self._archive is not None:
+                self._stream_root_dataset_delta(self._archive)
+            else:
+                temp_root_dir = f"{self.work_dir}/root"
+                os.mkdir(temp_root_dir)
+                self.logger.verbose(
+                    f"Writing root dataset delta to {temp_root_dir}"
+                )
+                self._rsync_root_dataset_delta(["-av"], temp_root_dir)
         except libioc.errors.IocException as e:
             yield exportRootDatasetEvent.fail(e)
             raise e
         yield exportRootDatasetEvent.end()
 
+    def _rsync_root_dataset_delta(
+        self,
+        options: typing.List[str],
+        destination: str
+    ) -> libioc.helpers.CommandOutput:
+        # exporting a root dataset delta requires a jail resource
+        # that is forked from a release
+        _jail = typing.cast('libioc.Jail.JailGenerator', self.resource)
+        compare_dest = "/".join([
+            _jail.release.root_dataset.mountpoint,
+            f".zfs/snapshot/{_jail.release_snapshot.snapshot_name}"
+        ])
+
+        excludes: typing.List[str] = []
+        basedirs = libioc.helpers.get_basedir_list(
+            distribution_name=self.resource.host.distribution.name
+        )
+        for basedir in basedirs:
+            _exclude = f"{self.resource.root_dataset.mountpoint}/{basedir}"
+            excludes.append("--exclude")
+            excludes.append(_exclude)
+
+        return libioc.helpers.exec([
+            "rsync"
+        ] + options + [
+            "--checksum",
+            "--links",
+            "--hard-links",
+            "--safe-links"
+        ] + excludes + [
+            f"--compare-dest={compare_dest}/",
+            f"{self.resource.root_dataset.mountpoint}/",
+            destination,
+        ], logger=self.logger)
+
+    def _stream_root_dataset_delta(self, archive: BackupArchive) -> None:
+        """
+        Add the files that differ from the release to the archive.
+
+        A dry run of the rsync command that creates directory exports lists
+        the paths, that are then read directly from the root dataset.
+        """
+        stdout, _, _ = self._rsync_root_dataset_delta(
+            ["-a", "--dry-run", "--out-format=%n"],
+            self.work_dir  # the empty temporary directory
+        )
+        root_path = self.resource.root_dataset.mountpoint
+        paths = [x.rstrip("/") for x in (stdout or "").splitlines()]
+        self.logger.verbose(
+            f"Adding {len(paths)} root dataset delta paths to the archive"
+        )
+        for path in paths:
+            if path in ("", ".",):
+                archive.add_path(root_path, "root")
+            else:
+                archive.add_path(f"{root_path}/{path}", f"root/{path}")
+
     def _export_other_datasets_recursive(
         self,
         standalone: bool,
         flags: typing.Set[libzfs.SendFlag],
         event_scope: typing.Optional['libioc.events.Scope'],
         limit_depth: bool=False,
+        incremental: bool=False,
+        datasets: typing.Optional[
+            typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+        ]=None
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
 
+        if datasets is None:
+            datasets = {}
+
         exportOtherDatasetsEvent = libioc.events.ExportOtherDatasets(
             self.resource,
             scope=event_scope
         )
         yield exportOtherDatasetsEvent.begin()
-        hasExportedOtherDatasets = False
 
         if limit_depth is True:
             child_datasets = self.resource.dataset.children
         else:
             child_datasets = self.resource.dataset.children_recursive
 
+        exports: typing.List[typing.Tuple[
+            libzfs.ZFSDataset,
+            libzfs.ZFSSnapshot,
+            typing.Optional[str]
+        ]] = []
         for dataset in child_datasets:
             __is_root = (dataset.name == self.resource.root_dataset.name)
             if __is_root and not standalone:
                 continue
-
-            hasExportedOtherDatasets = True
-            exportOtherDatasetEvent = libioc.events.ExportOtherDataset(
-                dataset=dataset,
-                flags=flags,
-                resource=self.resource,
-                scope=exportOtherDatasetsEvent.scope
+            relative_name = self._get_relative_dataset_name(dataset)
+            datasets[relative_name], from_name = self._prepare_dataset_export(
+                dataset,
+                incremental=incremental
             )
-            yield exportOtherDatasetEvent.begin()
-            try:
-                self._export_other_dataset(dataset, flags)
-            except libioc.errors.IocException as e:
-                yield exportOtherDatasetEvent.fail(e)
-                raise e
-            yield exportOtherDatasetEvent.end()
+            snapshot = self.zfs.get_snapshot(
+                f"{dataset.name}@{self.snapshot_name}"
+            )
+            exports.append((dataset, snapshot, from_name,))
+        hasExportedOtherDatasets = (len(exports) > 0)
+
+        # datasets are sent in parallel and written in their listed order
+        items = libioc.helpers.iterate_concurrently_ordered(
+            [
+                self._send_dataset(dataset, snapshot, flags, from_name)
+                for dataset, snapshot, from_name in exports
+            ],
+            concurrency=self.export_concurrency
+        )
+        try:
+            for dataset, _, _ in exports:
+                exportOtherDatasetEvent = libioc.events.ExportOtherDataset(
+                    dataset=dataset,
+                    flags=flags,
+                    resource=self.resource,
+                    scope=exportOtherDatasetsEvent.scope
+                )
+                yield exportOtherDatasetEvent.begin()
+                try:
+                    chunks = self._take_stream_chunks(items)
+                    if self._archive is not None:
+                        relative_name = self._get_relative_dataset_name(
+                            dataset
+                        )
+                        self._archive.add_chunks(
+                            f"{relative_name}.zfs",
+                            chunks
+                        )
+                    else:
+                        for _ in chunks:
+                            pass
+                except Exception as e:
+                    yield exportOtherDatasetEvent.fail(e)
+                    raise e
+                yield exportOtherDatasetEvent.end()
+        finally:
+            # stops the remaining senders after a failure
+            items.close()
 
         if hasExportedOtherDatasets is False:
             yield exportOtherDatasetsEvent.skip()
         else:
             yield exportOtherDatasetsEvent.end()
 
-    def _export_other_dataset(
+    def _prepare_dataset_export(
         self,
         dataset: libzfs.ZFSDataset,
-        flags: typing.Set[libzfs.SendFlag]
-    ) -> None:
+        incremental: bool=False
+    ) -> typing.Tuple[
+        typing.Dict[str, typing.Optional[str]],
+        typing.Optional[str]
+    ]:
+        """
+        Return the manifest entry and the source of a dataset stream.
+
+        The manifest entry holds the GUID of the exported snapshot and the
+        GUID of the bookmark an incremental stream is sent from.
+        """
+        full_snapshot_name = f"{dataset.name}@{self.snapshot_name}"
+        from_name: typing.Optional[str] = None
+        from_guid: typing.Optional[str] = None
+        if incremental is True:
+            bookmark_name = f"{dataset.name}#{self.incremental_bookmark_name}"
+            from_guid = libioc.ZFS.get_guid(bookmark_name, logger=self.logger)
+            if from_guid is not None:
+                from_name = bookmark_name
+                self.logger.verbose(
+                    f"Sending dataset {dataset.name} incrementally "
+                    f"from {bookmark_name}"
+                )
+        manifest_entry = dict(
+            guid=libioc.ZFS.get_guid(full_snapshot_name, logger=self.logger),
+            from_guid=from_guid
+        )
+        return manifest_entry, from_name
+
+    @staticmethod
+    def _take_stream_chunks(
+        items: typing.Iterator[typing.Tuple[int, typing.Optional[bytes]]]
+    ) -> typing.Generator[bytes, None, None]:
+        # every dataset stream ends with None
+        for _, chunk in items:
+            if chunk is None:
+                return
+            yield chunk
+
+    def _send_dataset(
+        self,
+        dataset: libzfs.ZFSDataset,
+        snapshot: libzfs.ZFSSnapshot,
+        flags: typing.Set[libzfs.SendFlag],
+        from_name: typing.Optional[str]=None
+    ) -> typing.Generator[typing.Optional[bytes], None, None]:
+        """
+        Send the backup snapshot of a dataset.
+
+        Streams to the archive are yielded in chunks, while directory
+        exports are written to a file. None is yielded at the end.
+        """
         relative_name = self._get_relative_dataset_name(dataset)
+        if self._archive is not None:
+            chunk_size = self._archive.chunk_size
+            self.logger.verbose(
+                f"Streaming dataset {dataset.name} to the backup archive"
+            )
+            with _pipe_reader(
+                lambda fd: snapshot.send(fd, fromname=from_name, flags=flags)
+            ) as stream:
+                yield from iter(lambda: stream.read(chunk_size), b"")
+            yield None
+            return
+
         name_fragments = relative_name.split("/")
         minor_dataset_name = name_fragments.pop()
         relative_dir_name = "/".join(name_fragments)
         absolute_dir_name = f"{self.work_dir}/{relative_dir_name}".rstrip("/")
         absolute_asset_name = f"{absolute_dir_name}/{minor_dataset_name}.zfs"
 
-        if os.path.isdir(absolute_dir_name) is False:
-            os.makedirs(absolute_dir_name)
-            # ToDo: manually set permissions
-
-        full_snapshot_name = f"{dataset.name}@{self.snapshot_name}"
-        snapshot = self.zfs.get_snapshot(full_snapshot_name)
+        # parallel senders may create the same parent directory
+        os.makedirs(absolute_dir_name, exist_ok=True)
+        # ToDo: manually set permissions
 
         self.logger.verbose(
             f"Exporting dataset {dataset.name} to {absolute_asset_name}"
         )
 
-        with open(absolute_asset_name, "w", encoding="utf-8") as f:
-            snapshot.send(f.fileno(), fromname=None, flags=flags)
+        with open(absolute_asset_name, "wb") as f:
+            snapshot.send(f.fileno(), fromname=from_name, flags=flags)
+        yield None
+
+    def _export_manifest(
+        self,
+        datasets: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+    ) -> None:
+        """Write the chain of the exported ZFS streams to manifest.json."""
+        manifest = dict(snapshot=self.snapshot_name, datasets=datasets)
+        data = json.dumps(manifest, sort_keys=True, indent=4)
+        if self._archive is not None:
+            self._archive.add_bytes("manifest.json", data.encode("UTF-8"))
+        else:
+            with open(
+                f"{self.work_dir}/manifest.json",
+                "w",
+                encoding="UTF-8"
+            ) as f:
+                f.write(data)
+
+    def _bookmark_exported_datasets(
+        self,
+        datasets: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+    ) -> None:
+        """Remember the exported snapshots for the next incremental export."""
+        for relative_name in datasets.keys():
+            dataset_name = f"{self.resource.dataset.name}/{relative_name}"
+            libioc.ZFS.bookmark(
+                f"{dataset_name}@{self.snapshot_name}",
+                f"{dataset_name}#{self.incremental_bookmark_name}",
+                logger=self.logger
+            )
 
     def _bundle_backup(
         self,
         destination: str,
         event_scope: typing.Optional['libioc.events.Scope']
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
-        """Create the an archive file from the backup assets."""
+        """Finish the archive that the backup assets were streamed to."""
         bundleBackupEvent = libioc.events.BundleBackup(
             destination=destination,
             resource=self.resource,
@@ -728,11 +1262,11 @@ class LaunchableResourceBackup:
         yield bundleBackupEvent.begin()
 
         try:
-            self.logger.verbose(f"Bundling backup to {destination}")
-            tar = tarfile.open(destination, "w:gz")
-            tar.add(self.work_dir, arcname=".")
-            tar.close()
-        except libioc.errors.IocException as e:
+            self.logger.verbose(f"Finishing backup archive {destination}")
+            # the archive is only discarded on rollback when closing failed
+            typing.cast(BackupArchive, self._archive).close()  # cast for mypy
+            self._archive = None
+        except (OSError, libioc.errors.IocException) as e:
             yield bundleBackupEvent.fail(e)
             raise e
 
@@ -24,17 +24,19 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Updater for Releases and other LaunchableResources like Jails."""
 import typing
+import errno
 import os
 import os.path
 import re
 import shutil
+import threading
 import urllib
 import urllib.request
-import urllib.error
 
 import libioc.events
 import libioc.errors
 import libioc.Jail
+import libioc.MountTable
 
 # MyPy
 import libzfs
@@ -42,6 +44,7 @@ import libzfs
 if typing.TYPE_CHECKING:
     import libioc.Host
     import libioc.Release
+    import libioc.ReleaseManifest
 
 # Updaters operate on jails and releases, that both provide the name
 # and release properties beyond the LaunchableResource base class.
@@ -57,6 +60,17 @@ class Updater:
     update_name: str
     update_script_name: str
     update_conf_name: str
+    # seconds until downloaded updater files are revalidated
+    trunk_file_ttl: float = 86400
+    # content-addressed subdirectories of the updater work directory that
+    # are shared by the updates of all releases; each release fetches into
+    # a private copy that is seeded from and published to the shared cache,
+    # so pruning by one release never removes files of another
+    shared_cache_dirs: typing.List[str] = []
+    # update standalone jails from recorded release manifests when possible
+    use_manifests: bool = True
+    # number of files copied in parallel when applying release manifests
+    manifest_concurrency: int = 8
 
     resource: 'UpdateableResource'
     host: 'libioc.Host.HostGenerator'
@@ -104,6 +118,44 @@ class Updater:
         """Return the mountpoint of the updates dataset."""
         return str(self.host_updates_dataset.mountpoint)
 
+    @property
+    def shared_cache_dir(self) -> str:
+        """Return the host-wide cache directory of the updater."""
+        dataset = self.release.source_dataset.updates
+        return f"{dataset.mountpoint}/{self.update_name}"
+
+    @property
+    def _shared_cache_pairs(self) -> typing.List[typing.Tuple[str, str]]:
+        """Return the shared cache directories and their release copies."""
+        return [
+            (
+                f"{self.shared_cache_dir}/{directory}",
+                f"{self.host_updates_dir}/temp/{directory}",
+            )
+            for directory in self.shared_cache_dirs
+        ]
+
+    def _seed_shared_cache(self) -> None:
+        """
+        Populate the release work directory from the shared cache.
+
+        The updater may prune files its own index does not reference, so
+        every release works on a private directory. Shared files are
+        hardlinked (or copied across datasets) into it before the fetch.
+        """
+        for source, destination in self._shared_cache_pairs:
+            self._create_dir(source)
+            self._create_dir(destination)
+            _share_files(source, destination)
+
+    def _publish_shared_cache(self) -> None:
+        """Share the files of the release work directory after a fetch."""
+        for source, destination in self._shared_cache_pairs:
+            if os.path.isdir(destination) is False:
+                continue
+            self._create_dir(source)
+            _share_files(destination, source)
+
     @property
     def local_temp_dir(self) -> str:
         """Return the update temp directory relative to the jail root."""
@@ -206,16 +258,22 @@ class Updater:
         os.chmod(jail_update_dir, 0o755)  # nosec: accessible directory
 
     def _create_dir(self, directory: str) -> None:
-        if os.path.isdir(directory):
-            return
-        os.makedirs(directory)
+        # concurrent fetches create the shared cache directories
+        os.makedirs(directory, exist_ok=True)
 
     def _clean_create_dir(self, directory: str) -> None:
-        if os.path.ismount(directory) is True:
+        # the directory is deleted, so mounts made by other processes
+        # must be known to never delete through them
+        mount_table = libioc.MountTable.MountTable(logger=self.logger)
+        mount_table.refresh()
+        mountpoints = [x.mountpoint for x in mount_table.find_below(directory)]
+        if mount_table.is_mounted(directory) is True:
+            mountpoints.append(directory)
+        for mountpoint in mountpoints:
             libioc.helpers.umount(
                 # the mountpoints handled here are absolute paths, but
                 # remain plain strings at runtime
-                typing.cast('libioc.Types.AbsolutePath', directory),
+                typing.cast('libioc.Types.AbsolutePath', mountpoint),
                 force=True,
                 logger=self.logger
             )
@@ -244,16 +302,12 @@ class Updater:
         if os.path.isfile(local):
             os.remove(local)
 
-        _request = urllib.request
-        try:
-            self.logger.verbose(f"Downloading update assets from {url}")
-            _request.urlretrieve(url, local)  # nosec: url validated
-        except urllib.error.HTTPError as http_error:
-            raise libioc.errors.DownloadFailed(
-                url="EOL Warnings",
-                code=http_error.code,
-                logger=self.logger
-            )
+        self.logger.verbose(f"Downloading update assets from {url}")
+        self.host.metadata_cache.retrieve(
+            url,
+            local,
+            ttl=self.trunk_file_ttl
+        )
         os.chmod(local, mode)
 
         self.logger.debug(
@@ -354,6 +408,7 @@ class Updater:
                     env[key.lower()] = os.environ[key]
 
             self._create_download_dir()
+            self._seed_shared_cache()
             libioc.helpers.exec(
                 # helpers.exec wraps command strings in a list itself
                 self._wrap_command(  # type: ignore[arg-type]
@@ -369,10 +424,78 @@ class Updater:
             raise
         finally:
             self._post_fetch()
+        self._publish_shared_cache()
         yield releaseUpdateDownloadEvent.end()
 
     def _snapshot_release_after_update(self) -> None:
-        self.release.snapshot(f"p{self.patch_version}")
+        patch_version = self.patch_version
+        self.release.snapshot(f"p{patch_version}")
+        try:
+            self.release.record_manifest(patch_version)
+        except (OSError, libioc.errors.IocException) as e:
+            # jails fall back to the updater without manifests
+            self.logger.warn(f"Recording the release manifest failed: {e}")
+
+    def _get_manifest_delta(
+        self
+    ) -> typing.Optional['libioc.ReleaseManifest.ReleaseManifest']:
+        """Return the release manifest delta applicable to the jail."""
+        if self.use_manifests is False:
+            return None
+        if isinstance(self.resource, libioc.Release.ReleaseGenerator):
+            return None
+        if self.resource.config["basejail"] is True:
+            return None
+        patchlevel = self.release.patchlevel
+        if patchlevel is None:
+            return None
+        manifest = self.release.get_manifest_delta(patchlevel)
+        if manifest is None:
+            return None
+        conflicts = manifest.conflicts(self.resource.root_path)
+        if len(conflicts) > 0:
+            self.logger.verbose(
+                f"{len(conflicts)} locally changed paths conflict with the "
+                f"release manifests - running {self.update_name}"
+            )
+            return None
+        return manifest
+
+    def _apply_manifest_delta(
+        self,
+        manifest: 'libioc.ReleaseManifest.ReleaseManifest',
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator[typing.Union[
+        'libioc.events.IocEvent',
+        bool
+    ], None, None]:
+        jail = self.resource
+        runResourceUpdateEvent = libioc.events.RunResourceUpdate(
+            jail,
+            scope=event_scope
+        )
+        yield runResourceUpdateEvent.begin()
+        try:
+            manifest.apply(
+                source_root=self.release.get_snapshot_path(
+                    manifest.to_patchlevel
+                ),
+                target_root=jail.root_path,
+                concurrency=self.manifest_concurrency,
+                logger=self.logger
+            )
+            jail.config["release"] = (
+                f"{self.release.name}-p{manifest.to_patchlevel}"
+            )
+            jail.save()
+        except Exception as e:
+            yield runResourceUpdateEvent.fail(e)
+            raise
+        yield runResourceUpdateEvent.end()
+        self.logger.verbose(
+            f"Resource '{jail.name}' updated from release manifests"
+        )
+        yield True
 
     def apply(
         self,
@@ -381,7 +504,18 @@ class Updater:
         'libioc.events.IocEvent',
         bool
     ], None, None]:
-        """Apply the fetched updates to the associated release or jail."""
+        """
+        Apply the fetched updates to the associated release or jail.
+
+        Standalone jails without local changes to the updated files are
+        brought to the latest release patchlevel by copying the paths
+        recorded in the release manifests instead of running the updater.
+        """
+        manifest = self._get_manifest_delta()
+        if manifest is not None:
+            yield from self._apply_manifest_delta(manifest, event_scope)
+            return
+
         updates_dataset = self.host_updates_dataset
         snapshot_name = libioc.ZFS.append_snapshot_datetime(
             f"{updates_dataset.name}@pre-update"
@@ -613,6 +747,8 @@ class FreeBSD(Updater):
     update_name: str = "freebsd-update"
     update_script_name: str = "freebsd-update.sh"
     update_conf_name: str = "freebsd-update.conf"
+    # patches and metadata files are stored by their SHA256 digest
+    shared_cache_dirs: typing.List[str] = ["files"]
 
     def _get_release_trunk_file_url(
         self,
@@ -763,3 +899,101 @@ def get_launchable_update_resource(
         host=host,
         resource=resource
     )
+
+
+def update_releases(
+    releases: typing.Sequence['libioc.Release.ReleaseGenerator'],
+    fetch_concurrency: int=4,
+    apply_concurrency: int=2,
+    update_base: typing.Optional[bool]=None,
+    event_scope: typing.Optional['libioc.events.Scope']=None
+) -> typing.Generator[typing.Union[
+    'libioc.events.IocEvent',
+    typing.Dict[str, bool]
+], None, None]:
+    """
+    Fetch and apply the updates of several releases.
+
+    Updates of all releases are fetched concurrently first and applied
+    afterwards by a limited number of workers. Like ReleaseGenerator.fetch
+    does, releases whose fetch was skipped or failed are not updated and
+    the ZFS basejail datasets are updated afterwards when legacy support
+    requires it (see update_base of ReleaseGenerator.fetch). Each release
+    reuses its updater, so that temporary jails are only defined once.
+    The last value yielded maps the release names to whether they changed.
+    """
+    updaters = [release.updater for release in releases]
+    fetched: typing.Dict[str, bool] = {}
+
+    def _fetch(
+        updater: Updater
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        name = updater.release.name
+        fetched[name] = True
+        try:
+            for event in updater.fetch(event_scope=event_scope):
+                if isinstance(event, libioc.events.ReleaseUpdateDownload):
+                    if event.skipped is True:
+                        fetched[name] = False
+                yield event
+        except libioc.errors.IocException:
+            fetched[name] = False
+
+    yield from libioc.helpers.iterate_concurrently(
+        [_fetch(updater) for updater in updaters],
+        concurrency=fetch_concurrency
+    )
+
+    changed: typing.Dict[str, bool] = {}
+
+    def _apply(
+        updater: Updater
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        release = updater.release
+        release_changed: typing.Optional[bool] = None
+        if fetched[release.name] is True:
+            for event in updater.apply(event_scope=event_scope):
+                if isinstance(event, libioc.events.IocEvent):
+                    yield event
+                else:
+                    # the only non-IocEvent is the return value
+                    release_changed = event
+        changed[release.name] = (release_changed is True)
+        yield from release._update_base_release_step(
+            release_changed,
+            update_base=update_base,
+            event_scope=event_scope
+        )
+
+    yield from libioc.helpers.iterate_concurrently(
+        [_apply(updater) for updater in updaters],
+        concurrency=apply_concurrency
+    )
+    yield changed
+
+
+def _share_files(source: str, destination: str) -> None:
+    """
+    Provide the files of a directory that are missing in another one.
+
+    Files are hardlinked when both directories share a dataset and copied
+    otherwise. Copies are written to a hidden name first and renamed, so
+    that concurrent readers never observe partial files.
+    """
+    for filename in os.listdir(source):
+        source_file = f"{source}/{filename}"
+        target_file = f"{destination}/{filename}"
+        if filename.startswith(".") or os.path.exists(target_file):
+            continue
+        if os.path.isfile(source_file) is False:
+            continue
+        temp_file = (
+            f"{destination}/.{filename}.{os.getpid()}.{threading.get_ident()}"
+        )
+        try:
+            os.link(source_file, temp_file)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copy2(source_file, temp_file)
+        os.replace(temp_file, target_file)
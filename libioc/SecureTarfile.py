@@ -24,41 +24,81 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Secure tarfile wrapper that prevents extraction of insecure paths."""
 import typing
+import contextlib
+import os
+import shutil
+import subprocess  # nosec: B404
 import tarfile
+import threading
 
 import libioc.errors
 
 
 class SecureTarfile:
-    """Secure tarfile wrapper that mitigates extraction of unsafe paths."""
+    """
+    Secure tarfile wrapper that mitigates extraction of unsafe paths.
+
+    Archives are read as a stream in a single pass. Each member is
+    validated before it is extracted, so that extraction stops at the
+    first illegal member and everything extracted so far is removed.
+    Only directory members are retained, to apply their attributes after
+    their contents were written, so memory does not grow with the number
+    of files.
+
+    XZ archives are decompressed by the in-process lzma module or by an
+    external multi-threaded xz command. The default decompressor "auto"
+    uses the xz command when it is installed.
+    """
 
     file: str
     file_open_mode: str = "r"
     compression_format: typing.Optional[str]
     logger: typing.Optional['libioc.Logger.Logger']
+    fileobj: typing.Optional[typing.IO[bytes]]
+    decompressor: str
+
+    decompressors: typing.Tuple[str, ...] = ("auto", "lzma", "xz",)
+    xz_command: typing.List[str] = ["xz", "-T0", "-dc"]
+    feed_chunk_size: int = 1024 * 1024
 
     def __init__(
         self,
         file: str,
         compression_format: typing.Optional[str]=None,
-        logger: typing.Optional['libioc.Logger.Logger']=None
+        logger: typing.Optional['libioc.Logger.Logger']=None,
+        fileobj: typing.Optional[typing.IO[bytes]]=None,
+        decompressor: str="auto"
     ) -> None:
+        if decompressor not in self.decompressors:
+            raise ValueError(f"Unknown decompressor: {decompressor}")
         self.file = file
         self.compression_format = compression_format
         self.logger = logger
+        self.fileobj = fileobj
+        self.decompressor = decompressor
 
     def _log(self, message: str, level: str="verbose") -> None:
         if self.logger is None:
             return
         self.logger.log(message, level)
 
+    @property
+    def use_xz_command(self) -> bool:
+        """Return True when the external xz command decompresses."""
+        if self.compression_format != "xz":
+            return False
+        if self.decompressor == "auto":
+            return shutil.which(self.xz_command[0]) is not None
+        return (self.decompressor == "xz")
+
     @property
     def mode(self) -> str:
-        """Return the file mode for opening the archive file."""
-        if self.compression_format is not None:
-            return f"{self.file_open_mode}:{self.compression_format}"
-        else:
-            return self.file_open_mode
+        """Return the stream mode for reading the archive."""
+        if self.use_xz_command is True:
+            # the xz command passes the uncompressed tar stream
+            return f"{self.file_open_mode}|"
+        compression_format = self.compression_format or "*"
+        return f"{self.file_open_mode}|{compression_format}"
 
     def extract(self, destination: str) -> None:
         """
@@ -70,28 +110,210 @@ class SecureTarfile:
 
                 Path to the archive file that is going to be extracted.
         """
+        for _ in self.extract_stream(destination):
+            pass
+
+    def extract_stream(
+        self,
+        destination: str
+    ) -> typing.Generator[tarfile.TarInfo, None, None]:
+        """
+        Validate and extract members while the archive stream is read.
+
+        Each extracted member is yielded, so that callers can report the
+        progress. The archive is read once and never needs to be seekable.
+        """
+        mode = self.mode
+        if self.use_xz_command is True:
+            self._log(f"Decompressing {self.file} with {self.xz_command[0]}")
+            with self._xz_process() as stdout:
+                yield from self._extract_fileobj(stdout, destination, mode)
+            return
+
+        if self.fileobj is not None:
+            yield from self._extract_fileobj(self.fileobj, destination, mode)
+            return
+
+        with open(self.file, "rb") as fileobj:
+            yield from self._extract_fileobj(fileobj, destination, mode)
+
+    @contextlib.contextmanager
+    def _xz_process(self) -> typing.Iterator[typing.IO[bytes]]:
+        """Pipe the archive through the xz command and yield its output."""
+        feeder_errors: typing.List[BaseException] = []
+        feeder: typing.Optional[threading.Thread] = None
+        stdin_file = None
+        if self.fileobj is None:
+            stdin_file = open(self.file, "rb")
+
+        process = subprocess.Popen(  # nosec: B603
+            self.xz_command,
+            stdin=(subprocess.PIPE if (stdin_file is None) else stdin_file),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        # cast for mypy: all pipes were requested
+        stdout = typing.cast(typing.IO[bytes], process.stdout)
+        stderr = typing.cast(typing.IO[bytes], process.stderr)
+        if self.fileobj is not None:
+            feeder = threading.Thread(
+                target=self._feed,
+                args=(
+                    self.fileobj,
+                    typing.cast(typing.IO[bytes], process.stdin),
+                    feeder_errors,
+                ),
+                daemon=True
+            )
+            feeder.start()
+
+        try:
+            yield stdout
+            # consume trailing padding, so that xz can exit
+            while len(stdout.read(self.feed_chunk_size)) > 0:
+                pass
+        except BaseException as e:
+            returncode = process.poll()
+            process.kill()
+            if feeder is not None:
+                feeder.join()
+            if len(feeder_errors) > 0:
+                raise feeder_errors[0] from e
+            if (returncode is not None) and (returncode != 0):
+                raise libioc.errors.ArchiveDecompressionFailed(
+                    asset_name=self.file,
+                    reason=stderr.read().decode("utf-8").strip(),
+                    logger=self.logger
+                ) from e
+            raise
+        finally:
+            if feeder is not None:
+                feeder.join()
+            process.wait()
+            stdout.close()
+            error_output = stderr.read().decode("utf-8").strip()
+            stderr.close()
+            if stdin_file is not None:
+                stdin_file.close()
+
+        if len(feeder_errors) > 0:
+            raise feeder_errors[0]
+        if process.returncode != 0:
+            raise libioc.errors.ArchiveDecompressionFailed(
+                asset_name=self.file,
+                reason=error_output,
+                logger=self.logger
+            )
+
+    def _feed(
+        self,
+        fileobj: typing.IO[bytes],
+        stdin: typing.IO[bytes],
+        errors: typing.List[BaseException]
+    ) -> None:
+        try:
+            while True:
+                chunk = fileobj.read(self.feed_chunk_size)
+                if not chunk:
+                    break
+                stdin.write(chunk)
+        except BrokenPipeError:
+            # the extraction stopped and terminated the xz command
+            pass
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def _extract_fileobj(
+        self,
+        fileobj: typing.IO[bytes],
+        destination: str,
+        mode: str
+    ) -> typing.Generator[tarfile.TarInfo, None, None]:
         # tarfile.open only accepts literal mode strings, while the mode
         # is composed from the configured compression format
-        mode = typing.cast(
-            'typing.Literal["r", "r:gz", "r:bz2", "r:xz"]',
-            self.mode
+        stream_mode = typing.cast(
+            'typing.Literal["r|", "r|*", "r|gz", "r|bz2", "r|xz"]',
+            mode
         )
-        with tarfile.open(self.file, mode) as tar:
-            self._log(f"Verifying file structure in {self.file}")
-            self._check_tar_members(tar.getmembers())
-            self._log(f"Extracting {self.file}")
-            # _check_tar_members already rejected absolute paths and
-            # path traversal; jail archives legitimately contain setuid
-            # binaries and device nodes, so no restrictive filter applies.
-            tar.extractall(destination, filter="fully_trusted")  # nosec: B202
-            self._log(f"{self.file} was extracted to {destination}")
-
-    def _check_tar_members(
-        self,
-        tar_infos: typing.List[typing.Any]
+        destination = os.path.normpath(destination)
+        created_paths: typing.List[str] = []
+        if os.path.lexists(destination) is False:
+            created_paths.append(destination)
+        directories: typing.List[tarfile.TarInfo] = []
+
+        self._log(f"Extracting {self.file}")
+        try:
+            with tarfile.open(fileobj=fileobj, mode=stream_mode) as tar:
+                for tar_info in tar:
+                    self._check_tar_info(tar_info)
+                    self._check_extraction_path(destination, tar_info)
+                    self._track_created_path(
+                        destination,
+                        tar_info.name,
+                        created_paths
+                    )
+                    # concurrent extractions may share parent directories
+                    parent = os.path.dirname(
+                        os.path.join(destination, tar_info.name)
+                    )
+                    os.makedirs(parent, exist_ok=True)
+                    # absolute paths, path traversal and writes through
+                    # symlinks were rejected before; jail archives
+                    # legitimately contain setuid binaries and device
+                    # nodes, so no restrictive filter applies.
+                    tar.extract(  # nosec: B202
+                        tar_info,
+                        destination,
+                        set_attrs=(tar_info.isdir() is False),
+                        filter="fully_trusted"
+                    )
+                    if tar_info.isdir() is True:
+                        directories.append(tar_info)
+                    # the stream mode would otherwise keep every member;
+                    # the list is not part of the typeshed TarFile stubs
+                    tar.members = []  # type: ignore[attr-defined]
+                    yield tar_info
+
+                # directory attributes apply after their content was written
+                directories.sort(key=lambda x: x.name, reverse=True)
+                for tar_info in directories:
+                    path = os.path.join(destination, tar_info.name)
+                    tar.chown(tar_info, path, numeric_owner=False)
+                    tar.utime(tar_info, path)
+                    tar.chmod(tar_info, path)
+        except BaseException:
+            self._log(f"Removing partially extracted {self.file}")
+            self._remove_paths(created_paths)
+            raise
+        self._log(f"{self.file} was extracted to {destination}")
+
+    @staticmethod
+    def _track_created_path(
+        destination: str,
+        name: str,
+        created_paths: typing.List[str]
     ) -> None:
-        for tar_member in tar_infos:
-            self._check_tar_info(tar_member)
+        """Remember the topmost path that the member is going to create."""
+        path = os.path.normpath(os.path.join(destination, name))
+        created_path = None
+        while (path != destination) and (os.path.lexists(path) is False):
+            created_path = path
+            path = os.path.dirname(path)
+        if created_path is not None:
+            created_paths.append(created_path)
+
+    @staticmethod
+    def _remove_paths(paths: typing.List[str]) -> None:
+        for path in reversed(paths):
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                os.remove(path)
 
     def _check_tar_info(self, tar_info: typing.Any) -> None:
         if tar_info.name == ".":
@@ -109,12 +331,51 @@ class SecureTarfile:
             logger=self.logger
         )
 
+    def _check_extraction_path(
+        self,
+        destination: str,
+        tar_info: tarfile.TarInfo
+    ) -> None:
+        """
+        Reject members that would be written outside of the destination.
+
+        Members are extracted before the digest of a streamed archive is
+        known, so a symlink member must not redirect later members. A
+        symlink at the member path itself is replaced like tar does.
+        """
+        path = os.path.normpath(os.path.join(destination, tar_info.name))
+        reason: typing.Optional[str] = None
+        parent = os.path.dirname(path)
+        while (reason is None) and parent.startswith(f"{destination}/"):
+            if os.path.islink(parent) is True:
+                reason = "Members must not be written through symlinks"
+            parent = os.path.dirname(parent)
+
+        if (reason is None) and (tar_info.islnk() is True):
+            link_path = os.path.realpath(
+                os.path.join(destination, tar_info.linkname)
+            )
+            real_destination = os.path.realpath(destination)
+            if not link_path.startswith(f"{real_destination}/"):
+                reason = "Hard links must point into the archive"
+
+        if reason is not None:
+            raise libioc.errors.IllegalArchiveContent(
+                asset_name=self.file,
+                reason=reason,
+                logger=self.logger
+            )
+
+        if (path != destination) and (os.path.islink(path) is True):
+            os.unlink(path)
+
 
 def extract(
     file: str,
     destination: str,
     compression_format: typing.Optional[str]=None,
-    logger: typing.Optional['libioc.Logger.Logger']=None
+    logger: typing.Optional['libioc.Logger.Logger']=None,
+    decompressor: str="auto"
 ) -> None:
     """
     Instantiate SecureTarfile and extract the archive files content.
@@ -129,9 +390,18 @@ def extract(
 
             Path to the extraction destination folder.
 
+        decompressor (str):
+
+            Either "lzma", "xz" for the external command or "auto".
+
         logger (libioc.Logger.Logger):
 
             Logging is enabled when a Logger instance is provided.
     """
-    secure_tarfile = SecureTarfile(file, logger=logger)
+    secure_tarfile = SecureTarfile(
+        file,
+        compression_format=compression_format,
+        logger=logger,
+        decompressor=decompressor
+    )
     secure_tarfile.extract(destination)
@@ -24,12 +24,12 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """ioc NullFS basejail storage backend."""
 import typing
-import os.path
 
 import libioc.Storage
 import libioc.Storage.Basejail
 import libioc.Storage.Standalone
 import libioc.helpers
+import libioc.MountTable
 
 if typing.TYPE_CHECKING:
     import libioc.Release
@@ -60,8 +60,10 @@ class NullFSBasejailStorage(libioc.Storage.Basejail.BasejailStorage):
 
         try:
             mounts = BasejailStorage._get_basejail_mounts(self)
+            mount_table = libioc.MountTable.MountTable(logger=self.logger)
+            mount_table.refresh()
             for source, destination in mounts:
-                if os.path.ismount(destination) is True:
+                if mount_table.is_mounted(destination) is True:
                     libioc.helpers.umount(destination)
                 libioc.helpers.mount(
                     source=source,
@@ -77,7 +79,8 @@ class NullFSBasejailStorage(libioc.Storage.Basejail.BasejailStorage):
 
     def teardown(
         self,
-        event_scope: typing.Optional['libioc.events.Scope']=None
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        keep_devices: bool=False
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
         """Unmount NullFS basejail mounts."""
         event = libioc.events.BasejailStorageConfig(
@@ -89,8 +92,10 @@ class NullFSBasejailStorage(libioc.Storage.Basejail.BasejailStorage):
         has_unmounted_any = False
         try:
             mounts = BasejailStorage._get_basejail_mounts(self)
+            mount_table = libioc.MountTable.MountTable(logger=self.logger)
+            mount_table.refresh()
             for _, destination in mounts:
-                if os.path.ismount(destination) is False:
+                if mount_table.is_mounted(destination) is False:
                     continue
                 libioc.helpers.umount(destination, force=True)
                 has_unmounted_any = True
@@ -105,7 +110,8 @@ class NullFSBasejailStorage(libioc.Storage.Basejail.BasejailStorage):
 
         yield from libioc.Storage.Storage.teardown(
             self,
-            event_scope=event_scope
+            event_scope=event_scope,
+            keep_devices=keep_devices
         )
 
     def setup(
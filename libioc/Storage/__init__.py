@@ -31,6 +31,7 @@ import typing
 import libioc.events
 import libioc.helpers
 import libioc.helpers_object
+import libioc.MountTable
 
 if typing.TYPE_CHECKING:
     import libioc.Jail
@@ -110,17 +111,32 @@ class Storage:
 
     def teardown(
         self,
-        event_scope: typing.Optional['libioc.events.Scope']=None
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        keep_devices: bool=False
     ) -> typing.Generator['libioc.events.IocEvent', None, None]:
-        """Unmount system mountpoints and devices from a jail."""
+        """
+        Unmount system mountpoints and devices from a jail.
+
+        Args:
+
+            event_scope (libioc.events.Scope): (default=None)
+
+                Provide an existing libiocage event scope or automatically
+                create a new one instead.
 
+            keep_devices (bool): (default=False)
+
+                Leave devfs and fdescfs mounted for a following quick start.
+        """
+        device_mountpoints = [] if (keep_devices is True) else [
+            "/dev/fd",
+            "/dev"
+        ]
         system_mountpoints = list(filter(
             os.path.isdir,
             map(
                 self.__get_absolute_path_from_jail_asset,
-                [
-                    "/dev/fd",
-                    "/dev",
+                device_mountpoints + [
                     "/proc",
                     "/root/compat/linux/proc",
                     "/root/etcupdate",
@@ -146,8 +162,10 @@ class Storage:
 
         has_unmounted_any = False
         try:
+            mount_table = libioc.MountTable.MountTable(logger=self.logger)
+            mount_table.refresh()
             for mountpoint in system_mountpoints:
-                if os.path.ismount(mountpoint) is False:
+                if mount_table.is_mounted(mountpoint) is False:
                     continue
                 libioc.helpers.umount(
                     mountpoint=mountpoint,
@@ -261,6 +279,11 @@ class Storage:
                 mountpoint=mountpoint,
                 logger=self.logger
             )
+        libioc.MountTable.MountTable(logger=self.logger).add(
+            mountpoint=mountpoint,
+            source="proc",
+            fstype="procfs"
+        )
 
     # ToDo: Remove unused function?
     def _mount_linprocfs(self) -> None:
@@ -284,6 +307,11 @@ class Storage:
                 mountpoint=linproc_path,
                 logger=self.logger
             )
+        libioc.MountTable.MountTable(logger=self.logger).add(
+            mountpoint=linproc_path,
+            source="linproc",
+            fstype="linprocfs"
+        )
 
     def _jail_mkdirp(
         self,
@@ -0,0 +1,404 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""ioc warm jail pool module."""
+import typing
+import errno
+import fcntl
+import os
+import threading
+import time
+
+import libioc.errors
+import libioc.events
+import libioc.helpers
+import libioc.helpers_object
+import libioc.Jail
+import libioc.Release
+import libioc.ZFS
+
+PoolSource = typing.Union[
+    'libioc.Release.ReleaseGenerator',
+    'libioc.Jail.JailGenerator',
+    str
+]
+
+
+class WarmPoolLease:
+    """A pool jail leased by one caller."""
+
+    def __init__(
+        self,
+        pool: 'WarmPool',
+        jail: 'libioc.Jail.JailGenerator',
+        lock_fd: int
+    ) -> None:
+        self.pool = pool
+        self.jail = jail
+        self.lock_fd = lock_fd
+        self.released = False
+
+    def release(self, background: bool=True) -> None:
+        """Roll the jail back to its pristine snapshot and return it."""
+        if self.released is True:
+            return
+        self.released = True
+        self.pool._recycle(self, background=background)
+
+
+class WarmPool:
+    """
+    Pool of pre-cloned stopped jails for short-lived fork_exec workloads.
+
+    Every pool member is created from the same release or template jail
+    once and snapshotted while pristine. Callers lease an idle member, run
+    their command in it and return it, after which the member is rolled
+    back to the snapshot in the background. This moves the clone and the
+    config generation out of the critical path of each command.
+
+    Leases are guarded by advisory file locks, so that pools with the same
+    name can be shared by independent processes on one host.
+
+    Example:
+
+        pool = libioc.WarmPool.WarmPool("13.2-RELEASE", name="ci", size=4)
+        pool.start_refill()
+        for event in pool.fork_exec("make test"):
+            print(event)
+    """
+
+    snapshot_name: str = "warm"
+    # /var/run is cleared on boot, so no lease outlives the host
+    lock_dir: str = "/var/run/iocage/warm_pool"
+
+    _refill_thread: typing.Optional[threading.Thread]
+    _recycle_threads: typing.List[threading.Thread]
+
+    def __init__(
+        self,
+        source: PoolSource,
+        name: typing.Optional[str]=None,
+        size: int=2,
+        refill_interval: float=0,
+        host: typing.Optional['libioc.Host.HostGenerator']=None,
+        zfs: typing.Optional['libioc.ZFS.ZFS']=None,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        """
+        Initialize a WarmPool.
+
+        Args:
+
+            source (Release|Jail|str):
+                The release, template jail or release name pool members are
+                created from.
+
+            name (str): (optional)
+                Prefix of the pool jail names. Defaults to the source name.
+
+            size (int): (default=2)
+                Number of jails kept in the pool.
+
+            refill_interval (float): (default=0)
+                Seconds to wait between the creation of two pool jails, which
+                limits the rate at which the pool is refilled.
+        """
+        self.logger = libioc.helpers_object.init_logger(self, logger)
+        self.zfs = libioc.helpers_object.init_zfs(self, zfs)
+        self.host = libioc.helpers_object.init_host(self, host)
+
+        if isinstance(source, str):
+            source = libioc.Release.ReleaseGenerator(
+                name=source,
+                host=self.host,
+                zfs=self.zfs,
+                logger=self.logger
+            )
+        self.source = source
+
+        if name is None:
+            name = f"warm-{source.name}"
+        self.name = name
+
+        self.size = size
+        self.refill_interval = refill_interval
+        self._refill_thread = None
+        self._recycle_threads = []
+        self._lock = threading.Lock()
+
+        invalid_names = [
+            x for x in self.member_names
+            if libioc.helpers.is_valid_name(x) is False
+        ]
+        if len(invalid_names) > 0:
+            raise libioc.errors.InvalidJailName(
+                name=invalid_names[0],
+                logger=self.logger
+            )
+
+    @property
+    def member_names(self) -> typing.List[str]:
+        """Return the names of all pool jails."""
+        return [f"{self.name}-{index}" for index in range(self.size)]
+
+    def get_member(self, name: str) -> 'libioc.Jail.JailGenerator':
+        """Return the (possibly not yet existing) pool jail."""
+        jail = libioc.Jail.JailGenerator(
+            dict(name=name),
+            new=True,
+            host=self.host,
+            zfs=self.zfs,
+            logger=self.logger
+        )
+        if jail.exists is False:
+            return jail
+        # existing members carry the config they were created with
+        return libioc.Jail.JailGenerator(
+            dict(name=name),
+            host=self.host,
+            zfs=self.zfs,
+            logger=self.logger
+        )
+
+    def fill(self) -> int:
+        """Create all missing pool jails and return their count."""
+        created = 0
+        for name in self.member_names:
+            lock_fd = self._try_lock(name)
+            if lock_fd is None:
+                continue
+            try:
+                if self._prepare(name) is True:
+                    created += 1
+                    if self.refill_interval > 0:
+                        time.sleep(self.refill_interval)
+            finally:
+                self._unlock(lock_fd)
+        return created
+
+    def start_refill(self) -> None:
+        """Fill the pool in a background thread."""
+        with self._lock:
+            thread = self._refill_thread
+            if (thread is not None) and thread.is_alive():
+                return
+            thread = threading.Thread(
+                target=self.__refill,
+                name=f"WarmPool[{self.name}].refill",
+                daemon=True
+            )
+            self._refill_thread = thread
+        thread.start()
+
+    def __refill(self) -> None:
+        try:
+            created = self.fill()
+            self.logger.verbose(
+                f"Warm pool {self.name} refilled with {created} jails"
+            )
+        except Exception as e:
+            self.logger.warn(f"Warm pool {self.name} refill failed: {e}")
+
+    def lease(self) -> WarmPoolLease:
+        """
+        Lease an idle pool jail.
+
+        Idle jails that are ready are preferred. Otherwise an idle jail
+        that was not rolled back yet is rolled back before it is leased,
+        and missing pool jails are created on demand.
+        """
+        unprepared: typing.List[typing.Tuple[str, int]] = []
+        try:
+            for name in self.member_names:
+                lock_fd = self._try_lock(name)
+                if lock_fd is None:
+                    continue
+                jail = self.get_member(name)
+                if self._is_ready(jail) is True:
+                    return WarmPoolLease(self, jail, lock_fd)
+                unprepared.append((name, lock_fd,))
+
+            if len(unprepared) == 0:
+                raise libioc.errors.WarmPoolExhausted(
+                    pool_name=self.name,
+                    logger=self.logger
+                )
+
+            name, lock_fd = unprepared.pop(0)
+            try:
+                self._prepare(name)
+            except Exception:
+                self._unlock(lock_fd)
+                raise
+            return WarmPoolLease(self, self.get_member(name), lock_fd)
+        finally:
+            for _, lock_fd in unprepared:
+                self._unlock(lock_fd)
+
+    def fork_exec(
+        self,
+        command: str,
+        passthru: bool=False,
+        event_scope: typing.Optional['libioc.events.Scope']=None,
+        env: typing.Dict[str, str]={},
+        **temporary_config_override: typing.Any
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Run a command in a leased pool jail and return it afterwards."""
+        lease = self.lease()
+        try:
+            yield from libioc.Jail.JailGenerator.fork_exec(
+                lease.jail,
+                command=command,
+                passthru=passthru,
+                event_scope=event_scope,
+                env=env,
+                **temporary_config_override
+            )
+        finally:
+            lease.release()
+
+    def wait(self) -> None:
+        """Wait for pending background refills and rollbacks."""
+        with self._lock:
+            threads = list(self._recycle_threads)
+            if self._refill_thread is not None:
+                threads.append(self._refill_thread)
+        for thread in threads:
+            thread.join()
+
+    def _has_snapshot(self, jail: 'libioc.Jail.JailGenerator') -> bool:
+        if jail.exists is False:
+            return False
+        snapshot_identifier = f"{jail.dataset.name}@{self.snapshot_name}"
+        try:
+            self.zfs.get_snapshot(snapshot_identifier)
+            return True
+        except Exception:
+            return False
+
+    def _is_ready(self, jail: 'libioc.Jail.JailGenerator') -> bool:
+        """
+        Return True if the jail is stopped and unchanged since its snapshot.
+
+        Recycling happens in the background, so a member that is idle may
+        still hold the writes of its previous lease when the process exited
+        before the rollback finished.
+        """
+        if self._has_snapshot(jail) is False:
+            return False
+        if jail.running is True:
+            return False
+        written = libioc.ZFS.get_written(
+            jail.dataset.name,
+            self.snapshot_name,
+            logger=self.logger
+        )
+        return (written == 0)
+
+    def _prepare(self, name: str) -> bool:
+        """Create and snapshot a pool jail that is not ready yet."""
+        jail = self.get_member(name)
+        if self._is_ready(jail) is True:
+            return False
+
+        if self._has_snapshot(jail) is True:
+            try:
+                self.logger.verbose(f"Rolling back dirty pool jail {name}")
+                self._reset(jail)
+                return False
+            except Exception as e:
+                self.logger.verbose(
+                    f"Rolling back pool jail {name} failed: {e}"
+                )
+
+        if jail.exists is True:
+            # an interrupted creation leaves a jail without snapshot
+            self.logger.verbose(f"Recreating incomplete pool jail {name}")
+            for _ in jail.destroy(force=True):
+                pass
+            jail = self.get_member(name)
+
+        self.logger.verbose(f"Creating pool jail {name}")
+        jail.create(self.source)
+        jail.snapshots.create(self.snapshot_name)
+        return True
+
+    def _recycle(self, lease: WarmPoolLease, background: bool) -> None:
+        if background is False:
+            self.__recycle(lease)
+            return
+        thread = threading.Thread(
+            target=self.__recycle,
+            args=(lease,),
+            name=f"WarmPool[{self.name}].recycle",
+            daemon=True
+        )
+        with self._lock:
+            self._recycle_threads = [
+                x for x in self._recycle_threads if x.is_alive()
+            ]
+            self._recycle_threads.append(thread)
+        thread.start()
+
+    def _reset(self, jail: 'libioc.Jail.JailGenerator') -> None:
+        """Stop the jail and roll it back to its pristine snapshot."""
+        if jail.running is True:
+            for _ in jail.stop(force=True):
+                pass
+        jail.snapshots.rollback(self.snapshot_name, force=True)
+
+    def __recycle(self, lease: WarmPoolLease) -> None:
+        jail = lease.jail
+        try:
+            self._reset(jail)
+        except Exception as e:
+            self.logger.warn(
+                f"Rolling back pool jail {jail.name} failed: {e}"
+            )
+            try:
+                for _ in jail.destroy(force=True):
+                    pass
+            except Exception:
+                pass
+        finally:
+            self._unlock(lease.lock_fd)
+
+    def _try_lock(self, name: str) -> typing.Optional[int]:
+        os.makedirs(self.lock_dir, mode=0o700, exist_ok=True)
+        lock_fd = os.open(
+            f"{self.lock_dir}/{name}.lock",
+            os.O_RDWR | os.O_CREAT,
+            0o600
+        )
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            os.close(lock_fd)
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EACCES,):
+                return None
+            raise
+        return lock_fd
+
+    def _unlock(self, lock_fd: int) -> None:
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
@@ -26,8 +26,11 @@
 import typing
 import libzfs
 import datetime
+import os
+import re
 
 import libioc.Logger
+import libioc.helpers
 import libioc.helpers_object
 import libioc.errors
 
@@ -295,3 +298,132 @@ def append_snapshot_datetime(text: str) -> str:
     now = datetime.datetime.utcnow()
     text += now.strftime("%Y%m%d%H%I%S.%f")
     return text
+
+
+class ZFSDiffEntry:
+    """A path that changed between a snapshot and a later state."""
+
+    # removed, created, modified and renamed paths
+    REMOVED = "-"
+    CREATED = "+"
+    MODIFIED = "M"
+    RENAMED = "R"
+
+    def __init__(
+        self,
+        change: str,
+        file_type: str,
+        path: str,
+        new_path: typing.Optional[str]=None
+    ) -> None:
+        self.change = change
+        self.file_type = file_type
+        self.path = path
+        self.new_path = new_path
+
+    @property
+    def is_directory(self) -> bool:
+        """Return True if the changed path is a directory."""
+        return (self.file_type == "/")
+
+
+_diff_escape_pattern = re.compile(rb"\\([0-7]{4})")
+
+
+def _unescape_diff_path(path: str) -> str:
+    # zfs diff escapes every byte of non-printable and whitespace characters
+    unescaped = _diff_escape_pattern.sub(
+        lambda match: bytes([int(match.group(1), 8)]),
+        path.encode("UTF-8")
+    )
+    return os.fsdecode(unescaped)
+
+
+def diff(
+    snapshot_name: str,
+    target_name: str,
+    logger: typing.Optional['libioc.Logger.Logger']=None
+) -> typing.List[ZFSDiffEntry]:
+    """
+    List the paths that changed since a snapshot.
+
+    The target is a later snapshot of the same dataset or the dataset
+    itself. Paths are absolute and include the mountpoint.
+    """
+    stdout, _, _ = libioc.helpers.exec(
+        ["/sbin/zfs", "diff", "-H", "-F", snapshot_name, target_name],
+        logger=logger
+    )
+    entries = []
+    for line in (stdout or "").splitlines():
+        fields = line.split("\t")
+        if len(fields) < 3:
+            continue
+        entries.append(ZFSDiffEntry(
+            change=fields[0],
+            file_type=fields[1],
+            path=_unescape_diff_path(fields[2]),
+            new_path=(
+                _unescape_diff_path(fields[3]) if (len(fields) > 3) else None
+            )
+        ))
+    return entries
+
+
+def get_guid(
+    name: str,
+    logger: typing.Optional['libioc.Logger.Logger']=None
+) -> typing.Optional[str]:
+    """Return the GUID of a snapshot or bookmark or None if it is missing."""
+    stdout, _, returncode = libioc.helpers.exec(
+        ["/sbin/zfs", "get", "-Hp", "-o", "value", "guid", name],
+        logger=logger,
+        ignore_error=True
+    )
+    if (returncode != 0) or not stdout:
+        return None
+    return stdout
+
+
+def get_written(
+    name: str,
+    snapshot_name: str,
+    logger: typing.Optional['libioc.Logger.Logger']=None
+) -> typing.Optional[int]:
+    """
+    Return the bytes written to a dataset and its children since a snapshot.
+
+    Children without the snapshot are ignored. None is returned when the
+    dataset or its snapshot is missing.
+    """
+    stdout, _, returncode = libioc.helpers.exec(
+        [
+            "/sbin/zfs", "get", "-Hp", "-r", "-o", "value",
+            f"written@{snapshot_name}", name
+        ],
+        logger=logger,
+        ignore_error=True
+    )
+    if (returncode != 0) or not stdout:
+        return None
+    values = [x for x in stdout.splitlines() if x.isdigit()]
+    if len(values) == 0:
+        return None
+    return sum(int(x) for x in values)
+
+
+def bookmark(
+    snapshot_name: str,
+    bookmark_name: str,
+    logger: typing.Optional['libioc.Logger.Logger']=None
+) -> None:
+    """Create a bookmark of a snapshot, replacing an existing one."""
+    if get_guid(bookmark_name, logger=logger) is not None:
+        libioc.helpers.exec(
+            ["/sbin/zfs", "destroy", bookmark_name],
+            logger=logger
+        )
+    libioc.helpers.exec(
+        ["/sbin/zfs", "bookmark", snapshot_name, bookmark_name],
+        logger=logger
+    )
@@ -225,10 +225,13 @@ class JailHookFailed(JailException):
         self,
         jail: 'libioc.Jail.JailGenerator',
         hook: str,
+        reason: typing.Optional[str]=None,
         logger: typing.Optional['libioc.Logger.Logger']=None
     ) -> None:
         self.hook = hook
         msg = f"Jail {jail.full_name} hook {hook} failed"
+        if reason is not None:
+            msg += f": {reason}"
         JailException.__init__(self, message=msg, jail=jail, logger=logger)
 
 
@@ -288,6 +291,30 @@ class JailExecutionAborted(JailException):
         JailException.__init__(self, message=msg, jail=jail, logger=logger)
 
 
+class ExecChannelFailed(IocException):
+    """Raised when a persistent exec channel into a jail fails."""
+
+    def __init__(
+        self,
+        reason: str,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        msg = f"Exec channel failed: {reason}"
+        super().__init__(message=msg, logger=logger)
+
+
+class WarmPoolExhausted(IocException):
+    """Raised when all jails of a warm pool are leased."""
+
+    def __init__(
+        self,
+        pool_name: str,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        msg = f"All jails of the warm pool {pool_name} are leased"
+        super().__init__(message=msg, logger=logger)
+
+
 # Jail State
 
 
@@ -380,6 +407,19 @@ class IllegalArchiveContent(IocException):
         super().__init__(message=msg, logger=logger)
 
 
+class ArchiveDecompressionFailed(IocException):
+    """Raised when an external command failed to decompress an archive."""
+
+    def __init__(
+        self,
+        asset_name: str,
+        reason: str,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        msg = f"Asset {asset_name} could not be decompressed - {reason}"
+        super().__init__(message=msg, logger=logger)
+
+
 # JailConfig
 
 
@@ -623,6 +663,23 @@ class BackupSourceUnknownFormat(IocException):
         IocException.__init__(self, message=msg, logger=logger)
 
 
+class BackupChainBroken(IocException):
+    """Raised when an incremental backup does not continue the chain."""
+
+    def __init__(
+        self,
+        source: str,
+        dataset_name: str,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+
+        msg = (
+            f"The incremental backup {source} of dataset {dataset_name} "
+            "does not continue the previously restored backup"
+        )
+        IocException.__init__(self, message=msg, logger=logger)
+
+
 # ListableResource
 
 
@@ -726,6 +783,19 @@ class CommandFailure(IocException):
         super().__init__(message=msg, logger=logger)
 
 
+class CommandTimeout(IocException):
+    """Raised when a command did not exit in time and was killed."""
+
+    def __init__(
+        self,
+        timeout: float,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        self.timeout = timeout
+        msg = f"Command timed out after {timeout} seconds"
+        super().__init__(message=msg, logger=logger)
+
+
 class NotAnIocageZFSProperty(IocException):
     """Raised when iocage attempts to touch a non-iocage ZFS property."""
 
@@ -781,7 +851,7 @@ class DownloadFailed(IocException):
     def __init__(
         self,
         url: str,
-        code: int,
+        code: typing.Union[int, str],
         logger: typing.Optional['libioc.Logger.Logger']=None,
         level: str="error"
     ) -> None:
@@ -1359,6 +1429,18 @@ class MissingDevfsRulesetName(DevfsRuleException):
         msg = "The devfs ruleset is missing a name"
         super().__init__(message=msg, logger=logger)
 
+
+class DevfsRulesetInstallFailed(DevfsRuleException):
+    """Raised when a devfs ruleset could not be installed in the kernel."""
+
+    def __init__(
+        self,
+        ruleset_number: int,
+        logger: typing.Optional['libioc.Logger.Logger']=None
+    ) -> None:
+        msg = f"Failed to install devfs ruleset {ruleset_number}"
+        super().__init__(message=msg, logger=logger)
+
 # Logger
 
 
@@ -484,6 +484,39 @@ class JailHookStart(JailHook):
     pass
 
 
+class JailHookOutput(JailEvent):
+    """Output of a running jail hook, stepped once for every line."""
+
+    stream: typing.Optional[str]
+    line: typing.Optional[str]
+
+    def __init__(
+        self,
+        jail: 'libioc.Jail.JailGenerator',
+        hook: str,
+        message: typing.Optional[str]=None,
+        scope: typing.Optional[Scope]=None
+    ) -> None:
+        self.hook = hook
+        self.stream = None
+        self.line = None
+        super().__init__(
+            jail=jail,
+            message=message,
+            scope=scope
+        )
+
+    def step(  # type: ignore[override]
+        self,
+        stream: str,
+        line: str
+    ) -> 'IocEvent':
+        """Reflect a line of output on stdout or stderr."""
+        self.stream = stream
+        self.line = line
+        return super().step(line)
+
+
 class JailCommand(JailHook):
     """Run command in a jail."""
 
@@ -633,7 +666,28 @@ class ReleaseDownload(FetchRelease):
 class ReleaseAssetDownload(FetchRelease):
     """Download release assets."""
 
-    pass
+    asset: typing.Optional[str]
+    bytes_received: int
+    bytes_total: typing.Optional[int]
+
+    def __init__(
+        self,
+        release: 'libioc.Release.ReleaseGenerator',
+        asset: typing.Optional[str]=None,
+        message: typing.Optional[str]=None,
+        scope: typing.Optional[Scope]=None
+    ) -> None:
+        self.asset = asset
+        self.bytes_received = 0
+        self.bytes_total = None
+        super().__init__(release=release, message=message, scope=scope)
+
+    @property
+    def progress(self) -> typing.Optional[float]:
+        """Return the received fraction of the asset."""
+        if not self.bytes_total:
+            return None
+        return self.bytes_received / self.bytes_total
 
 
 class ReleaseExtraction(FetchRelease):
@@ -33,9 +33,14 @@ import subprocess  # nosec: B404
 import sys
 import pty
 import select
+import shutil
+import stat
+import threading
+import queue
 
 import libioc.errors
 import libioc.Logger
+import libioc.MountTable
 
 # MyPy
 import libioc.Types
@@ -588,6 +593,11 @@ def mount(
             reason=jiov.errmsg.value.decode("UTF-8"),
             logger=logger
         )
+    libioc.MountTable.MountTable(logger=logger).add(
+        mountpoint=destination,
+        source=source,
+        fstype=fstype
+    )
 
 
 def umount(
@@ -630,7 +640,11 @@ def umount(
     else:
         umount_flags = ctypes.c_ulonglong(0x80000)
 
-    if os.path.ismount(str(mountpoint_path)) is False:
+    mount_table = libioc.MountTable.MountTable(logger=logger)
+    if mount_table.is_mounted(str(mountpoint_path)) is False:
+        # the snapshot misses mounts made elsewhere or after it was taken
+        mount_table.refresh()
+    if mount_table.is_mounted(str(mountpoint_path)) is False:
         raise libioc.errors.InvalidMountpoint(
             mountpoint=mountpoint,
             logger=logger
@@ -638,6 +652,7 @@ def umount(
 
     _mountpoint = str(mountpoint_path).encode("utf-8")
     if libjail.dll.unmount(_mountpoint, umount_flags) == 0:
+        mount_table.remove(str(mountpoint_path))
         if logger is not None:
             logger.debug(
                 f"Jail mountpoint {mountpoint} umounted"
@@ -713,3 +728,197 @@ def makedirs_safe(
     if logger is not None:
         logger.verbose(f"Safely creating {target} directory")
     os.makedirs(target, mode=mode, exist_ok=True)
+
+
+def remove_path(path: str) -> None:
+    """Remove a file, link or directory tree."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def copy_path(source: str, target: str) -> None:
+    """Copy a single file, link or directory entry with its attributes."""
+    source_stat = os.lstat(source)
+    if stat.S_ISDIR(source_stat.st_mode):
+        if os.path.islink(target) or os.path.isfile(target):
+            os.remove(target)
+        os.makedirs(target, exist_ok=True)
+    else:
+        remove_path(target)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if stat.S_ISLNK(source_stat.st_mode):
+            os.symlink(os.readlink(source), target)
+        elif stat.S_ISREG(source_stat.st_mode):
+            shutil.copyfile(source, target, follow_symlinks=False)
+        else:
+            os.mknod(target, source_stat.st_mode, source_stat.st_rdev)
+    os.lchown(target, source_stat.st_uid, source_stat.st_gid)
+    if stat.S_ISLNK(source_stat.st_mode) is False:
+        # changing the owner clears setuid and setgid bits
+        os.chmod(target, stat.S_IMODE(source_stat.st_mode))
+        os.utime(
+            target,
+            ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns,)
+        )
+
+
+_IteratedType = typing.TypeVar("_IteratedType")
+
+
+def iterate_concurrently(
+    iterables: typing.Sequence[typing.Iterable[_IteratedType]],
+    concurrency: int=4
+) -> typing.Generator[_IteratedType, None, None]:
+    """
+    Consume iterables in worker threads and yield their items.
+
+    Items are yielded in the order the workers produced them. After a
+    failure, or when the caller stops iterating, the remaining iterables
+    are abandoned. The first failure is raised once all workers stopped.
+    """
+    if concurrency <= 1:
+        for iterable in iterables:
+            yield from iterable
+        return
+
+    pending: queue.Queue = queue.Queue()
+    for index, iterable in enumerate(iterables):
+        pending.put((index, iterable,))
+    items: queue.Queue = queue.Queue()
+    errors: typing.Dict[int, BaseException] = {}
+    stopped = threading.Event()
+    finished = object()
+
+    def _worker() -> None:
+        try:
+            while stopped.is_set() is False:
+                try:
+                    index, iterable = pending.get_nowait()
+                except queue.Empty:
+                    return
+                iterator = iter(iterable)
+                try:
+                    for item in iterator:
+                        items.put(item)
+                        if stopped.is_set() is True:
+                            break
+                except BaseException as e:
+                    errors[index] = e
+                    stopped.set()
+                finally:
+                    # run cleanup of abandoned generators in this thread
+                    close = getattr(iterator, "close", None)
+                    if close is not None:
+                        close()
+        finally:
+            items.put(finished)
+
+    threads = [
+        threading.Thread(target=_worker, daemon=True)
+        for _ in range(min(concurrency, len(iterables)))
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = len(threads)
+        while running > 0:
+            item = items.get()
+            if item is finished:
+                running -= 1
+                continue
+            yield item
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+    if len(errors) > 0:
+        raise errors[min(errors.keys())]
+
+
+def iterate_concurrently_ordered(
+    iterables: typing.Sequence[typing.Iterable[_IteratedType]],
+    concurrency: int=4,
+    buffer_size: int=1
+) -> typing.Generator[typing.Tuple[int, _IteratedType], None, None]:
+    """
+    Consume iterables in worker threads and yield their items in order.
+
+    All items of the first iterable are yielded before the items of the
+    second one and so on, together with the index of their iterable.
+    Up to concurrency iterables are consumed ahead of the caller, each
+    buffering at most buffer_size items. Failures and abandoned
+    iterations are handled like in iterate_concurrently.
+    """
+    if concurrency <= 1:
+        for index, iterable in enumerate(iterables):
+            for item in iterable:
+                yield (index, item,)
+        return
+
+    buffers: typing.List[queue.Queue] = [
+        queue.Queue(maxsize=buffer_size) for _ in iterables
+    ]
+    errors: typing.Dict[int, BaseException] = {}
+    stopped = threading.Event()
+    finished = object()
+
+    def _put(index: int, item: typing.Any) -> bool:
+        while stopped.is_set() is False:
+            try:
+                buffers[index].put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(index: int) -> None:
+        iterator = iter(iterables[index])
+        try:
+            for item in iterator:
+                if _put(index, item) is False:
+                    break
+            _put(index, finished)
+        except BaseException as e:
+            errors[index] = e
+            stopped.set()
+        finally:
+            # run cleanup of abandoned generators in this thread
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    threads: typing.List[threading.Thread] = []
+
+    def _start(index: int) -> None:
+        thread = threading.Thread(target=_worker, args=(index,), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    for index in range(min(concurrency, len(iterables))):
+        _start(index)
+
+    try:
+        for index in range(len(iterables)):
+            while stopped.is_set() is False:
+                try:
+                    item = buffers[index].get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is finished:
+                    break
+                yield (index, item,)
+            if stopped.is_set() is True:
+                break
+            if (index + concurrency) < len(iterables):
+                _start(index + concurrency)
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+    if len(errors) > 0:
+        raise errors[min(errors.keys())]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compare the wall time of release asset decompressor backends.
+
+Usage: benchmark_decompression.py <asset.txz> [<asset.txz> ...]
+
+Every backend extracts all given assets into a temporary directory,
+first one after another and then concurrently.
+"""
+import typing
+import shutil
+import sys
+import tempfile
+import time
+
+import libioc.helpers
+import libioc.SecureTarfile
+
+
+def _measure(
+    assets: typing.List[str],
+    decompressor: str,
+    concurrency: int
+) -> float:
+    destination = tempfile.mkdtemp(prefix="benchmark_decompression")
+    try:
+        started_at = time.monotonic()
+        extractions = libioc.helpers.iterate_concurrently(
+            [
+                libioc.SecureTarfile.SecureTarfile(
+                    asset,
+                    compression_format="xz",
+                    decompressor=decompressor
+                ).extract_stream(destination)
+                for asset in assets
+            ],
+            concurrency=concurrency
+        )
+        for _ in extractions:
+            pass
+        return time.monotonic() - started_at
+    finally:
+        shutil.rmtree(destination, ignore_errors=True)
+
+
+def main() -> None:
+    """Run the benchmark against the given assets."""
+    assets = sys.argv[1:]
+    if len(assets) == 0:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    decompressors = ["lzma"]
+    if shutil.which(libioc.SecureTarfile.SecureTarfile.xz_command[0]):
+        decompressors.append("xz")
+
+    for decompressor in decompressors:
+        for concurrency in sorted({1, len(assets)}):
+            wall_time = _measure(assets, decompressor, concurrency)
+            print(
+                f"{decompressor:5} concurrency={concurrency}: "
+                f"{wall_time:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Compare jail command latency of jexec and persistent exec channels.
+
+Usage: benchmark_exec_channel.py <jail-name> [iterations]
+"""
+import sys
+import time
+
+import libioc.Jail
+
+
+def _measure(jail: libioc.Jail.Jail, iterations: int, channel: bool) -> float:
+    started_at = time.monotonic()
+    for _ in range(iterations):
+        jail.exec(["/usr/bin/true"], channel=channel)
+    return (time.monotonic() - started_at) / iterations
+
+
+def main() -> None:
+    """Run the benchmark against a running jail."""
+    jail = libioc.Jail.Jail(sys.argv[1])
+    jail.require_jail_running()
+    iterations = int(sys.argv[2]) if (len(sys.argv) > 2) else 200
+
+    # the first channel command includes forking and attaching the helper
+    jail.exec(["/usr/bin/true"], channel=True)
+
+    jexec_latency = _measure(jail, iterations, channel=False)
+    channel_latency = _measure(jail, iterations, channel=True)
+    print(f"jexec:   {jexec_latency * 1000:.2f} ms per command")
+    print(f"channel: {channel_latency * 1000:.2f} ms per command")
+    print(f"speedup: {jexec_latency / channel_latency:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
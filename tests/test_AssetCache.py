@@ -0,0 +1,103 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the release asset cache."""
+import hashlib
+import os
+import pathlib
+
+import pytest
+
+import libioc.AssetCache
+
+
+def _asset(tmp_path: pathlib.Path, name: str, content: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return hashlib.sha256(content).hexdigest()
+
+
+class TestAssetCache(object):
+    """Run tests for the content-addressed asset cache."""
+
+    def test_store_and_restore(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if stored assets are restored by their digest."""
+        digest = _asset(tmp_path, "base.txz", b"base")
+        cache = libioc.AssetCache.AssetCache(
+            str(tmp_path / "cache"),
+            logger=logger
+        )
+        assert (digest in cache) is False
+        assert cache.restore(digest, str(tmp_path / "restored")) is False
+
+        cache.store(digest, str(tmp_path / "base.txz"))
+        os.remove(tmp_path / "base.txz")
+        assert (digest in cache) is True
+        assert cache.restore(digest, str(tmp_path / "restored")) is True
+        assert (tmp_path / "restored").read_bytes() == b"base"
+        assert cache.get_path(digest).startswith(
+            f"{tmp_path}/cache/{digest[:2]}/"
+        )
+
+    def test_least_recently_used_assets_are_evicted(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if the cache is bound to its maximum size."""
+        cache = libioc.AssetCache.AssetCache(
+            str(tmp_path / "cache"),
+            max_size=250,
+            logger=logger
+        )
+        digests = []
+        for index, name in enumerate(["base", "lib32", "src"]):
+            digest = _asset(tmp_path, name, bytes([index]) * 100)
+            cache.store(digest, str(tmp_path / name))
+            os.utime(cache.get_path(digest), (index, index,))
+            digests.append(digest)
+            if index == 1:
+                # restoring the oldest asset marks it as recently used
+                cache.restore(digests[0], str(tmp_path / "restored"))
+
+        assert (digests[0] in cache) is True
+        assert (digests[1] in cache) is False
+        assert (digests[2] in cache) is True
+
+    def test_invalid_digest(self, tmp_path: pathlib.Path) -> None:
+        """Test if only SHA256 digests address assets."""
+        cache = libioc.AssetCache.AssetCache(str(tmp_path))
+        with pytest.raises(ValueError):
+            cache.get_path("../../etc/passwd")
+
+    def test_parse_size(self) -> None:
+        """Test if sizes with units are converted to bytes."""
+        assert libioc.AssetCache.parse_size("512") == 512
+        assert libioc.AssetCache.parse_size("4K") == 4096
+        assert libioc.AssetCache.parse_size("10G") == 10 * 1024 ** 3
+        with pytest.raises(ValueError):
+            libioc.AssetCache.parse_size("ten")
@@ -27,12 +27,15 @@ import json
 import os
 import os.path
 import pathlib
+import tarfile
 
 import pytest
 import libzfs
 
 import libioc.Jail
 import libioc.ResourceBackup
+import libioc.ZFS
+import libioc.errors
 
 
 def read_jail_config_json(config_file: str) -> dict:
@@ -131,3 +134,242 @@ class TestBackup(object):
         assert jail.name == new_jail_name
         for key, value in backup_config_data.items():
             assert jail.config.data[key] == backup_config_data[key]
+
+
+class BackupStub(object):
+    """Provide the work directory of an extracted backup."""
+
+    def __init__(self, work_dir: str) -> None:
+        self.work_dir = work_dir
+
+
+class TestBackupArchive(object):
+    """Run tests for streaming backup archives."""
+
+    def _write_stream(
+        self,
+        archive: libioc.ResourceBackup.BackupArchive,
+        name: str,
+        data: bytes
+    ) -> int:
+        def _write(fd: int) -> None:
+            os.write(fd, data)
+
+        with libioc.ResourceBackup._pipe_reader(_write) as stream:
+            return archive.add_stream(name, stream)
+
+    def test_streams_are_split_into_members(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if large streams are split and read back in order."""
+        destination = str(tmp_path / "backup.tar.gz")
+        data = os.urandom(2500)
+        archive = libioc.ResourceBackup.BackupArchive(destination)
+        archive.chunk_size = 1000
+        archive.add_bytes("config.json", b"{}")
+        assert self._write_stream(archive, "data/db.zfs", data) == 3
+        assert self._write_stream(archive, "root.zfs", b"small") == 1
+        archive.close()
+
+        with tarfile.open(destination, "r:gz") as tar:
+            assert tar.getnames() == [
+                "./config.json",
+                "./data/db.zfs.000",
+                "./data/db.zfs.001",
+                "./data/db.zfs.002",
+                "./root.zfs"
+            ]
+            tar.extractall(tmp_path / "extracted", filter="data")
+
+        backup = BackupStub(str(tmp_path / "extracted"))
+        for name, content in (("data/db", data,), ("root", b"small",)):
+            with libioc.ResourceBackup.LaunchableResourceBackup \
+                    ._open_dataset_stream(backup, name) as f:
+                assert f.read() == content
+
+    def test_chunks_keep_their_order(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if chunk members are numbered in the order they were added."""
+        destination = str(tmp_path / "backup.tar.gz")
+        archive = libioc.ResourceBackup.BackupArchive(destination)
+        assert archive.add_chunks("a.zfs", [b"1", b"", b"2"]) == 2
+        assert archive.add_chunks("b.zfs", [b"3"]) == 1
+        archive.close()
+
+        with tarfile.open(destination, "r:gz") as tar:
+            assert [
+                (x.name, tar.extractfile(x).read(),)  # type: ignore
+                for x in tar.getmembers()
+            ] == [
+                ("./a.zfs.000", b"1",),
+                ("./a.zfs.001", b"2",),
+                ("./b.zfs", b"3",)
+            ]
+
+    def test_writer_errors_are_raised(self) -> None:
+        """Test if a failing stream writer fails the reader."""
+        def _write(fd: int) -> None:
+            os.write(fd, b"partial")
+            raise OSError("send failed")
+
+        with pytest.raises(OSError, match="send failed"):
+            with libioc.ResourceBackup._pipe_reader(_write) as stream:
+                assert stream.read() == b"partial"
+
+    def test_discard_removes_incomplete_archive(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if a failed export does not leave an archive behind."""
+        destination = tmp_path / "backup.tar.gz"
+        archive = libioc.ResourceBackup.BackupArchive(str(destination))
+        archive.add_bytes("config.json", b"{}")
+        archive.discard()
+        assert destination.exists() is False
+
+
+class ResourceStub(object):
+    """Provide the name and logger of a backed up resource."""
+
+    def __init__(self, logger: 'libioc.Logger.Logger') -> None:
+        self.name = "stub"
+        self.logger = logger
+
+
+def _backup_of_stub(
+    logger: 'libioc.Logger.Logger'
+) -> libioc.ResourceBackup.LaunchableResourceBackup:
+    return libioc.ResourceBackup.LaunchableResourceBackup(
+        typing.cast(
+            'libioc.LaunchableResource.LaunchableResource',
+            ResourceStub(logger)
+        )
+    )
+
+
+class TestArchiveRoundTrip(object):
+    """Run tests for restoring streamed backup archives."""
+
+    def test_streamed_archive_is_restored(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if a streamed archive is extracted by restore."""
+        destination = str(tmp_path / "backup.tar.gz")
+        root_file = tmp_path / "rc.conf"
+        root_file.write_text("sshd_enable=YES\n")
+        data = os.urandom(2500)
+
+        exporter = _backup_of_stub(logger)
+        exporter._lock(None)
+        archive = libioc.ResourceBackup.BackupArchive(destination)
+        archive.chunk_size = 1000
+        exporter._archive = archive
+        archive.add_bytes("config.json", b'{"release": "12.0-RELEASE"}')
+        exporter._export_manifest({"data/db": dict(guid="1", from_guid=None)})
+        archive.add_path(str(tmp_path), "root")
+        archive.add_path(str(root_file), "root/rc.conf")
+        archive.add_chunks("data/db.zfs", [data[:1000], data[1000:]])
+        archive.close()
+        exporter._unlock()
+
+        importer = _backup_of_stub(logger)
+        importer._lock(None)
+        try:
+            list(importer._extract_bundle(destination))
+            work_dir = pathlib.Path(importer.work_dir)
+            assert (work_dir / "root" / "rc.conf").read_text() \
+                == "sshd_enable=YES\n"
+            assert importer._list_importable_datasets() == ["data/db"]
+            assert importer._read_manifest_guids() == {"data/db": "1"}
+            with importer._open_dataset_stream("data/db") as f:
+                assert f.read() == data
+        finally:
+            importer._unlock()
+
+    def test_unwritable_destination_releases_lock(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if a destination that cannot be opened unlocks the backup."""
+        backup = _backup_of_stub(logger)
+        with pytest.raises(OSError):
+            list(backup.export(str(tmp_path / "missing" / "backup.tar.gz")))
+        assert backup.locked is False
+
+
+class TestIncrementalBackup(object):
+    """Run tests for incremental backup chains."""
+
+    def _backup(
+        self,
+        work_dir: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> libioc.ResourceBackup.LaunchableResourceBackup:
+        backup = _backup_of_stub(logger)
+        work_dir.mkdir()
+        backup._work_dir = str(work_dir)
+        backup._snapshot_name = f"backup_{work_dir.name}"
+        return backup
+
+    def test_chain_is_continued(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if incremental backups continue the restored snapshots."""
+        full = self._backup(tmp_path / "full", logger)
+        full._export_manifest({
+            "root": dict(guid="1", from_guid=None),
+            "data": dict(guid="10", from_guid=None)
+        })
+        incremental = self._backup(tmp_path / "incremental", logger)
+        incremental._export_manifest({
+            "root": dict(guid="2", from_guid="1"),
+            "data": dict(guid="11", from_guid="10")
+        })
+
+        guids: typing.Dict[str, str] = {}
+        full._continue_backup_chain("full", guids)
+        incremental._continue_backup_chain("incremental", guids)
+
+        assert guids == dict(root="2", data="11")
+
+    def test_broken_chain_fails(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if an incremental backup of another base is rejected."""
+        incremental = self._backup(tmp_path / "incremental", logger)
+        incremental._export_manifest({
+            "root": dict(guid="3", from_guid="2")
+        })
+
+        with pytest.raises(libioc.errors.BackupChainBroken):
+            incremental._continue_backup_chain("incremental", dict(root="1"))
+
+    def test_bookmark_is_replaced(
+        self,
+        mocker: typing.Any
+    ) -> None:
+        """Test if the previous bookmark is destroyed first."""
+        exec_mock = mocker.patch(
+            "libioc.helpers.exec",
+            return_value=("123", "", 0,)
+        )
+        libioc.ZFS.bookmark("pool/jail/data@backup2", "pool/jail/data#ioc")
+
+        commands = [call.args[0] for call in exec_mock.call_args_list]
+        assert commands == [
+            ["/sbin/zfs", "get", "-Hp", "-o", "value", "guid",
+                "pool/jail/data#ioc"],
+            ["/sbin/zfs", "destroy", "pool/jail/data#ioc"],
+            ["/sbin/zfs", "bookmark", "pool/jail/data@backup2",
+                "pool/jail/data#ioc"]
+        ]
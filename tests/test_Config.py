@@ -34,6 +34,7 @@ import libzfs
 import libioc.Jail
 import libioc.Config.Type.JSON
 import libioc.Config.Jail.Properties.Interfaces
+import libioc.Config.Jail.JailConfig
 
 class TestJailConfig(object):
 
@@ -380,3 +381,22 @@ class TestBrokenConfig(object):
             logger=logger,
             zfs=zfs
         ))
+
+
+class TestJailConfigOverlay(object):
+
+    def test_overrides_do_not_leak_into_the_original_config(
+        self,
+        existing_jail: 'libioc.Jail.Jail'
+    ) -> None:
+        original_config = existing_jail.config
+        vnet = original_config["vnet"]
+        overlay = libioc.Config.Jail.JailConfig.JailConfigOverlay(
+            original_config
+        )
+        overlay["vnet"] = (vnet is False)
+        overlay["user.comment"] = "temporary"
+        assert overlay["vnet"] is (vnet is False)
+        assert overlay["id"] == original_config["id"]
+        assert original_config["vnet"] is vnet
+        assert "user.comment" not in original_config.keys()
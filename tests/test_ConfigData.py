@@ -92,3 +92,29 @@ class TestConfigData(object):
         data["a.b"] = "1"
         nested = data.nested
         assert nested["a"]["b"] == "1"
+
+
+class TestOverlayData(object):
+    """Run tests for the copy-on-write Config Data overlay."""
+
+    def test_reads_fall_through_to_the_base(self) -> None:
+        """Test that unchanged keys are read from the base data."""
+        base = libioc.Config.Data.Data(dict(a="1", b=dict(c="2")))
+        overlay = libioc.Config.Data.OverlayData(base)
+        assert overlay["a"] == "1"
+        assert overlay["b.c"] == "2"
+        assert sorted(overlay.keys()) == ["a", "b.c"]
+
+    def test_writes_do_not_modify_the_base(self) -> None:
+        """Test that set and deleted keys stay in the overlay."""
+        base = libioc.Config.Data.Data(dict(a="1", b=dict(c="2", d="3")))
+        overlay = libioc.Config.Data.OverlayData(base)
+        overlay["a"] = "changed"
+        overlay["b.e"] = "4"
+        del overlay["b.c"]
+        assert overlay["a"] == "changed"
+        assert overlay["b.d"] == "3"
+        assert ("b.c" in overlay) is False
+        assert sorted(overlay.keys()) == ["a", "b.d", "b.e"]
+        assert overlay.nested == dict(a="changed", b=dict(d="3", e="4"))
+        assert base.nested == dict(a="1", b=dict(c="2", d="3"))
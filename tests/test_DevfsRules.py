@@ -0,0 +1,246 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the DevfsRules module."""
+import typing
+import pathlib
+
+import libioc.DevfsRules
+import libioc.Host
+import libioc.Jails
+import libioc.Logger
+
+_DEFAULT_RULES = """
+[devfsrules_hide_all=1]
+add hide
+
+[devfsrules_unhide_basic=2]
+add path null unhide
+add path zero unhide
+
+[devfsrules_jail=4]
+add include $devfsrules_hide_all
+add include $devfsrules_unhide_basic
+"""
+
+
+class _DevfsRules(libioc.DevfsRules.DevfsRules):
+
+    _default_rules_file: str
+
+    @property
+    def default_rules_file(self) -> str:
+        return self._default_rules_file
+
+
+def _devfs_rules(
+    tmp_path: pathlib.Path,
+    logger: 'libioc.Logger.Logger'
+) -> libioc.DevfsRules.DevfsRules:
+    default_rules_file = tmp_path / "defaults.rules"
+    default_rules_file.write_text(_DEFAULT_RULES)
+    rules_file = tmp_path / "devfs.rules"
+    rules_file.write_text("")
+    _DevfsRules._default_rules_file = str(default_rules_file)
+    return _DevfsRules(rules_file=str(rules_file), logger=logger)
+
+
+def _jail_ruleset() -> libioc.DevfsRules.DevfsRuleset:
+    ruleset = libioc.DevfsRules.DevfsRuleset()
+    ruleset.append("add include $devfsrules_hide_all")
+    ruleset.append("add include $devfsrules_unhide_basic")
+    return ruleset
+
+
+class _JailStub(object):
+    """Create a devfs ruleset when started, like Jail.devfs_ruleset."""
+
+    def __init__(
+        self,
+        host: typing.Any,
+        rule: str,
+        priority: int,
+        rules_file: pathlib.Path
+    ) -> None:
+        self.host = host
+        self.rule = rule
+        self.config = dict(priority=priority, depends=[])
+        self.running = False
+        self.rules_file = rules_file
+        self.rules_file_content: typing.Optional[str] = None
+
+    def start(
+        self,
+        **kwargs: typing.Any
+    ) -> typing.Generator[str, None, None]:
+        ruleset = _jail_ruleset()
+        ruleset.append(self.rule)
+        self.host.devfs.new_ruleset(ruleset)
+        self.host.devfs.save(restart_service=False)
+        self.rules_file_content = self.rules_file.read_text()
+        self.running = True
+        yield self.rule
+
+    def _get_hook_command(self, hook: str, **kwargs: typing.Any) -> None:
+        return None
+
+    def run_hook(
+        self,
+        hook: str,
+        **kwargs: typing.Any
+    ) -> typing.Generator[str, None, None]:
+        yield from ()
+
+
+class TestDevfsRules(object):
+    """Run tests for the devfs.rules index and installation."""
+
+    def test_find_ruleset_by_rules(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that rulesets are found by their rules."""
+        devfs = _devfs_rules(tmp_path, logger)
+        ruleset = _jail_ruleset()
+
+        assert ruleset in devfs
+        assert devfs.find_by_rules(ruleset).number == 4
+
+        ruleset.append("add path 'bpf*' unhide")
+        assert ruleset not in devfs
+
+    def test_new_ruleset_is_indexed(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that a new ruleset can be found immediately."""
+        devfs = _devfs_rules(tmp_path, logger)
+        ruleset = _jail_ruleset()
+        ruleset.append("add path 'bpf*' unhide")
+        # build the content index before the ruleset is added
+        devfs.find_by_rules(_jail_ruleset())
+
+        number = devfs.new_ruleset(ruleset)
+
+        assert number == 5
+        assert devfs.find_by_rules(ruleset).name == "iocage_auto_5"
+
+    def test_install_ruleset_without_restart(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that rulesets are installed live in one shell call."""
+        exec_mock = mocker.patch(
+            "libioc.helpers.exec",
+            return_value=("", "", 0)
+        )
+        devfs = _devfs_rules(tmp_path, logger)
+        ruleset = _jail_ruleset()
+        ruleset.append("add path 'bpf*' unhide")
+        devfs.new_ruleset(ruleset)
+
+        devfs.install_ruleset(ruleset)
+
+        assert exec_mock.call_count == 1
+        command = exec_mock.call_args[0][0]
+        assert command[:3] == ["/bin/sh", "-e", "-c"]
+        script = command[3].splitlines()
+        assert "devfsrules_hide_all=1" in script
+        assert script[-4:] == [
+            "/sbin/devfs rule -s 5 delset",
+            "/sbin/devfs rule -s 5 add include $devfsrules_hide_all",
+            "/sbin/devfs rule -s 5 add include $devfsrules_unhide_basic",
+            "/sbin/devfs rule -s 5 add path 'bpf*' unhide"
+        ]
+
+    def test_deferred_save_writes_once(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that deferred changes are written in one flush."""
+        exec_mock = mocker.patch(
+            "libioc.helpers.exec",
+            return_value=("", "", 0)
+        )
+        devfs = _devfs_rules(tmp_path, logger)
+        devfs.defer_save()
+        for rule in ["add path bpf0 unhide", "add path vmm unhide"]:
+            ruleset = _jail_ruleset()
+            ruleset.append(rule)
+            devfs.new_ruleset(ruleset)
+            devfs.save(restart_service=False)
+
+        rules_file = tmp_path / "devfs.rules"
+        assert rules_file.read_text() == ""
+
+        devfs.flush()
+
+        content = rules_file.read_text()
+        assert "[iocage_auto_5=5]" in content
+        assert "[iocage_auto_6=6]" in content
+        assert exec_mock.call_count == 0
+
+    def test_batch_start_writes_once(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that starting many jails writes devfs.rules once."""
+        host = mocker.Mock(spec=libioc.Host.HostGenerator)
+        host.datasets = mocker.Mock()
+        host.devfs = _devfs_rules(tmp_path, logger)
+        rules_file = tmp_path / "devfs.rules"
+        jails = [
+            _JailStub(host, f"add path bpf{i} unhide", 3 - i, rules_file)
+            for i in range(3)
+        ]
+        mocker.patch(
+            "libioc.helpers_object.init_zfs",
+            return_value=mocker.Mock()
+        )
+        mocker.patch.object(
+            libioc.Jails.JailsGenerator,
+            "__iter__",
+            side_effect=lambda: iter(jails)
+        )
+        save_spy = mocker.spy(host.devfs, "save")
+
+        events = list(libioc.Jails.JailsGenerator(
+            host=host,
+            logger=logger
+        ).start())
+
+        # jails start in the order of their priority
+        assert events == [f"add path bpf{i} unhide" for i in (2, 1, 0)]
+        assert [x.rules_file_content for x in jails] == ["", "", ""]
+        assert save_spy.call_count == 4
+        content = rules_file.read_text()
+        for number in (5, 6, 7):
+            assert f"[iocage_auto_{number}={number}]" in content
@@ -23,11 +23,13 @@
 # POSSIBILITY OF SUCH DAMAGE.
 """Unit tests for the Distribution module."""
 import typing
+import pathlib
 import unittest.mock
 
 import libioc.Distribution
 import libioc.Host
 import libioc.Logger
+import libioc.MetadataCache
 import libioc.ZFS
 
 
@@ -37,10 +39,16 @@ class TestEOLList(object):
     def test_failed_eol_download_warns_instead_of_crashing(
         self,
         logger: 'libioc.Logger.Logger',
-        mocker: typing.Any
+        mocker: typing.Any,
+        tmp_path: pathlib.Path
     ) -> None:
+        host = unittest.mock.Mock(spec=libioc.Host.HostGenerator)
+        host.metadata_cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
         distribution = libioc.Distribution.Distribution(
-            host=unittest.mock.Mock(spec=libioc.Host.HostGenerator),
+            host=host,
             zfs=unittest.mock.Mock(spec=libioc.ZFS.ZFS),
             logger=logger
         )
@@ -53,3 +61,39 @@ class TestEOLList(object):
 
         assert distribution._query_eol_list() == []
         assert warn.call_count == 1
+
+
+class TestProbeAvailability(object):
+    """Run tests for the concurrent release availability probing."""
+
+    def test_releases_are_mapped_to_their_availability(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if the probed status codes are mapped to release names."""
+        host = unittest.mock.Mock(spec=libioc.Host.HostGenerator)
+        host.metadata_cache = unittest.mock.Mock(
+            spec=libioc.MetadataCache.MetadataCache
+        )
+        host.metadata_cache.statuses.return_value = {
+            "https://mirror/13.5-RELEASE": 200,
+            "https://mirror/14.0-RELEASE": 404,
+            "https://mirror/14.3-RELEASE": None
+        }
+        distribution = libioc.Distribution.Distribution(
+            host=host,
+            zfs=unittest.mock.Mock(spec=libioc.ZFS.ZFS),
+            logger=logger
+        )
+        releases = []
+        for name in ["13.5-RELEASE", "14.0-RELEASE", "14.3-RELEASE"]:
+            release = unittest.mock.Mock(remote_url=f"https://mirror/{name}")
+            release.name = name
+            releases.append(release)
+
+        assert distribution.probe_availability(releases) == {
+            "13.5-RELEASE": True,
+            "14.0-RELEASE": False,
+            "14.3-RELEASE": False
+        }
+        assert host.metadata_cache.statuses.call_count == 1
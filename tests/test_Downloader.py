@@ -0,0 +1,224 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the concurrent release asset downloader."""
+import typing
+import http.server
+import os
+import pathlib
+import threading
+import urllib.parse
+
+import pytest
+
+import libioc.Downloader
+import libioc.errors
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serve in-memory files with keep-alive and Range support."""
+
+    protocol_version = "HTTP/1.1"
+    files: typing.Dict[str, bytes] = {}
+    # paths whose next response is cut off after half of the content
+    interrupt: typing.Set[str] = set()
+    connections: typing.List[str] = []
+    ranges: typing.List[typing.Optional[str]] = []
+    # request targets as received, absolute when sent to a proxy
+    targets: typing.List[str] = []
+
+    def setup(self) -> None:
+        """Count the incoming connections."""
+        super().setup()
+        self.connections.append(str(self.client_address))
+
+    def log_message(self, *args: typing.Any) -> None:
+        """Keep the test output clean."""
+        pass
+
+    def do_GET(self) -> None:
+        """Serve a file or its requested range."""
+        self.targets.append(self.path)
+        path = urllib.parse.urlsplit(self.path).path
+        content = self.files.get(path)
+        if content is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        self.ranges.append(range_header)
+        offset = 0
+        if range_header is not None:
+            offset = int(range_header[len("bytes="):].rstrip("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {offset}-{len(content) - 1}/{len(content)}"
+            )
+        else:
+            self.send_response(200)
+        body = content[offset:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if path in self.interrupt:
+            self.interrupt.discard(path)
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def mirror() -> typing.Iterator[str]:
+    """Run a local HTTP mirror in a background thread."""
+    RangeHandler.files = {
+        "/base.txz": os.urandom(300000),
+        "/lib32.txz": os.urandom(200000),
+        "/src.txz": os.urandom(100000)
+    }
+    RangeHandler.interrupt = set()
+    RangeHandler.connections = []
+    RangeHandler.ranges = []
+    RangeHandler.targets = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs=dict(poll_interval=0.05),
+        daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _downloader(
+    logger: 'libioc.Logger.Logger'
+) -> libioc.Downloader.Downloader:
+    downloader = libioc.Downloader.Downloader(concurrency=2, logger=logger)
+    downloader.chunk_size = 16384
+    downloader.retry_delay = 0
+    return downloader
+
+
+class TestDownloader(object):
+    """Run tests for the concurrent downloader."""
+
+    def test_concurrent_downloads_reuse_connections(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if all files are downloaded over two connections."""
+        jobs = [
+            libioc.Downloader.DownloadJob(
+                url=f"{mirror}{name}",
+                path=str(tmp_path / name.lstrip("/"))
+            )
+            for name in RangeHandler.files.keys()
+        ]
+        progress = list(_downloader(logger).download(jobs))
+
+        for job in jobs:
+            name = "/" + os.path.basename(job.path)
+            assert pathlib.Path(job.path).read_bytes() \
+                == RangeHandler.files[name]
+            assert job.done is True
+            assert os.path.exists(job.part_path) is False
+        assert len(progress) > len(jobs)
+        assert len(RangeHandler.connections) == 2
+
+    def test_resume_partial_file(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if an existing .part file is continued with a Range."""
+        job = libioc.Downloader.DownloadJob(
+            url=f"{mirror}/base.txz",
+            path=str(tmp_path / "base.txz")
+        )
+        content = RangeHandler.files["/base.txz"]
+        pathlib.Path(job.part_path).write_bytes(content[:1000])
+
+        _downloader(logger).download_job(job)
+
+        assert RangeHandler.ranges == ["bytes=1000-"]
+        assert pathlib.Path(job.path).read_bytes() == content
+
+    def test_interrupted_transfer_is_resumed(
+        self,
+        mirror: str,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if a cut off stream continues where it was interrupted."""
+        RangeHandler.interrupt.add("/lib32.txz")
+        downloader = _downloader(logger)
+        content = b"".join(downloader.stream(f"{mirror}/lib32.txz"))
+        downloader.close()
+        assert content == RangeHandler.files["/lib32.txz"]
+        assert RangeHandler.ranges[0] is None
+        assert RangeHandler.ranges[1] == "bytes=100000-"
+
+    def test_missing_file_fails(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if HTTP errors raise DownloadFailed."""
+        job = libioc.Downloader.DownloadJob(
+            url=f"{mirror}/missing.txz",
+            path=str(tmp_path / "missing.txz")
+        )
+        with pytest.raises(libioc.errors.DownloadFailed):
+            list(_downloader(logger).download([job]))
+        assert os.path.exists(job.path) is False
+
+    def test_proxy_from_environment(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test if HTTP downloads are sent to the configured proxy."""
+        monkeypatch.setenv("http_proxy", mirror)
+        monkeypatch.delenv("no_proxy", raising=False)
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        job = libioc.Downloader.DownloadJob(
+            url="http://mirror.invalid/src.txz",
+            path=str(tmp_path / "src.txz")
+        )
+        list(_downloader(logger).download([job]))
+        assert pathlib.Path(job.path).read_bytes() \
+            == RangeHandler.files["/src.txz"]
+        assert RangeHandler.targets == ["http://mirror.invalid/src.txz"]
+
+        monkeypatch.setenv("no_proxy", "mirror.invalid")
+        assert libioc.Downloader.get_proxy("http", "mirror.invalid") is None
@@ -0,0 +1,140 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the persistent exec channel."""
+import typing
+import os
+import time
+
+import pytest
+
+import libioc.errors
+import libioc.ExecChannel
+
+
+@pytest.fixture
+def pool(
+    logger: 'libioc.Logger.Logger'
+) -> typing.Iterator[libioc.ExecChannel.ExecChannelPool]:
+    """Provide an empty exec channel pool."""
+    pool = libioc.ExecChannel.ExecChannelPool(logger=logger)
+    pool.close()
+    yield pool
+    pool.close()
+
+
+class TestExecChannel(object):
+    """Run tests for exec channels on the host."""
+
+    def test_channel_returns_output_and_exit_code(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that commands run through one helper process."""
+        channel = libioc.ExecChannel.ExecChannel(None, logger=logger)
+        try:
+            first = channel.exec(["/bin/sh", "-c", "echo $PPID"])
+            second = channel.exec(
+                ["/bin/sh", "-c", "echo $FOO >&2; exit 3"],
+                env=dict(FOO="bar")
+            )
+            assert first == (str(channel.pid), "", 0)
+            assert second == ("", "bar", 3)
+        finally:
+            channel.close()
+        assert channel.alive is False
+
+    def test_dead_helper_is_reported(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that a killed helper process raises ExecChannelFailed."""
+        channel = libioc.ExecChannel.ExecChannel(None, logger=logger)
+        channel.open()
+        os.kill(channel.pid, 9)
+
+        with pytest.raises(libioc.errors.ExecChannelFailed):
+            channel.exec(["/usr/bin/true"])
+
+
+class TestExecChannelPool(object):
+    """Run tests for the exec channel pool."""
+
+    def test_channels_are_reused(
+        self,
+        pool: libioc.ExecChannel.ExecChannelPool
+    ) -> None:
+        """Test that consecutive commands share a helper process."""
+        pids = set([
+            pool.exec(None, ["/bin/sh", "-c", "echo $PPID"])[0]
+            for _ in range(3)
+        ])
+        assert len(pids) == 1
+
+    def test_dead_channels_are_replaced(
+        self,
+        pool: libioc.ExecChannel.ExecChannelPool
+    ) -> None:
+        """Test that a helper killed with its jail is not reused."""
+        first_pid = pool.exec(None, ["/bin/sh", "-c", "echo $PPID"])[0]
+        os.kill(int(str(first_pid)), 9)
+        # give the kernel time to turn the helper into a zombie
+        time.sleep(0.5)
+
+        second_pid = pool.exec(None, ["/bin/sh", "-c", "echo $PPID"])[0]
+        assert second_pid != first_pid
+
+    def test_idle_channels_are_closed(
+        self,
+        pool: libioc.ExecChannel.ExecChannelPool,
+        mocker: typing.Any
+    ) -> None:
+        """Test that channels exceeding the idle timeout are stopped."""
+        channel = pool.acquire(None)
+        pool.release(channel)
+        mocker.patch.object(pool, "idle_timeout", -1)
+
+        pool.close_idle()
+
+        assert channel.alive is False
+
+    def test_dead_idle_channels_are_reaped(
+        self,
+        pool: libioc.ExecChannel.ExecChannelPool
+    ) -> None:
+        """Test that helpers of vanished jails are waited for when idle."""
+        channel = pool.acquire(None)
+        pool.release(channel)
+        pid = channel.pid
+        os.kill(pid, 9)
+        # give the kernel time to turn the helper into a zombie
+        time.sleep(0.5)
+
+        pool.close_idle()
+
+        assert channel.pid is None
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
+        replacement = pool.acquire(None)
+        pool.release(replacement)
+        assert replacement is not channel
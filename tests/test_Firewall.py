@@ -0,0 +1,124 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the Firewall module."""
+import typing
+
+import pytest
+
+import libioc.errors
+import libioc.Firewall
+import libioc.Logger
+
+
+class TestFirewallTransaction(object):
+    """Run tests for batched firewall rule changes."""
+
+    def _mock_ipfw(
+        self,
+        mocker: typing.Any,
+        listing: str
+    ) -> typing.Tuple[typing.Any, typing.List[str]]:
+        batches: typing.List[str] = []
+
+        def _exec(
+            command: typing.List[str],
+            **kwargs: typing.Any
+        ) -> typing.Tuple[str, str, int]:
+            if command[1] == "list":
+                return listing, "", 0
+            with open(command[-1], "r", encoding="UTF-8") as f:
+                batches.append(f.read())
+            return "", "", 0
+
+        exec_mock = mocker.patch("libioc.helpers.exec", side_effect=_exec)
+        return exec_mock, batches
+
+    def test_rules_are_applied_in_one_ipfw_call(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that queued rules are written to a single batch file."""
+        exec_mock, batches = self._mock_ipfw(mocker, "\n".join([
+            "10005 allow ip4 from 10.0.0.2 to any",
+            "10005 deny log ip4 from any to any"
+        ]))
+        transaction = libioc.Firewall.Firewall(logger=logger).transaction()
+        transaction.delete_rule(5)
+        transaction.add_rule(5, ["allow", "ip4", "from", "10.0.0.2"])
+        transaction.add_rule(5, ["deny", "log", "ip4"])
+        assert len(transaction) == 3
+
+        transaction.commit()
+
+        assert exec_mock.call_count == 2
+        assert batches == [
+            "delete 10005\n"
+            "add 10005 allow ip4 from 10.0.0.2\n"
+            "add 10005 deny log ip4\n"
+        ]
+        assert exec_mock.call_args_list[1][0][0] == [
+            "/sbin/ipfw", "list", "10005"
+        ]
+        assert len(transaction) == 0
+
+    def test_verification_detects_missing_rules(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that missing rules in the listing raise."""
+        self._mock_ipfw(mocker, "10005 allow ip4 from 10.0.0.2 to any")
+        transaction = libioc.Firewall.Firewall(logger=logger).transaction()
+        transaction.add_rule(5, ["allow", "ip4", "from", "10.0.0.2"])
+        transaction.add_rule(5, ["deny", "log", "ip4"])
+
+        with pytest.raises(libioc.errors.FirewallCommandFailure):
+            transaction.commit()
+
+    def test_deletions_skip_the_verification(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that a delete-only batch does not list the ruleset."""
+        exec_mock, batches = self._mock_ipfw(mocker, "")
+        transaction = libioc.Firewall.Firewall(logger=logger).transaction()
+        transaction.delete_rule(5)
+        transaction.delete_rule(6)
+
+        transaction.commit()
+
+        assert exec_mock.call_count == 1
+        assert batches == ["delete 10005\ndelete 10006\n"]
+
+    def test_empty_transaction_is_a_noop(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that committing nothing does not execute ipfw."""
+        exec_mock, _ = self._mock_ipfw(mocker, "")
+        libioc.Firewall.Firewall(logger=logger).transaction().commit()
+        assert exec_mock.call_count == 0
@@ -0,0 +1,397 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the asynchronous hook runner."""
+import typing
+import pathlib
+import time
+
+import pytest
+
+import libioc.errors
+import libioc.events
+import libioc.HookRunner
+import libioc.Host
+import libioc.Jail
+import libioc.Jails
+
+
+def _consume(
+    stream: typing.Generator[
+        libioc.HookRunner.HookOutputLine,
+        None,
+        typing.Any
+    ]
+) -> typing.Tuple[typing.List[libioc.HookRunner.HookOutputLine], typing.Any]:
+    lines = []
+    try:
+        while True:
+            lines.append(next(stream))
+    except StopIteration as return_statement:
+        return lines, return_statement.value
+
+
+class TestHookRunner(object):
+    """Run tests for the asynchronous hook runner."""
+
+    def test_output_is_streamed_into_the_log_file(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that stdout and stderr lines are yielded and logged."""
+        log_file = libioc.HookRunner.HookLogFile(str(tmp_path / "jail.log"))
+        runner = libioc.HookRunner.HookRunner(logger=logger)
+
+        lines, output = _consume(runner.stream(libioc.HookRunner.HookCommand(
+            command=["/bin/sh", "-c", "echo one; echo two >&2; exit 3"],
+            hook="prestart",
+            log_file=log_file
+        )))
+
+        assert sorted(lines) == [("stderr", "two"), ("stdout", "one")]
+        assert output == ("one", "two", 3)
+        log_content = (tmp_path / "jail.log").read_text()
+        assert "prestart stdout: one" in log_content
+        assert "prestart stderr: two" in log_content
+
+    def test_only_the_output_tail_is_kept(
+        self,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that verbose hooks are not held in memory in full."""
+        log_file = libioc.HookRunner.HookLogFile(str(tmp_path / "jail.log"))
+        runner = libioc.HookRunner.HookRunner(logger=logger)
+        runner.output_tail_lines = 3
+
+        lines, output = _consume(runner.stream(libioc.HookRunner.HookCommand(
+            command=["/bin/sh", "-c", "for i in 1 2 3 4 5; do echo $i; done"],
+            hook="prestart",
+            log_file=log_file
+        )))
+
+        assert len(lines) == 5
+        assert output == ("3\n4\n5", "", 0)
+        assert "prestart stdout: 1" in (tmp_path / "jail.log").read_text()
+
+    def test_timeout_kills_the_hook(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that hooks exceeding their timeout raise CommandTimeout."""
+        runner = libioc.HookRunner.HookRunner(logger=logger)
+        started_at = time.monotonic()
+
+        with pytest.raises(libioc.errors.CommandTimeout):
+            _consume(runner.stream(libioc.HookRunner.HookCommand(
+                command=["/bin/sh", "-c", "echo started; sleep 10"],
+                hook="poststart",
+                timeout=0.5
+            )))
+
+        assert time.monotonic() - started_at < 5
+
+    def test_background_processes_do_not_block_the_hook(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that a daemon holding the output pipe does not stall."""
+        runner = libioc.HookRunner.HookRunner(logger=logger)
+        started_at = time.monotonic()
+
+        _, output = _consume(runner.stream(libioc.HookRunner.HookCommand(
+            command=["/bin/sh", "-c", "(sleep 10 &); echo started"],
+            hook="start"
+        )))
+
+        assert output == ("started", "", 0)
+        assert time.monotonic() - started_at < 5
+
+    def test_hooks_of_independent_jails_run_concurrently(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that run() does not serialize the hooks."""
+        runner = libioc.HookRunner.HookRunner(logger=logger)
+        started_at = time.monotonic()
+
+        results = runner.run([
+            libioc.HookRunner.HookCommand(
+                command=["/bin/sh", "-c", f"sleep 1; echo {i}"],
+                hook="start"
+            ) for i in range(4)
+        ] + [
+            libioc.HookRunner.HookCommand(
+                command=["/bin/sh", "-c", "sleep 10"],
+                hook="start",
+                timeout=0.5
+            )
+        ])
+
+        assert time.monotonic() - started_at < 3
+        assert results[:4] == [(str(i), "", 0) for i in range(4)]
+        assert isinstance(results[4], libioc.errors.CommandTimeout)
+
+    def test_log_file_is_rotated(self, tmp_path: pathlib.Path) -> None:
+        """Test that the log file keeps a limited number of backups."""
+        log_path = tmp_path / "jail.log"
+        log_file = libioc.HookRunner.HookLogFile(
+            str(log_path),
+            max_bytes=64,
+            backup_count=2
+        )
+        for i in range(10):
+            log_file.write("start", "stdout", f"line {i} " + "x" * 32)
+        log_file.close()
+
+        assert sorted(x.name for x in tmp_path.iterdir()) == [
+            "jail.log",
+            "jail.log.1",
+            "jail.log.2"
+        ]
+        assert "line 9" in (tmp_path / "jail.log.1").read_text()
+
+
+class _JailStub(object):
+    """Record the hooks a batch start hands over to a jail."""
+
+    def __init__(
+        self,
+        name: str,
+        logger: 'libioc.Logger.Logger',
+        poststart: str="sleep 1",
+        depends: typing.Optional[typing.List[str]]=None,
+        priority: int=1
+    ) -> None:
+        self.name = name
+        self.full_name = name
+        self.logger = logger
+        self.host = None
+        self.hooks = dict(
+            prestart=f"sleep 1; echo {name}",
+            poststart=poststart
+        )
+        self.config = dict(priority=priority, depends=depends or [])
+        self.running = False
+        self.prestart_hook_result: typing.Any = None
+        self.poststart_hook_result: typing.Any = None
+        self.deferred_poststart: typing.Optional[bool] = None
+        self.stopped = False
+
+    def _get_hook_command(
+        self,
+        hook: str,
+        script: typing.Optional[str]=None,
+        env: typing.Dict[str, str]={}
+    ) -> libioc.HookRunner.HookCommand:
+        return libioc.HookRunner.HookCommand(
+            command=["/bin/sh", "-c", self.hooks[hook]],
+            hook=hook
+        )
+
+    def start(
+        self,
+        prestart_hook_result: typing.Any=None,
+        defer_poststart_hook: bool=False,
+        **kwargs: typing.Any
+    ) -> typing.Generator[str, None, None]:
+        self.prestart_hook_result = prestart_hook_result
+        self.deferred_poststart = defer_poststart_hook
+        self.running = True
+        yield f"{self.name} started"
+
+    def run_hook(
+        self,
+        hook: str,
+        hook_result: typing.Any=None,
+        **kwargs: typing.Any
+    ) -> typing.Generator[str, None, None]:
+        self.poststart_hook_result = hook_result
+        if hook_result[2] > 0:
+            raise libioc.errors.JailHookFailed(
+                jail=typing.cast('libioc.Jail.JailGenerator', self),
+                hook=hook
+            )
+        yield f"{self.name} {hook}"
+
+    def stop(self, **kwargs: typing.Any) -> typing.Generator[str, None, None]:
+        self.stopped = True
+        self.running = False
+        yield f"{self.name} stopped"
+
+
+def _start_batch(
+    jails: typing.List[_JailStub],
+    logger: 'libioc.Logger.Logger',
+    mocker: typing.Any
+) -> typing.Generator[typing.Any, None, None]:
+    host = mocker.Mock(spec=libioc.Host.HostGenerator)
+    host.datasets = mocker.Mock()
+    for jail in jails:
+        jail.host = host
+    mocker.patch(
+        "libioc.helpers_object.init_zfs",
+        return_value=mocker.Mock()
+    )
+    mocker.patch.object(
+        libioc.Jails.JailsGenerator,
+        "__iter__",
+        side_effect=lambda: iter(jails)
+    )
+    return libioc.Jails.JailsGenerator(host=host, logger=logger).start()
+
+
+class TestBatchStartHooks(object):
+    """Run tests for the hooks of jails started in a batch."""
+
+    def test_hooks_of_independent_jails_run_together(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that prestart and poststart hooks run concurrently."""
+        jails = [_JailStub(f"jail{i}", logger) for i in range(3)]
+        started_at = time.monotonic()
+
+        events = list(_start_batch(jails, logger, mocker))
+
+        # two hooks of one second each for three jails
+        assert time.monotonic() - started_at < 4
+        assert events == [f"jail{i} started" for i in range(3)] \
+            + [f"jail{i} poststart" for i in range(3)]
+        for i, jail in enumerate(jails):
+            assert jail.prestart_hook_result == (f"jail{i}", "", 0)
+            assert jail.poststart_hook_result == ("", "", 0)
+            assert jail.deferred_poststart is True
+
+    def test_failing_poststart_stops_only_its_jail(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that the other jails keep running and the error is raised."""
+        jails = [
+            _JailStub("jail0", logger, poststart="exit 1"),
+            _JailStub("jail1", logger),
+            _JailStub("jail2", logger, depends=["name=jail1"])
+        ]
+
+        events = []
+        with pytest.raises(libioc.errors.JailHookFailed):
+            for event in _start_batch(jails, logger, mocker):
+                events.append(event)
+
+        assert events == [
+            "jail0 started",
+            "jail1 started",
+            "jail0 stopped",
+            "jail1 poststart",
+            "jail2 started"
+        ]
+        assert [x.running for x in jails] == [False, True, True]
+        # jails with dependencies run their hooks when they are started
+        assert jails[2].deferred_poststart is False
+        assert jails[2].prestart_hook_result is None
+
+    def test_priorities_are_started_in_order(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that each priority is started after the previous one."""
+        jails = [
+            _JailStub("late", logger, poststart="true", priority=3),
+            _JailStub("early0", logger, poststart="true", priority=1),
+            _JailStub("early1", logger, poststart="true", priority=1),
+            _JailStub(
+                "dependent",
+                logger,
+                poststart="true",
+                depends=["name=early0"],
+                priority=2
+            )
+        ]
+
+        events = list(_start_batch(jails, logger, mocker))
+
+        assert events == [
+            "early0 started",
+            "early1 started",
+            "early0 poststart",
+            "early1 poststart",
+            "dependent started",
+            "late started",
+            "late poststart"
+        ]
+
+
+class TestJailHookEvents(object):
+    """Run tests for the events of jail hooks."""
+
+    def test_output_event_is_stepped_for_each_line(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that hook output is reported by one begun and ended event."""
+        jail = _JailStub("jail0", logger)
+        stream = libioc.Jail.JailGenerator._JailGenerator__stream_hook(
+            jail,
+            jail._get_hook_command("prestart"),
+            event_scope=None
+        )
+
+        states, output = [], None
+        try:
+            while True:
+                event = next(stream)
+                states.append((event.get_state_string(), event.line,))
+        except StopIteration as return_statement:
+            output = return_statement.value
+
+        assert states == [
+            ("pending", None,),
+            ("pending", "jail0",),
+            ("done", "jail0",)
+        ]
+        assert output == ("jail0", "", 0)
+
+    def test_interrupts_are_not_converted(
+        self,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test that KeyboardInterrupt is not mapped to JailHookFailed."""
+        jail = _JailStub("jail0", logger)
+        events = []
+        with pytest.raises(KeyboardInterrupt):
+            for event in libioc.Jail.JailGenerator._JailGenerator__run_hook(
+                jail,
+                "prestart",
+                force=False,
+                event_scope=None,
+                hook_result=KeyboardInterrupt()
+            ):
+                events.append(event)
+
+        assert isinstance(events[-1], libioc.events.JailHookPrestart)
+        assert events[-1].get_state_string() == "failed"
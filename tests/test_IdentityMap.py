@@ -0,0 +1,77 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the resource identity map."""
+import gc
+
+import libioc.IdentityMap
+
+
+class Resource(object):
+    """Minimal weakly referencable resource."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class TestIdentityMap(object):
+    """Run tests for the resource identity map."""
+
+    def test_returns_shared_instance(self) -> None:
+        """Test if a resource is created once per key."""
+        identity_map = libioc.IdentityMap.IdentityMap()
+        created = []
+
+        def factory() -> Resource:
+            resource = Resource("a")
+            created.append(resource)
+            return resource
+
+        first = identity_map.get_or_create("test", Resource, "a", factory)
+        second = identity_map.get_or_create("test", Resource, "a", factory)
+        other_source = identity_map.get_or_create(None, Resource, "a", factory)
+        assert first is second
+        assert first is not other_source
+        assert len(created) == 2
+
+    def test_unreferenced_instances_are_released(self) -> None:
+        """Test if the map does not keep resources alive."""
+        identity_map = libioc.IdentityMap.IdentityMap()
+        identity_map.get_or_create(
+            "test", Resource, "a", lambda: Resource("a")
+        )
+        gc.collect()
+        assert identity_map.get("test", Resource, "a") is None
+        assert len(identity_map) == 0
+
+    def test_discard(self) -> None:
+        """Test if discarded resources are created again."""
+        identity_map = libioc.IdentityMap.IdentityMap()
+        first = identity_map.get_or_create(
+            "test", Resource, "a", lambda: Resource("a")
+        )
+        identity_map.discard(first)
+        second = identity_map.get_or_create(
+            "test", Resource, "a", lambda: Resource("a")
+        )
+        assert first is not second
@@ -321,6 +321,45 @@ class TestNullFSBasejail(object):
         ).decode("utf-8")
         assert str(target_mountpoint) not in stdout
 
+    def test_quick_restart_rebuilds_only_changed_mounts(
+        self,
+        tmp_path: pathlib.Path,
+        existing_jail: 'libioc.Jail.Jail',
+        basedirs: typing.List[str]
+    ) -> None:
+        """Test if a quick restart keeps the basejail and remounts fstab."""
+        existing_jail.config["basejail"] = True
+        existing_jail.save()
+        existing_jail.start()
+
+        existing_jail.fstab.new_line(
+            source=str(tmp_path),
+            destination=str(tmp_path),
+            type="nullfs"
+        )
+        existing_jail.fstab.save()
+        target_mountpoint = existing_jail.root_path + str(tmp_path)
+        os.makedirs(target_mountpoint)
+
+        events = list(existing_jail.restart(shutdown=True, quick=True))
+        assert existing_jail.running is True
+
+        unchanged = [
+            type(x) for x in events
+            if (x.skipped is True) and (x.message == "unchanged")
+        ]
+        assert libioc.events.BasejailStorageConfig in unchanged
+        assert libioc.events.MountFstab not in unchanged
+
+        stdout = subprocess.check_output(["/sbin/mount"]).decode("utf-8")
+        assert str(target_mountpoint) in stdout
+        root_path = existing_jail.root_dataset.mountpoint
+        for basedir in basedirs:
+            assert f"{root_path}/{basedir}" in stdout
+
+        existing_jail.stop()
+        assert os.path.exists(existing_jail._applied_state_file) is False
+
     def test_getstring_returns_empty_string_for_unknown_user_properties(
         self,
         new_jail: 'libioc.Jail.Jail'
@@ -0,0 +1,166 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the jail parameter schema cache."""
+import typing
+import json
+import pathlib
+import unittest.mock
+
+import pytest
+import freebsd_sysctl.types
+
+import libioc.JailParams
+
+_KERNEL = {
+    "kern.ident": "GENERIC",
+    "kern.osreldate": "1400097",
+    "kern.version": "FreeBSD 14.0-RELEASE"
+}
+
+_SCHEMA = [
+    dict(
+        name="security.jail.param.allow.mount.",
+        oid=[1, 2, 3],
+        kind=0x80000001,
+        fmt=b"N".hex()
+    ),
+    dict(
+        name="security.jail.param.enforce_statfs",
+        oid=[1, 2, 4],
+        kind=0x80000002,
+        fmt=b"I".hex()
+    ),
+    dict(
+        name="security.jail.param.host.hostname",
+        oid=[1, 2, 5],
+        kind=0x80000003,
+        fmt=b"A".hex()
+    )
+]
+
+
+class _Config:
+
+    known_properties = ["allow_mount", "host_hostname"]
+
+    def is_known_property(self, key: str, explicit: bool) -> bool:
+        return key in self.known_properties
+
+
+@pytest.fixture
+def cache_file(
+    tmp_path: pathlib.Path,
+    mocker: typing.Any
+) -> typing.Iterator[pathlib.Path]:
+    """Point the jail param cache to a file with a known schema."""
+    cache_file = tmp_path / "jail_params.json"
+    mocker.patch.object(
+        libioc.JailParams.JailParams,
+        "cache_file",
+        str(cache_file)
+    )
+    mocker.patch.object(
+        libioc.JailParams.JailParams,
+        "_kernel_schema_key",
+        new_callable=unittest.mock.PropertyMock,
+        return_value=_KERNEL
+    )
+    libioc.JailParams.JailParams().invalidate_cache()
+    cache_file.write_text(json.dumps(dict(kernel=_KERNEL, params=_SCHEMA)))
+    yield cache_file
+    libioc.JailParams.JailParams().invalidate_cache()
+
+
+class TestJailParamsCache(object):
+    """Run tests for the persistent jail param schema."""
+
+    def test_schema_is_read_from_the_cache(
+        self,
+        cache_file: pathlib.Path
+    ) -> None:
+        """Test that cached params restore names and types."""
+        jail_params = libioc.JailParams.JailParams()
+
+        assert list(jail_params.keys()) == [
+            "security.jail.param.allow.mount",
+            "security.jail.param.enforce_statfs",
+            "security.jail.param.host.hostname"
+        ]
+        hostname = jail_params["security.jail.param.host.hostname"]
+        assert hostname.ctl_type == freebsd_sysctl.types.STRING
+        assert hostname.iocage_name == "host_hostname"
+        assert hostname.schema == _SCHEMA[2]
+
+    def test_kernel_mismatch_ignores_the_cache(
+        self,
+        cache_file: pathlib.Path,
+        mocker: typing.Any
+    ) -> None:
+        """Test that a cache of another kernel is not used."""
+        cache_file.write_text(json.dumps(dict(
+            kernel=dict(_KERNEL, **{"kern.osreldate": "1300139"}),
+            params=_SCHEMA
+        )))
+        children = mocker.patch.object(
+            libioc.JailParams.JailParam,
+            "children",
+            new_callable=unittest.mock.PropertyMock,
+            return_value=[
+                libioc.JailParams.JailParam.from_schema(_SCHEMA[1])
+            ]
+        )
+
+        jail_params = libioc.JailParams.JailParams()
+
+        assert list(jail_params.keys()) == [
+            "security.jail.param.enforce_statfs"
+        ]
+        assert children.call_count == 1
+        cache = json.loads(cache_file.read_text())
+        assert cache["kernel"] == _KERNEL
+        assert cache["params"] == [_SCHEMA[1]]
+
+    def test_config_params_are_compiled_per_config_class(
+        self,
+        cache_file: pathlib.Path,
+        mocker: typing.Any
+    ) -> None:
+        """Test that known config properties are only checked once."""
+        config = _Config()
+        is_known_property = mocker.spy(config, "is_known_property")
+        include = frozenset(["security.jail.param.enforce_statfs"])
+        jail_params = libioc.JailParams.JailParams()
+
+        for _ in range(3):
+            config_params = jail_params.get_config_params(
+                config,
+                include=include
+            )
+            assert [x.iocage_name for x in config_params] == [
+                "allow_mount",
+                "enforce_statfs",
+                "host_hostname"
+            ]
+
+        assert is_known_property.call_count == 2
@@ -0,0 +1,255 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the HTTP metadata cache."""
+import typing
+import http.server
+import pathlib
+import threading
+import urllib.parse
+
+import pytest
+
+import libioc.errors
+import libioc.MetadataCache
+
+
+class ETagHandler(http.server.BaseHTTPRequestHandler):
+    """Serve in-memory files with ETag revalidation."""
+
+    files: typing.Dict[str, bytes] = {}
+    requests: typing.List[typing.Tuple[str, str, int]] = []
+    unavailable: bool = False
+    # close keep-alive connections after a response without announcing it
+    drop_connections: bool = False
+
+    def log_message(self, *args: typing.Any) -> None:
+        """Keep the test output clean."""
+        pass
+
+    def _respond(self, send_body: bool) -> None:
+        path = urllib.parse.urlsplit(self.path).path
+        content = self.files.get(path)
+        if self.unavailable is True:
+            content = None
+            status = 503
+        elif content is None:
+            status = 404
+        elif self.headers.get("If-None-Match") == f'"{hash(content)}"':
+            status = 304
+        else:
+            status = 200
+        self.requests.append((self.command, path, status,))
+        self.send_response(status)
+        if content is not None:
+            self.send_header("ETag", f'"{hash(content)}"')
+        body = content if ((status == 200) and send_body) else b""
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body or b"")
+        if self.drop_connections is True:
+            self.close_connection = True
+
+    def do_GET(self) -> None:
+        """Serve a file unless the cached version is current."""
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        """Serve the headers of a file or redirect to the directory."""
+        if f"{self.path}/" in self.files.keys():
+            self.send_response(301)
+            self.send_header("Location", f"{self.path}/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._respond(send_body=False)
+
+
+@pytest.fixture
+def mirror() -> typing.Iterator[str]:
+    """Run a local HTTP mirror in a background thread."""
+    ETagHandler.files = {"/index.html": b"13.5-RELEASE"}
+    ETagHandler.requests = []
+    ETagHandler.unavailable = False
+    ETagHandler.drop_connections = False
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs=dict(poll_interval=0.05),
+        daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestMetadataCache(object):
+    """Run tests for the HTTP metadata cache."""
+
+    def test_responses_are_served_within_ttl(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if fresh responses do not reach the remote."""
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
+        url = f"{mirror}/index.html"
+        assert cache.get(url) == b"13.5-RELEASE"
+        assert cache.get(url) == b"13.5-RELEASE"
+        assert ETagHandler.requests == [("GET", "/index.html", 200,)]
+
+    def test_stale_responses_are_revalidated(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if expired responses are revalidated with their ETag."""
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            ttl=0,
+            logger=logger
+        )
+        url = f"{mirror}/index.html"
+        assert cache.get(url) == b"13.5-RELEASE"
+        assert cache.get(url) == b"13.5-RELEASE"
+        ETagHandler.files["/index.html"] = b"14.3-RELEASE"
+        assert cache.get(url) == b"14.3-RELEASE"
+        assert [x[2] for x in ETagHandler.requests] == [200, 304, 200]
+
+    def test_cached_response_is_used_when_unavailable(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if the last response is used when the remote fails."""
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            ttl=0,
+            logger=logger
+        )
+        url = f"{mirror}/index.html"
+        cache.get(url)
+        ETagHandler.unavailable = True
+        assert cache.get(url) == b"13.5-RELEASE"
+
+        cache.timeout = 1
+        with pytest.raises(libioc.errors.DownloadFailed):
+            cache.get("http://127.0.0.1:1/index.html", level="verbose")
+
+    def test_head_status_is_cached(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if HEAD status codes including 404 are cached."""
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
+        assert cache.status(f"{mirror}/index.html") == 200
+        assert cache.status(f"{mirror}/missing") == 404
+        assert cache.status(f"{mirror}/missing") == 404
+        assert len(ETagHandler.requests) == 2
+        cache.invalidate(f"{mirror}/missing")
+        assert cache.status(f"{mirror}/missing") == 404
+        assert len(ETagHandler.requests) == 3
+
+    def test_statuses_are_probed_concurrently(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if many HEAD requests are probed and cached at once."""
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
+        ETagHandler.files["/redirected/"] = b""
+        urls = [
+            f"{mirror}/index.html",
+            f"{mirror}/missing",
+            f"{mirror}/redirected",
+            "http://127.0.0.1:1/unreachable"
+        ]
+        expected = {
+            urls[0]: 200,
+            urls[1]: 404,
+            urls[2]: 200,
+            urls[3]: None
+        }
+        assert cache.statuses(urls, concurrency=2, timeout=1) == expected
+        request_count = len(ETagHandler.requests)
+        assert cache.statuses(urls[:3], concurrency=2) == dict(
+            (url, expected[url]) for url in urls[:3]
+        )
+        assert len(ETagHandler.requests) == request_count
+
+    def test_probes_use_the_proxy(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test if pooled HEAD requests respect the proxy environment."""
+        monkeypatch.setenv("http_proxy", mirror)
+        monkeypatch.delenv("no_proxy", raising=False)
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
+        url = "http://mirror.invalid/index.html"
+        assert cache.statuses([url], timeout=1) == {url: 200}
+        assert ETagHandler.requests == [("HEAD", "/index.html", 200,)]
+
+    def test_closed_keep_alive_connection_is_replaced(
+        self,
+        mirror: str,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test if a connection closed by the server is opened again."""
+        monkeypatch.setattr(ETagHandler, "protocol_version", "HTTP/1.1")
+        ETagHandler.drop_connections = True
+        ETagHandler.files["/other.html"] = b"14.3-RELEASE"
+        cache = libioc.MetadataCache.MetadataCache(
+            path=str(tmp_path),
+            logger=logger
+        )
+        urls = [f"{mirror}/index.html", f"{mirror}/other.html"]
+        assert cache.statuses(urls, concurrency=1) == {
+            urls[0]: 200,
+            urls[1]: 200
+        }
+        assert len(ETagHandler.requests) == 2
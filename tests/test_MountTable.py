@@ -0,0 +1,159 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the mount table snapshot."""
+import typing
+import pathlib
+
+import pytest
+
+import libioc.MountTable
+import libioc.ResourceUpdater
+
+_MOUNTS = [
+    libioc.MountTable.MountTableEntry("/", "zroot/ROOT/default", "zfs"),
+    libioc.MountTable.MountTableEntry("/iocage/jails/foo/root", None, "zfs"),
+    libioc.MountTable.MountTableEntry(
+        "/iocage/jails/foo/root/dev",
+        "devfs",
+        "devfs"
+    ),
+    libioc.MountTable.MountTableEntry(
+        "/iocage/jails/foo/root/bin",
+        "/iocage/releases/13.2-RELEASE/root/bin",
+        "nullfs"
+    )
+]
+
+
+@pytest.fixture
+def query_mounts(mocker: typing.Any) -> typing.Iterator[typing.Any]:
+    """Provide a known mount table to the snapshot."""
+    query_mounts = mocker.patch.object(
+        libioc.MountTable.MountTable,
+        "_query_mounts",
+        return_value=list(_MOUNTS)
+    )
+    libioc.MountTable.MountTable().refresh()
+    query_mounts.reset_mock()
+    yield query_mounts
+    libioc.MountTable.MountTable().refresh()
+
+
+class TestMountTable(object):
+    """Run tests for the mount table snapshot."""
+
+    def test_queries_are_answered_from_the_snapshot(
+        self,
+        query_mounts: typing.Any
+    ) -> None:
+        """Test that membership checks do not read the mount table."""
+        mount_table = libioc.MountTable.MountTable()
+
+        assert mount_table.is_mounted("/iocage/jails/foo/root/dev") is True
+        assert mount_table.is_mounted("/iocage/jails/foo/root/dev/") is True
+        assert "/iocage/jails/foo/root/lib" not in mount_table
+        assert [x.mountpoint for x in mount_table.find_below(
+            "/iocage/jails/foo/root"
+        )] == [
+            "/iocage/jails/foo/root/dev",
+            "/iocage/jails/foo/root/bin"
+        ]
+        assert query_mounts.call_count == 0
+
+        mount_table.refresh()
+        assert query_mounts.call_count == 1
+
+    def test_mounts_by_libioc_update_the_snapshot(
+        self,
+        query_mounts: typing.Any
+    ) -> None:
+        """Test that added and removed mounts are tracked in memory."""
+        mount_table = libioc.MountTable.MountTable()
+        mount_table.add(
+            "/iocage/jails/foo/root/lib/",
+            source="/iocage/releases/13.2-RELEASE/root/lib",
+            fstype="nullfs"
+        )
+        mount_table.remove("/iocage/jails/foo/root/dev")
+
+        other_instance = libioc.MountTable.MountTable()
+        assert other_instance.is_mounted("/iocage/jails/foo/root/lib") is True
+        assert other_instance.is_mounted("/iocage/jails/foo/root/dev") is False
+        assert query_mounts.call_count == 0
+
+    def test_proc_mounts_are_unescaped(self, tmp_path: pathlib.Path) -> None:
+        """Test the mount table fallback of hosts without getmntinfo(3)."""
+        mounts_file = tmp_path / "mounts"
+        mounts_file.write_text(
+            "proc /proc proc rw 0 0\n"
+            "/dev/sda1 /mnt/with\\040space ext4 rw 0 0\n"
+        )
+
+        entries = libioc.MountTable.MountTable()._query_proc_mounts(
+            str(mounts_file)
+        )
+
+        assert [(x.source, x.mountpoint, x.fstype) for x in entries] == [
+            ("proc", "/proc", "proc"),
+            ("/dev/sda1", "/mnt/with space", "ext4")
+        ]
+
+    def test_mounts_are_refreshed_before_deletion(
+        self,
+        query_mounts: typing.Any,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test that mounts made after the snapshot are never deleted."""
+        directory = tmp_path / "freebsd-update"
+        (directory / "files").mkdir(parents=True)
+        query_mounts.return_value = list(_MOUNTS) + [
+            libioc.MountTable.MountTableEntry(
+                str(directory / "files"),
+                "/iocage/releases/13.2-RELEASE/updates/files",
+                "nullfs"
+            )
+        ]
+        umount = mocker.patch("libioc.helpers.umount")
+
+        class UpdaterStub:
+
+            def __init__(self, logger: 'libioc.Logger.Logger') -> None:
+                self.logger = logger
+
+            def _create_dir(self, directory: str) -> None:
+                libioc.ResourceUpdater.Updater._create_dir(self, directory)
+
+        libioc.ResourceUpdater.Updater._clean_create_dir(
+            UpdaterStub(logger),
+            str(directory)
+        )
+
+        assert umount.call_args_list == [mocker.call(
+            str(directory / "files"),
+            force=True,
+            logger=logger
+        )]
+        assert list(directory.iterdir()) == []
@@ -0,0 +1,104 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the event profiler."""
+import typing
+import json
+
+import libioc.events
+import libioc.Profiler
+
+
+class Outer(libioc.events.IocEvent):
+    """Outer test event."""
+
+    pass
+
+
+class Inner(libioc.events.IocEvent):
+    """Inner test event."""
+
+    pass
+
+
+def _operation(
+    fail: bool=False
+) -> typing.Generator[libioc.events.IocEvent, None, None]:
+    outer = Outer()
+    yield outer.begin()
+    for _ in range(2):
+        inner = Inner(scope=outer.scope)
+        yield inner.begin()
+        yield inner.end()
+    if fail is True:
+        yield outer.fail(Exception("failed"))
+    else:
+        yield outer.end()
+
+
+class TestProfiler(object):
+    """Run tests for the event profiler."""
+
+    def test_builds_nested_tree(self) -> None:
+        """Test if events are nested below the pending parent event."""
+        profiler = libioc.Profiler.Profiler("op")
+        events = list(profiler.profile(_operation()))
+        assert len(events) == 6
+
+        data = json.loads(profiler.to_json())
+        assert data["name"] == "op"
+        assert data["status"] == "done"
+        assert len(data["children"]) == 1
+        outer = data["children"][0]
+        assert outer["name"] == "Outer"
+        assert outer["status"] == "done"
+        assert [x["name"] for x in outer["children"]] == ["Inner", "Inner"]
+        children_duration = sum(x["duration"] for x in outer["children"])
+        assert outer["duration"] >= children_duration
+        assert outer["self_duration"] >= 0
+
+    def test_records_failures(self) -> None:
+        """Test if the final state of failed events is recorded."""
+        profiler = libioc.Profiler.Profiler().consume(_operation(fail=True))
+        assert profiler.root.children[0].status == "failed"
+
+    def test_collapsed_stacks(self) -> None:
+        """Test if identical stacks are merged in the collapsed format."""
+        profiler = libioc.Profiler.Profiler("op").consume(_operation())
+        stacks = dict(
+            line.rsplit(" ", maxsplit=1)
+            for line in profiler.collapsed_stacks()
+        )
+        assert set(stacks.keys()) == {"op", "op;Outer", "op;Outer;Inner"}
+        assert all(int(value) >= 0 for value in stacks.values())
+
+    def test_aggregate_percentiles(self) -> None:
+        """Test if durations are aggregated across operations."""
+        aggregate = libioc.Profiler.ProfileAggregate()
+        for _ in range(10):
+            profiler = libioc.Profiler.Profiler("op").consume(_operation())
+            aggregate.add(profiler)
+        stats = aggregate.percentiles((50, 99,))
+        assert stats["op;Outer"]["count"] == 10
+        assert stats["op;Outer"]["p50"] <= stats["op;Outer"]["p99"]
+        assert stats["op;Outer"]["p99"] <= stats["op;Outer"]["max"]
@@ -22,12 +22,17 @@
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 """Unit tests for the Release module."""
+import typing
+import errno
 import os.path
+import pathlib
+import unittest.mock
 
 import pytest
 
 import libioc.errors
 import libioc.Release
+import libioc.ZFS
 
 class TestRelease(object):
     """Run Release unit tests."""
@@ -70,3 +75,232 @@ class TestAssetSignature(object):
 
         with pytest.raises(libioc.errors.InvalidReleaseAssetSignature):
             libioc.Release.ReleaseGenerator._check_asset_hash(stub, "base")
+
+
+class TestStreamedAssets(object):
+    """Run tests for assets that are extracted while downloading."""
+
+    def test_closed_asset_generator_exits(
+        self,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test if an asset stops quietly when a sibling asset failed."""
+
+        class ReleaseStub:
+
+            name = "13.5-RELEASE"
+            full_name = "13.5-RELEASE"
+            remote_url = "http://mirror.invalid/13.5-RELEASE"
+            root_dir = "/nonexistent"
+            decompressor = "lzma"
+            check_hashes = True
+
+            def __init__(self, logger: 'libioc.Logger.Logger') -> None:
+                self.logger = logger
+
+        mocker.patch(
+            "libioc.SecureTarfile.SecureTarfile.extract_stream",
+            return_value=iter(range(10))
+        )
+        mocker.patch("libioc.Release.time.monotonic", side_effect=range(
+            0, 100, 10
+        ))
+        downloader = mocker.Mock()
+        downloader.stream.return_value = iter([])
+        asset = libioc.Release.ReleaseGenerator._fetch_and_extract_asset(
+            ReleaseStub(logger),
+            "base",
+            downloader=downloader
+        )
+        next(asset)
+        event = next(asset)
+        asset.close()
+
+        assert event.error is None
+        downloader.close.assert_called_once_with()
+
+
+class TestReleaseSnapshotIndex(object):
+    """Run tests for the release snapshot patchlevel index."""
+
+    def test_index_sorts_version_snapshots(self) -> None:
+        """Test if only version snapshots are indexed by patchlevel."""
+
+        class SnapshotStub:
+
+            def __init__(self, snapshot_name: str) -> None:
+                self.snapshot_name = snapshot_name
+
+        snapshots = [
+            SnapshotStub(name)
+            for name in ["p2", "clone-2026", "p10", "p0", "p3-broken"]
+        ]
+        index = libioc.Release.ReleaseSnapshotIndex(snapshots)
+        assert index.patchlevels == [10, 2, 0]
+        assert index.latest is snapshots[2]
+        assert index.get(2) is snapshots[0]
+        assert index.get(3) is None
+
+    def test_empty_index(self) -> None:
+        """Test if an index without version snapshots has no latest."""
+        index = libioc.Release.ReleaseSnapshotIndex([])
+        assert index.latest is None
+        assert index.sorted_snapshots == []
+
+    @pytest.mark.parametrize("snapshots_changed", [True, False])
+    def test_snapshots_of_other_processes_are_found(
+        self,
+        snapshots_changed: bool
+    ) -> None:
+        """Test if the shared index notices snapshots taken elsewhere."""
+
+        class SnapshotStub:
+
+            def __init__(self, snapshot_name: str) -> None:
+                self.snapshot_name = snapshot_name
+
+        class ReleaseStub(libioc.Release.ReleaseGenerator):
+
+            root_dataset_name = "pool/iocage/releases/99.0-TEST/root"
+            root_dataset = unittest.mock.Mock(snapshots=[SnapshotStub("p0")])
+            patchlevel = 1
+
+            def __init__(self) -> None:
+                pass
+
+        properties = ReleaseStub.root_dataset.properties = {}
+        if snapshots_changed is True:
+            properties["snapshots_changed"] = unittest.mock.Mock(value="1")
+        release = ReleaseStub()
+        release.invalidate_snapshot_index()
+        assert release.snapshot_index.patchlevels == [0]
+
+        # another process takes p1
+        ReleaseStub.root_dataset.snapshots = [
+            SnapshotStub("p0"),
+            SnapshotStub("p1")
+        ]
+        if snapshots_changed is True:
+            properties["snapshots_changed"] = unittest.mock.Mock(value="2")
+            assert release.snapshot_index.patchlevels == [1, 0]
+        assert release.current_snapshot.snapshot_name == "p1"
+        assert release.current_snapshot_patchlevel == 1
+        release.invalidate_snapshot_index()
+
+
+class TestBaseReleaseSync(object):
+    """Run tests for the incremental base release synchronization."""
+
+    def test_zfs_diff_output_is_parsed(self, mocker: typing.Any) -> None:
+        """Test if changes, file types and escaped paths are parsed."""
+        mocker.patch("libioc.helpers.exec", return_value=("\n".join([
+            "M\t/\t/iocage/releases/13.5-RELEASE/root/etc",
+            "+\tF\t/iocage/releases/13.5-RELEASE/root/etc/a\\0040b",
+            "R\tF\t/iocage/releases/13.5-RELEASE/root/x\t"
+            "/iocage/releases/13.5-RELEASE/root/y"
+        ]), "", 0,))
+        changes = libioc.ZFS.diff("pool/root@a", "pool/root")
+        assert [x.change for x in changes] == ["M", "+", "R"]
+        assert changes[0].is_directory is True
+        assert changes[1].path.endswith("/etc/a b")
+        assert changes[2].new_path == "/iocage/releases/13.5-RELEASE/root/y"
+
+    @pytest.mark.parametrize("cross_device", [False, True])
+    def test_changed_paths_are_applied(
+        self,
+        cross_device: bool,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger',
+        mocker: typing.Any
+    ) -> None:
+        """Test if only the listed paths are copied or removed."""
+        root = tmp_path / "root"
+        base = tmp_path / "base"
+        for directory in (root, base):
+            (directory / "bin").mkdir(parents=True)
+            (directory / "bin/sh").write_bytes(b"old")
+            (directory / "bin/untouched").write_bytes(b"old")
+            (directory / "bin/removed").write_bytes(b"old")
+            (directory / "bin/old-name").write_bytes(b"old")
+        (root / "bin/sh").write_bytes(b"new")
+        (root / "bin/sh").chmod(0o4555)
+        (root / "bin/untouched").write_bytes(b"changed, but not listed")
+        (root / "bin/removed").unlink()
+        (root / "bin/old-name").rename(root / "bin/new-name")
+        (root / "lib").mkdir()
+        (root / "lib/libc.so").symlink_to("libc.so.7")
+        for directory in (root, base):
+            (directory / "share/old-dir").mkdir(parents=True)
+            (directory / "share/old-dir/file").write_bytes(b"unchanged")
+        (root / "share/old-dir").rename(root / "share/new-dir")
+
+        class ReleaseStub:
+
+            def __init__(self, logger: 'libioc.Logger.Logger') -> None:
+                self.logger = logger
+                self.root_dataset = unittest.mock.Mock(mountpoint=str(root))
+                self.base_dataset = unittest.mock.Mock(mountpoint=str(base))
+
+        # renames across datasets fail
+        if cross_device is True:
+            mocker.patch(
+                "os.rename",
+                side_effect=OSError(errno.EXDEV, "Cross-device link")
+            )
+        Entry = libioc.ZFS.ZFSDiffEntry
+        libioc.Release.ReleaseGenerator._apply_base_release_changes(
+            ReleaseStub(logger),
+            [
+                Entry("M", "F", f"{root}/bin/sh"),
+                Entry("-", "F", f"{root}/bin/removed"),
+                Entry(
+                    "R",
+                    "F",
+                    f"{root}/bin/old-name",
+                    f"{root}/bin/new-name"
+                ),
+                Entry(
+                    "R",
+                    "/",
+                    f"{root}/share/old-dir",
+                    f"{root}/share/new-dir"
+                ),
+                Entry("+", "/", f"{root}/lib"),
+                Entry("+", "@", f"{root}/lib/libc.so"),
+                Entry("M", "/", f"{root}/bin")
+            ]
+        )
+        assert (base / "bin/sh").read_bytes() == b"new"
+        assert ((base / "bin/sh").stat().st_mode & 0o7777) == 0o4555
+        assert (base / "bin/untouched").read_bytes() == b"old"
+        assert (base / "bin/removed").exists() is False
+        assert (base / "bin/old-name").exists() is False
+        assert (base / "bin/new-name").read_bytes() == b"old"
+        assert os.readlink(base / "lib/libc.so") == "libc.so.7"
+        assert (base / "share/new-dir/file").read_bytes() == b"unchanged"
+        assert (base / "share/old-dir").exists() is False
+
+    def test_unchanged_release_is_not_copied(
+        self,
+        mocker: typing.Any,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if a release without changes since the sync is skipped."""
+        diff = mocker.patch("libioc.ZFS.diff", return_value=[])
+
+        class ReleaseStub:
+
+            _base_sync_snapshot_name = "pool/root@base_sync1"
+            root_dataset = unittest.mock.Mock()
+
+            def __init__(self, logger: 'libioc.Logger.Logger') -> None:
+                self.logger = logger
+
+            def _rsync_to_base_release(self) -> None:
+                raise AssertionError("copying all files is not expected")
+
+        stub = ReleaseStub(logger)
+        libioc.Release.ReleaseGenerator._copy_to_base_release(stub)
+        assert diff.call_count == 1
+        assert stub.root_dataset.snapshot.called is False
@@ -0,0 +1,219 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the release patchlevel manifests."""
+import typing
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import libioc.ReleaseManifest
+import libioc.errors
+import libioc.ZFS
+
+Entry = libioc.ZFS.ZFSDiffEntry
+MOUNTPOINT = "/iocage/releases/13.5-RELEASE/root"
+
+
+def _write(root: pathlib.Path, files: typing.Dict[str, str]) -> None:
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+
+
+@pytest.fixture
+def snapshots(tmp_path: pathlib.Path) -> typing.Tuple[str, str]:
+    """Create the directories of two patchlevel snapshots."""
+    _write(tmp_path / "p1", {
+        "bin/sh": "sh-p1",
+        "etc/motd": "motd",
+        "usr/old/file": "old",
+        "lib/before/file": "renamed"
+    })
+    _write(tmp_path / "p2", {
+        "bin/sh": "sh-p2",
+        "etc/motd": "motd",
+        "usr/new": "new",
+        "lib/after/file": "renamed"
+    })
+    return (str(tmp_path / "p1"), str(tmp_path / "p2"),)
+
+
+def _changes() -> typing.List[libioc.ZFS.ZFSDiffEntry]:
+    return [
+        Entry("M", "F", f"{MOUNTPOINT}/bin/sh"),
+        Entry("M", "/", f"{MOUNTPOINT}/usr"),
+        Entry("-", "F", f"{MOUNTPOINT}/usr/old/file"),
+        Entry("-", "/", f"{MOUNTPOINT}/usr/old"),
+        Entry("+", "F", f"{MOUNTPOINT}/usr/new"),
+        Entry(
+            "R", "/",
+            f"{MOUNTPOINT}/lib/before",
+            f"{MOUNTPOINT}/lib/after"
+        )
+    ]
+
+
+def _create(
+    snapshots: typing.Tuple[str, str]
+) -> libioc.ReleaseManifest.ReleaseManifest:
+    return libioc.ReleaseManifest.ReleaseManifest.create(
+        from_patchlevel=1,
+        to_patchlevel=2,
+        changes=_changes(),
+        mountpoint=MOUNTPOINT,
+        from_root=snapshots[0],
+        to_root=snapshots[1]
+    )
+
+
+class TestReleaseManifest(object):
+    """Run tests for recording and applying release manifests."""
+
+    def test_create_records_digests(
+        self,
+        snapshots: typing.Tuple[str, str]
+    ) -> None:
+        """Test if changed and renamed paths are listed with digests."""
+        manifest = _create(snapshots)
+
+        assert sorted(manifest.entries) == [
+            "bin/sh",
+            "lib/after",
+            "lib/after/file",
+            "lib/before",
+            "lib/before/file",
+            "usr/new",
+            "usr/old",
+            "usr/old/file"
+        ]
+        sh = manifest.entries["bin/sh"]
+        assert sh.old_digest == libioc.ReleaseManifest.get_digest(
+            f"{snapshots[0]}/bin/sh"
+        )
+        assert sh.new_digest == libioc.ReleaseManifest.get_digest(
+            f"{snapshots[1]}/bin/sh"
+        )
+        assert manifest.entries["usr/new"].old_digest is None
+        assert manifest.entries["lib/before"].removed is True
+        assert manifest.entries["lib/after"].is_directory is True
+
+    def test_save_and_load(
+        self,
+        snapshots: typing.Tuple[str, str],
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if a manifest survives a JSON round trip."""
+        manifest = _create(snapshots)
+        path = str(tmp_path / "p1-p2.json")
+        manifest.save(path)
+        loaded = libioc.ReleaseManifest.ReleaseManifest.load(path)
+
+        assert loaded.from_patchlevel == 1
+        assert loaded.to_patchlevel == 2
+        assert [x.to_dict() for x in loaded.entries.values()] == [
+            manifest.entries[x].to_dict() for x in sorted(manifest.entries)
+        ]
+
+    def test_merge_keeps_first_old_and_last_new_digest(self) -> None:
+        """Test if consecutive manifests combine into one delta."""
+        Manifest = libioc.ReleaseManifest.ReleaseManifest
+        ManifestEntry = libioc.ReleaseManifest.ManifestEntry
+        merged = Manifest.merge([
+            Manifest(1, 2, [
+                ManifestEntry("bin/sh", "sha256:a", "sha256:b"),
+                ManifestEntry("tmp/added", None, "sha256:c")
+            ]),
+            Manifest(2, 3, [
+                ManifestEntry("bin/sh", "sha256:b", "sha256:d"),
+                ManifestEntry("tmp/added", "sha256:c", None)
+            ])
+        ])
+
+        assert merged.from_patchlevel == 1
+        assert merged.to_patchlevel == 3
+        assert list(merged.entries) == ["bin/sh"]
+        assert merged.entries["bin/sh"].old_digest == "sha256:a"
+        assert merged.entries["bin/sh"].new_digest == "sha256:d"
+
+    def test_apply_delta_to_jail(
+        self,
+        snapshots: typing.Tuple[str, str],
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if a jail cloned from the old patchlevel is updated."""
+        jail_root = tmp_path / "jail"
+        shutil.copytree(snapshots[0], jail_root, symlinks=True)
+        _write(jail_root, {"usr/old/local": "local"})
+        manifest = _create(snapshots)
+
+        assert manifest.conflicts(str(jail_root)) == []
+        manifest.apply(snapshots[1], str(jail_root), concurrency=2)
+
+        assert (jail_root / "bin/sh").read_text() == "sh-p2"
+        assert (jail_root / "usr/new").read_text() == "new"
+        assert (jail_root / "lib/after/file").read_text() == "renamed"
+        assert os.path.exists(jail_root / "lib/before") is False
+        assert os.path.exists(jail_root / "usr/old/file") is False
+        # directories with local files are kept
+        assert (jail_root / "usr/old/local").read_text() == "local"
+        assert manifest.conflicts(str(jail_root)) == []
+
+    def test_local_changes_conflict(
+        self,
+        snapshots: typing.Tuple[str, str],
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if locally modified files are reported as conflicts."""
+        jail_root = tmp_path / "jail"
+        shutil.copytree(snapshots[0], jail_root, symlinks=True)
+        _write(jail_root, {"bin/sh": "patched", "usr/new": "local"})
+
+        conflicts = _create(snapshots).conflicts(str(jail_root))
+
+        assert conflicts == ["bin/sh", "usr/new"]
+
+    def test_symlinked_parent_directory_is_rejected(
+        self,
+        snapshots: typing.Tuple[str, str],
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if paths below a symlink of the jail are never touched."""
+        jail_root = tmp_path / "jail"
+        shutil.copytree(snapshots[0], jail_root, symlinks=True)
+        host_usr = tmp_path / "host_usr"
+        shutil.move(str(jail_root / "usr"), str(host_usr))
+        os.symlink(str(host_usr), str(jail_root / "usr"))
+        manifest = _create(snapshots)
+
+        assert manifest.conflicts(str(jail_root)) == [
+            "usr/new",
+            "usr/old",
+            "usr/old/file"
+        ]
+        with pytest.raises(libioc.errors.InsecureJailPath):
+            manifest.apply(snapshots[1], str(jail_root), concurrency=2)
+        assert os.path.exists(host_usr / "new") is False
+        assert (host_usr / "old/file").read_text() == "old"
@@ -0,0 +1,205 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the resource updater."""
+import typing
+import pathlib
+import threading
+import time
+
+import libioc.errors
+import libioc.events
+import libioc.ResourceUpdater
+
+
+class UpdaterStub(object):
+    """Record the fetch and apply calls of a release."""
+
+    running: typing.List[str] = []
+    max_running: typing.Dict[str, int] = {}
+    calls: typing.List[typing.Tuple[str, str]] = []
+    lock = threading.Lock()
+    # releases whose update download is skipped or fails
+    skipped: typing.Set[str] = set()
+    failing: typing.Set[str] = set()
+
+    def __init__(self, release: 'ReleaseStub') -> None:
+        self.release = release
+
+    def _run(self, kind: str) -> libioc.events.IocEvent:
+        with self.lock:
+            self.calls.append((kind, self.release.name,))
+            self.running.append(self.release.name)
+            self.max_running[kind] = max(
+                self.max_running.get(kind, 0),
+                len(self.running)
+            )
+        time.sleep(0.05)
+        with self.lock:
+            self.running.remove(self.release.name)
+        return libioc.events.IocEvent(message=f"{kind} {self.release.name}")
+
+    def fetch(
+        self,
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Simulate fetching the updates."""
+        yield self._run("fetch")
+        if self.release.name in self.failing:
+            raise libioc.errors.IocException(message="fetch failed")
+        event = libioc.events.ReleaseUpdateDownload(
+            typing.cast('libioc.Release.ReleaseGenerator', self.release)
+        )
+        yield event.begin()
+        if self.release.name in self.skipped:
+            yield event.skip()
+        else:
+            yield event.end()
+
+    def apply(
+        self,
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator[typing.Any, None, None]:
+        """Simulate applying the updates."""
+        yield self._run("apply")
+        yield self.release.name.startswith("13")
+
+
+class ReleaseStub(object):
+    """Release with a memoized updater."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.full_name = name
+        self.updater = UpdaterStub(self)
+        self.base_release_changes: typing.List[typing.Optional[bool]] = []
+
+    def _update_base_release_step(
+        self,
+        release_changed: typing.Optional[bool],
+        update_base: typing.Optional[bool]=None,
+        event_scope: typing.Optional['libioc.events.Scope']=None
+    ) -> typing.Generator['libioc.events.IocEvent', None, None]:
+        """Record the update of the basejail datasets."""
+        self.base_release_changes.append(release_changed)
+        yield libioc.events.IocEvent(message=f"copy base {self.name}")
+
+
+def _reset_stubs() -> None:
+    UpdaterStub.calls = []
+    UpdaterStub.running = []
+    UpdaterStub.max_running = {}
+    UpdaterStub.skipped = set()
+    UpdaterStub.failing = set()
+
+
+class TestUpdateReleases(object):
+    """Run tests for updating several releases."""
+
+    def test_fetches_precede_limited_applies(self) -> None:
+        """Test if updates are fetched first and applied concurrently."""
+        _reset_stubs()
+        releases = [
+            ReleaseStub(name)
+            for name in ["13.4-RELEASE", "13.5-RELEASE", "14.3-RELEASE"]
+        ]
+        results = list(libioc.ResourceUpdater.update_releases(
+            typing.cast(
+                typing.List['libioc.Release.ReleaseGenerator'],
+                releases
+            ),
+            fetch_concurrency=3,
+            apply_concurrency=2
+        ))
+
+        kinds = [kind for kind, _ in UpdaterStub.calls]
+        assert kinds == ["fetch"] * 3 + ["apply"] * 3
+        assert UpdaterStub.max_running == dict(fetch=3, apply=2)
+        # fetch, download begin and end, apply and base copy per release
+        assert len(results) == 16
+        assert results[-1] == {
+            "13.4-RELEASE": True,
+            "13.5-RELEASE": True,
+            "14.3-RELEASE": False
+        }
+        assert [x.base_release_changes for x in releases] == [
+            [True],
+            [True],
+            [False]
+        ]
+
+    def test_only_fetched_updates_are_applied(self) -> None:
+        """Test if skipped and failed fetches neither apply nor abort."""
+        _reset_stubs()
+        UpdaterStub.skipped = {"13.4-RELEASE"}
+        UpdaterStub.failing = {"13.5-RELEASE"}
+        releases = [
+            ReleaseStub(name)
+            for name in ["13.4-RELEASE", "13.5-RELEASE", "14.3-RELEASE"]
+        ]
+        results = list(libioc.ResourceUpdater.update_releases(
+            typing.cast(
+                typing.List['libioc.Release.ReleaseGenerator'],
+                releases
+            )
+        ))
+
+        assert [x for x in UpdaterStub.calls if x[0] == "apply"] == [
+            ("apply", "14.3-RELEASE",)
+        ]
+        assert results[-1] == {
+            "13.4-RELEASE": False,
+            "13.5-RELEASE": False,
+            "14.3-RELEASE": False
+        }
+        assert [x.base_release_changes for x in releases] == [
+            [None],
+            [None],
+            [False]
+        ]
+
+
+class TestSharedCache(object):
+    """Run tests for sharing updater files between releases."""
+
+    def test_pruned_files_remain_shared(
+        self,
+        tmp_path: 'pathlib.Path'
+    ) -> None:
+        """Test if a release cannot remove the files of another release."""
+        shared = tmp_path / "shared"
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        for directory in [shared, first, second]:
+            directory.mkdir()
+        (first / "a.gz").write_text("a")
+
+        libioc.ResourceUpdater._share_files(str(first), str(shared))
+        libioc.ResourceUpdater._share_files(str(shared), str(second))
+        (second / "a.gz").unlink()
+        (second / "b.gz").write_text("b")
+        libioc.ResourceUpdater._share_files(str(second), str(shared))
+
+        assert (first / "a.gz").read_text() == "a"
+        assert sorted(x.name for x in shared.iterdir()) == ["a.gz", "b.gz"]
+        assert not (first / "b.gz").exists()
@@ -0,0 +1,250 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the secure tarfile extraction."""
+import typing
+import hashlib
+import io
+import pathlib
+import shutil
+import tarfile
+
+import pytest
+
+import libioc.Downloader
+import libioc.errors
+import libioc.SecureTarfile
+
+
+def _archive(
+    members: typing.Dict[str, bytes],
+    compression_format: str="xz"
+) -> bytes:
+    buffer = io.BytesIO()
+    mode = typing.cast(typing.Literal["w:xz"], f"w:{compression_format}")
+    with tarfile.open(fileobj=buffer, mode=mode) as tar:
+        for name, content in members.items():
+            tar_info = tarfile.TarInfo(name)
+            tar_info.size = len(content)
+            tar.addfile(tar_info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def _chunks(data: bytes, size: int=1000) -> typing.Iterator[bytes]:
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+class TestStreamingExtraction(object):
+    """Run tests for the extraction of archive streams."""
+
+    def test_stream_is_hashed_and_extracted(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if a chunked stream is extracted and fully hashed."""
+        archive = _archive({
+            "./etc/motd": b"welcome",
+            "./bin/sh": b"\x7fELF" * 1000
+        })
+        reader = libioc.Downloader.StreamReader(_chunks(archive))
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            "base.txz",
+            compression_format="xz",
+            fileobj=typing.cast(typing.IO[bytes], reader)
+        )
+        names = [x.name for x in secure_tarfile.extract_stream(str(tmp_path))]
+        reader.drain()
+
+        assert names == ["./etc/motd", "./bin/sh"]
+        assert (tmp_path / "etc/motd").read_bytes() == b"welcome"
+        assert reader.hexdigest == hashlib.sha256(archive).hexdigest()
+
+    def test_illegal_member_aborts(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if extraction stops at the first illegal member."""
+        archive = _archive({
+            "./etc/motd": b"welcome",
+            "./../escape": b"x",
+            "./etc/later": b"never"
+        })
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            "base.txz",
+            compression_format="xz",
+            fileobj=io.BytesIO(archive)
+        )
+        with pytest.raises(libioc.errors.IllegalArchiveContent):
+            secure_tarfile.extract(str(tmp_path / "root"))
+        assert (tmp_path / "escape").exists() is False
+        assert (tmp_path / "root").exists() is False
+
+    @pytest.mark.parametrize("link_type", [tarfile.SYMTYPE, tarfile.LNKTYPE])
+    def test_links_cannot_escape_the_destination(
+        self,
+        link_type: bytes,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if members cannot be written through links to the host."""
+        outside = tmp_path / "host"
+        outside.mkdir()
+        (outside / "passwd").write_bytes(b"root")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+            link_info = tarfile.TarInfo("./etc")
+            link_info.type = link_type
+            link_info.linkname = str(outside)
+            tar.addfile(link_info)
+            name = "./etc/passwd" if (link_type == tarfile.SYMTYPE) else "./x"
+            tar_info = tarfile.TarInfo(name)
+            tar_info.size = 5
+            tar.addfile(tar_info, io.BytesIO(b"owned"))
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            "base.txz",
+            compression_format="xz",
+            fileobj=io.BytesIO(buffer.getvalue())
+        )
+        with pytest.raises(libioc.errors.IllegalArchiveContent):
+            secure_tarfile.extract(str(tmp_path / "root"))
+        assert (outside / "passwd").read_bytes() == b"root"
+        assert (tmp_path / "root").exists() is False
+
+    def test_abort_keeps_preexisting_files(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if only paths created by the extraction are removed."""
+        (tmp_path / "etc").mkdir()
+        (tmp_path / "etc/hosts").write_bytes(b"localhost")
+        archive_file = tmp_path / "base.txz"
+        archive_file.write_bytes(_archive({
+            "./etc/motd": b"welcome",
+            "./usr/bin/true": b"",
+            "./../escape": b"x"
+        }))
+        with pytest.raises(libioc.errors.IllegalArchiveContent):
+            libioc.SecureTarfile.extract(
+                file=str(archive_file),
+                destination=str(tmp_path),
+                compression_format="xz"
+            )
+        assert (tmp_path / "etc/hosts").read_bytes() == b"localhost"
+        assert (tmp_path / "etc/motd").exists() is False
+        assert (tmp_path / "usr").exists() is False
+
+    def test_file_extraction_applies_directory_attributes(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if directory modes and hard links survive single pass."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            directory = tarfile.TarInfo("./readonly")
+            directory.type = tarfile.DIRTYPE
+            directory.mode = 0o555
+            tar.addfile(directory)
+            tar_info = tarfile.TarInfo("./readonly/file")
+            tar_info.size = 4
+            tar.addfile(tar_info, io.BytesIO(b"data"))
+            link = tarfile.TarInfo("./readonly/link")
+            link.type = tarfile.LNKTYPE
+            link.linkname = "./readonly/file"
+            tar.addfile(link)
+        archive_file = tmp_path / "bundle.tar.gz"
+        archive_file.write_bytes(buffer.getvalue())
+
+        destination = tmp_path / "destination"
+        libioc.SecureTarfile.extract(
+            file=str(archive_file),
+            destination=str(destination),
+            compression_format="gz"
+        )
+        readonly = destination / "readonly"
+        assert (readonly.stat().st_mode & 0o777) == 0o555
+        assert (readonly / "link").read_bytes() == b"data"
+        assert (readonly / "link").stat().st_ino \
+            == (readonly / "file").stat().st_ino
+        readonly.chmod(0o755)
+
+
+class TestDecompressors(object):
+    """Run tests for the xz decompressor backends."""
+
+    @pytest.mark.parametrize("decompressor", ["lzma", "xz"])
+    @pytest.mark.parametrize("streamed", [False, True])
+    def test_backend_extracts_archive(
+        self,
+        tmp_path: pathlib.Path,
+        decompressor: str,
+        streamed: bool
+    ) -> None:
+        """Test if files and streams are extracted with each backend."""
+        if (decompressor == "xz") and (shutil.which("xz") is None):
+            pytest.skip("xz is not installed")
+        archive = _archive({
+            "./etc/motd": b"welcome",
+            "./bin/sh": b"\x7fELF" * 100000
+        })
+        archive_file = tmp_path / "base.txz"
+        archive_file.write_bytes(archive)
+        fileobj = None
+        if streamed is True:
+            fileobj = typing.cast(
+                typing.IO[bytes],
+                libioc.Downloader.StreamReader(_chunks(archive))
+            )
+        secure_tarfile = libioc.SecureTarfile.SecureTarfile(
+            str(archive_file),
+            compression_format="xz",
+            fileobj=fileobj,
+            decompressor=decompressor
+        )
+        assert secure_tarfile.use_xz_command is (decompressor == "xz")
+        secure_tarfile.extract(str(tmp_path / "root"))
+        assert (tmp_path / "root/bin/sh").read_bytes() == b"\x7fELF" * 100000
+
+    def test_corrupt_archive_fails_with_xz(
+        self,
+        tmp_path: pathlib.Path
+    ) -> None:
+        """Test if the xz command reports corrupt archives."""
+        if shutil.which("xz") is None:
+            pytest.skip("xz is not installed")
+        archive = bytearray(_archive({"./etc/motd": b"welcome" * 1000}))
+        archive[len(archive) // 2] ^= 0xff
+        archive_file = tmp_path / "base.txz"
+        archive_file.write_bytes(bytes(archive))
+        with pytest.raises(libioc.errors.ArchiveDecompressionFailed):
+            libioc.SecureTarfile.extract(
+                file=str(archive_file),
+                destination=str(tmp_path / "root"),
+                compression_format="xz",
+                decompressor="xz"
+            )
+        assert (tmp_path / "root").exists() is False
+
+    def test_unknown_decompressor(self) -> None:
+        """Test if unknown decompressors are rejected."""
+        with pytest.raises(ValueError):
+            libioc.SecureTarfile.SecureTarfile("base.txz", decompressor="7z")
@@ -0,0 +1,226 @@
+# Copyright (c) 2026, the libioc contributors
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted providing that the following conditions
+# are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+# IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS
+# OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+# IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+"""Unit tests for the warm jail pool."""
+import typing
+import pathlib
+
+import pytest
+
+import libioc.errors
+import libioc.Jail
+import libioc.WarmPool
+
+
+def _patch_host(mocker: typing.Any) -> None:
+    # pool bookkeeping does not touch the host or ZFS until jails are used
+    mocker.patch("libioc.helpers_object.init_zfs", return_value=mocker.Mock())
+    mocker.patch("libioc.helpers_object.init_host", return_value=mocker.Mock())
+
+
+def _pool(
+    mocker: typing.Any,
+    tmp_path: pathlib.Path,
+    logger: 'libioc.Logger.Logger',
+    size: int=2
+) -> libioc.WarmPool.WarmPool:
+    _patch_host(mocker)
+    pool = libioc.WarmPool.WarmPool(
+        mocker.Mock(),
+        name="ci",
+        size=size,
+        logger=logger
+    )
+    pool.lock_dir = str(tmp_path)
+    mocker.patch.object(
+        pool,
+        "get_member",
+        side_effect=lambda name: mocker.Mock()
+    )
+    mocker.patch.object(pool, "_is_ready", return_value=True)
+    return pool
+
+
+class TestWarmPool(object):
+    """Run tests for the warm jail pool."""
+
+    def test_leases_are_exclusive(
+        self,
+        mocker: typing.Any,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if each pool jail is leased only once at a time."""
+        pool = _pool(mocker, tmp_path, logger)
+        first = pool.lease()
+        second = pool.lease()
+        assert first.lock_fd != second.lock_fd
+        with pytest.raises(libioc.errors.WarmPoolExhausted):
+            pool.lease()
+
+    def test_released_jails_are_rolled_back(
+        self,
+        mocker: typing.Any,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if returned jails are rolled back before the next lease."""
+        pool = _pool(mocker, tmp_path, logger, size=1)
+        lease = pool.lease()
+        lease.jail.running = False
+        lease.release()
+        pool.wait()
+        lease.jail.snapshots.rollback.assert_called_once_with(
+            "warm",
+            force=True
+        )
+        assert pool.lease() is not None
+
+    def test_dirty_jails_are_rolled_back_when_leased(
+        self,
+        mocker: typing.Any,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if a jail with writes since its snapshot is never leased."""
+        pool = _pool(mocker, tmp_path, logger, size=1)
+        jail = mocker.Mock(running=False)
+        mocker.patch.object(pool, "get_member", return_value=jail)
+        mocker.patch.object(
+            pool,
+            "_is_ready",
+            new=libioc.WarmPool.WarmPool._is_ready.__get__(pool)
+        )
+        mocker.patch.object(pool, "_has_snapshot", return_value=True)
+        written = mocker.patch("libioc.ZFS.get_written", return_value=4096)
+
+        lease = pool.lease()
+
+        assert lease.jail is jail
+        written.assert_called_with(
+            jail.dataset.name,
+            "warm",
+            logger=logger
+        )
+        jail.snapshots.rollback.assert_called_once_with("warm", force=True)
+        jail.destroy.assert_not_called()
+
+    def test_invalid_pool_name(
+        self,
+        mocker: typing.Any,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if pool names that yield invalid jail names are rejected."""
+        _patch_host(mocker)
+        with pytest.raises(libioc.errors.InvalidJailName):
+            libioc.WarmPool.WarmPool(
+                mocker.Mock(),
+                name="-invalid",
+                logger=logger
+            )
+
+    def test_existing_members_load_their_config(
+        self,
+        mocker: typing.Any,
+        tmp_path: pathlib.Path,
+        logger: 'libioc.Logger.Logger'
+    ) -> None:
+        """Test if leased jails are not initialized as new jails."""
+        _patch_host(mocker)
+        jail_class = mocker.patch("libioc.Jail.JailGenerator")
+        jail_class.return_value.exists = True
+        pool = libioc.WarmPool.WarmPool(
+            mocker.Mock(),
+            name="ci",
+            size=1,
+            logger=logger
+        )
+        pool.lock_dir = str(tmp_path)
+        mocker.patch.object(pool, "_is_ready", return_value=True)
+
+        lease = pool.lease()
+
+        assert lease.jail is jail_class.return_value
+        assert jail_class.call_args.kwargs.get("new", False) is False
+
+
+class TestWarmPoolJails(object):
+    """Run tests for warm pools of actual jails."""
+
+    def test_fork_exec_restores_pristine_jail(
+        self,
+        host: 'libioc.Host.HostGenerator',
+        local_release: 'libioc.Release.ReleaseGenerator',
+        logger: 'libioc.Logger.Logger',
+        zfs: 'libioc.ZFS.ZFS'
+    ) -> None:
+        """Test if changes of a command are discarded after the lease."""
+        pool = libioc.WarmPool.WarmPool(
+            local_release,
+            name="warm-test",
+            size=1,
+            host=host,
+            logger=logger,
+            zfs=zfs
+        )
+        try:
+            assert pool.fill() == 1
+            list(pool.fork_exec("touch /tmp/dirty"))
+            pool.wait()
+            jail = pool.get_member(pool.member_names[0])
+            assert not (pathlib.Path(jail.root_path) / "tmp/dirty").exists()
+        finally:
+            for name in pool.member_names:
+                jail = pool.get_member(name)
+                if jail.exists is True:
+                    list(jail.destroy(force=True))
+
+    def test_leased_jail_has_pool_config(
+        self,
+        host: 'libioc.Host.HostGenerator',
+        local_release: 'libioc.Release.ReleaseGenerator',
+        logger: 'libioc.Logger.Logger',
+        zfs: 'libioc.ZFS.ZFS'
+    ) -> None:
+        """Test if leased jails carry the config they were created with."""
+        pool = libioc.WarmPool.WarmPool(
+            local_release,
+            name="warm-config-test",
+            size=1,
+            host=host,
+            logger=logger,
+            zfs=zfs
+        )
+        try:
+            assert pool.fill() == 1
+            lease = pool.lease()
+            try:
+                assert lease.jail.release.name == local_release.name
+                assert lease.jail.config["basejail"] is False
+            finally:
+                lease.release(background=False)
+        finally:
+            for name in pool.member_names:
+                jail = pool.get_member(name)
+                if jail.exists is True:
+                    list(jail.destroy(force=True))
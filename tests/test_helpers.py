@@ -22,8 +22,11 @@
 # IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 """Tests for the platform-independent helper functions."""
+import typing
 import json
 import pathlib
+import threading
+import time
 
 import pytest
 
@@ -244,3 +247,105 @@ class TestGetBasedirList(object):
         """Test that HardenedBSD excludes the lib32 basedir."""
         basedirs = libioc.helpers.get_basedir_list("HardenedBSD")
         assert "usr/lib32" not in basedirs
+
+
+class TestIterateConcurrently(object):
+    """Run tests for consuming iterables in worker threads."""
+
+    def test_yields_all_items(self) -> None:
+        """Test that the items of all iterables are yielded."""
+        items = libioc.helpers.iterate_concurrently(
+            [range(0, 100), range(100, 150), range(150, 200)],
+            concurrency=2
+        )
+        assert sorted(items) == list(range(200))
+
+    def test_raises_first_failure_after_cleanup(self) -> None:
+        """Test that failures are raised and abandoned generators closed."""
+        closed = []
+        started = threading.Event()
+
+        def _failing() -> typing.Generator[int, None, None]:
+            yield 1
+            started.wait()
+            raise KeyError("failed")
+
+        def _endless() -> typing.Generator[int, None, None]:
+            started.set()
+            try:
+                while True:
+                    yield 2
+            finally:
+                closed.append(True)
+
+        with pytest.raises(KeyError):
+            for _ in libioc.helpers.iterate_concurrently(
+                [_failing(), _endless()],
+                concurrency=2
+            ):
+                pass
+        assert closed == [True]
+
+
+class TestIterateConcurrentlyOrdered(object):
+    """Run tests for consuming iterables ahead in worker threads."""
+
+    def test_yields_items_in_order(self) -> None:
+        """Test that items keep the order of their iterables."""
+        def _slow(items: range) -> typing.Generator[int, None, None]:
+            for item in items:
+                time.sleep(0.001)
+                yield item
+
+        items = list(libioc.helpers.iterate_concurrently_ordered(
+            [_slow(range(0, 20)), range(20, 50), range(50, 60)],
+            concurrency=2
+        ))
+        assert [item for _, item in items] == list(range(60))
+        assert [index for index, _ in items] == [0] * 20 + [1] * 30 + [2] * 10
+
+    def test_limits_running_iterables(self) -> None:
+        """Test that at most concurrency iterables are consumed at once."""
+        lock = threading.Lock()
+        running: typing.List[int] = []
+        max_running = []
+
+        def _track(index: int) -> typing.Generator[int, None, None]:
+            with lock:
+                running.append(index)
+                max_running.append(len(running))
+            try:
+                yield index
+            finally:
+                with lock:
+                    running.remove(index)
+
+        items = list(libioc.helpers.iterate_concurrently_ordered(
+            [_track(index) for index in range(6)],
+            concurrency=2
+        ))
+        assert items == [(index, index,) for index in range(6)]
+        assert max(max_running) <= 2
+
+    def test_raises_failure(self) -> None:
+        """Test that the failure of a later iterable stops the iteration."""
+        closed = []
+
+        def _endless() -> typing.Generator[int, None, None]:
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.append(True)
+
+        def _failing() -> typing.Generator[int, None, None]:
+            raise KeyError("failed")
+            yield 2
+
+        with pytest.raises(KeyError):
+            for _ in libioc.helpers.iterate_concurrently_ordered(
+                [_endless(), _failing()],
+                concurrency=2
+            ):
+                pass
+        assert closed == [True]